@@ -12,6 +12,8 @@ from users.views import UserViewSet, get_assigned_housekeepers_for_date
 from hotel.views import RoomViewSet, RoomTypeViewSet, ZoneViewSet,RoomStatusViewSet
 from users.views import RegisterPushTokenView, SendPushNotificationView
 from notifications.views import NotificationViewSet
+from jobs.views import BackgroundJobViewSet
+from sync.views import sync_changes
 
 
 # Create an instance of DefaultRouter
@@ -39,6 +41,9 @@ router.register(r'users', UserViewSet, basename='user')
 
 router.register(r'notifications', NotificationViewSet, basename='notification')
 
+# Jobs App ViewSets
+router.register(r'jobs', BackgroundJobViewSet, basename='backgroundjob')
+
 
 # router.register(r'incidents', IncidentReportViewSet, basename='incidentreport')
 
@@ -49,5 +54,6 @@ router.register(r'notifications', NotificationViewSet, basename='notification')
 urlpatterns = [
     path('cleaning/stats/', get_cleaning_stats, name='cleaning-stats'),  
     path('housekeepers/assigned/', get_assigned_housekeepers_for_date, name='assigned-housekeepers'),  
+    path('sync/', sync_changes, name='sync'),
     path('users/', include('users.urls')),
 ] + router.urls
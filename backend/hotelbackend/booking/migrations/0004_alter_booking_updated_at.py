@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_booking_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата и время обновления'),
+        ),
+    ]
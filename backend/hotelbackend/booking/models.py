@@ -3,13 +3,14 @@ from hotel.models import Room
 from users.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from sync.models import ChangeTrackedModel
 
 
 
 # Create your models here.
 # Создание моделей здесь.
 # Create your models here.
-class Booking(models.Model):
+class Booking(ChangeTrackedModel):
     """
     Represents a booking for a room in the hotel.
     Представляет бронирование номера в отеле.
@@ -74,11 +75,7 @@ class Booking(models.Model):
         auto_now_add=True, # Automatically set the field to now when the object is first created / Автоматически устанавливать поле в текущее время при создании объекта
         verbose_name="Дата и время создания" # Human-readable name for the field / Человекочитаемое имя для поля
     )
-    updated_at = models.DateTimeField(
-        auto_now=True, # Automatically set the field to now every time the object is saved / Автоматически устанавливать поле в текущее время при каждом сохранении объекта
-        verbose_name="Дата и время обновления" # Human-readable name for the field / Человекочитаемое имя для поля
-    )
-
+    # updated_at — из ChangeTrackedModel (с индексом для /sync) / updated_at comes from ChangeTrackedModel (indexed for /sync)
     created_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL, # Set the foreign key to NULL if the referenced User is deleted / Установить внешний ключ в NULL, если связанный пользователь удален
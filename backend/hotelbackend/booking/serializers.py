@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 from hotel.serializers import RoomShortSerializer
+from utills.fieldProjection import ProjectableSerializerMixin
+
 from .models import Booking
 
 
@@ -16,7 +18,7 @@ UserModel = get_user_model()
 # Сериализатор для модели Booking
 # Booking Model Serializer
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(ProjectableSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Booking.
     Обрабатывает сериализацию и десериализацию данных бронирований.
@@ -39,6 +41,15 @@ class BookingSerializer(serializers.ModelSerializer):
     created_by_name = serializers.SerializerMethodField()
     booking_status_display = serializers.SerializerMethodField()
 
+    # Пути ORM, которые читают поля-методы (для ?fields= / ?omit=)
+    # ORM paths read by the method fields (for ?fields= / ?omit=)
+    projection_sources = {
+        'status_display': ('status',),
+        'created_by_name': ('created_by__first_name', 'created_by__last_name', 'created_by__username'),
+        'booking_status_display': ('status',),
+        'duration_days': ('check_in', 'check_out'),
+    }
+
     def get_created_by_name(self, obj):
         """
         Возвращает полное имя пользователя, создавшего бронирование,
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utills.responseCache import BOOKINGS, invalidate
+
+from .models import Booking
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking_responses(sender, **kwargs):
+    invalidate(BOOKINGS)
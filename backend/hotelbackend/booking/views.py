@@ -9,11 +9,12 @@ from .models import Booking
 from hotel.models import Room
 from .serializers import BookingSerializer
 from utills.permissions import IsManagerOrFrontDesk
+from utills.mixins import FieldProjectionMixin
 from cleaning.models import CleaningTask
 from cleaning.cleaningTypeChoices import CleaningTypeChoices
-from users.models import PushToken, User
+from users.models import User
 from datetime import date
-from utills.mobileNotifications import send_notifications_in_thread
+from utills.notificationService import notification_service
 from asgiref.sync import async_to_sync
 from django.db import transaction
 from firebase_admin import messaging
@@ -28,7 +29,7 @@ logger = logging.getLogger(__name__)
 # ViewSet для управления бронированиями
 # ViewSet for managing bookings
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(FieldProjectionMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления бронированиями (Booking).
     Доступен только аутентифицированным пользователям с ролью 'manager' или 'front desk'.
@@ -242,36 +243,23 @@ class BookingViewSet(viewsets.ModelViewSet):
                
                 if cleaning_task:
                     if cleaning_task.assigned_to:
-                        try:
-                            housekeepers_tokens_qs = PushToken.objects.filter(
-                                user=cleaning_task.assigned_to 
-                            ).values_list('token', flat=True)
-
-                            tokens_to_notify = list(housekeepers_tokens_qs)
-
-                            if tokens_to_notify:
-                                title = "Номер выехал"
-                                body = f"Комната {room_number} освободилась после выезда гостя. Требуется уборка."
-                                data = {
-                                    "task_id": str(cleaning_task.id),
-                                    "booking_id": str(booking.id),
-                                    "room_number": room_number,
-                                    "cleaning_type": CleaningTypeChoices.DEPARTURE_CLEANING,
-                                
-                                }
-
-                                send_notifications_in_thread(
-                                    tokens_to_notify,
-                                    title,
-                                    body,
-                                    data
-                                )
-                                logger.info(f"Notifications sent for new checkout task for room {room_number}.")
-                            else:
-                                logger.warning("No active housekeeper push tokens found to send checkout notification.")
-
-                        except Exception as e:
-                            logger.error(f"Error during checkout notification for booking {booking.id}: {e}", exc_info=True)
+                        # Уведомление уходит из outbox только после фиксации выезда
+                        # The notification leaves the outbox only after the check-out commits
+                        notification_service.notify(
+                            "booking_checked_out",
+                            "Номер выехал",
+                            f"Комната {room_number} освободилась после выезда гостя. Требуется уборка.",
+                            {
+                                "task_id": str(cleaning_task.id),
+                                "booking_id": str(booking.id),
+                                "room_number": room_number,
+                                "cleaning_type": CleaningTypeChoices.DEPARTURE_CLEANING,
+                            },
+                            users=[cleaning_task.assigned_to],
+                            persist=True,
+                            dedup_key=f"booking_checked_out:{booking.id}",
+                        )
+                        logger.info(f"Notification queued for checkout task for room {room_number}.")
                     else:
                         logger.info(f"Cleaning task {cleaning_task.id} for room {room_number} is found but unassigned. No specific housekeeper notification sent.") 
                 else:
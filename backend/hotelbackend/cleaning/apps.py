@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CleaningConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cleaning'
+
+    def ready(self):
+        # Регистрация обработчиков сигналов / Register signal handlers
+        from . import signals  # noqa: F401
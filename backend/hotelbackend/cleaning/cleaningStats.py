@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+
+from .cleaningTypeChoices import CleaningTypeChoices
+from .models import DailyCleaningStats
+
+# Максимальная длина периода для одного запроса статистики (дней)
+# Maximum period length of one stats request (days)
+MAX_STATS_RANGE_DAYS = 366
+
+# Категории статистики: уборки после выезда и текущие уборки номеров (без зон)
+# Stats categories: departure cleanings and current room cleanings (zones excluded)
+CHECKOUT_FILTER = Q(cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING)
+CURRENT_FILTER = Q(cleaning_type=CleaningTypeChoices.STAYOVER, is_zone=False)
+
+
+def _empty_day():
+    return {
+        "checkoutTotal": 0,
+        "checkoutCompleted": 0,
+        "checkoutAvgTime": 0,
+        "currentTotal": 0,
+        "currentCompleted": 0,
+        "currentAvgTime": 0,
+    }
+
+
+def _average_minutes(duration, count):
+    return round(duration.total_seconds() / count / 60.0, 2) if duration and count else 0
+
+
+def cleaning_stats_by_day(date_from, date_to):
+    """
+    Статистика уборок по дням за период одним запросом к сводке DailyCleaningStats.
+    Выполненными считаются: выезды — завершенные горничной (в т.ч. ожидающие проверки),
+    текущие уборки — проверенные. Возвращает {дата: {...}} для каждого дня (пустые дни — нули).
+
+    Per-day cleaning stats for a period in a single query over the DailyCleaningStats rollup.
+    Done means: departures — finished by the housekeeper (including waiting for check),
+    stayovers — checked. Returns {date: {...}} for every day (empty days are zeros).
+    """
+    days = {date_from + timedelta(days=offset): _empty_day() for offset in range((date_to - date_from).days + 1)}
+
+    rows = (
+        DailyCleaningStats.objects
+        .filter(CHECKOUT_FILTER | CURRENT_FILTER, date__range=(date_from, date_to))
+        .values('date', 'cleaning_type')
+        .annotate(
+            total=Sum('total'),
+            completed=Sum('completed'),
+            checked=Sum('checked'),
+            completed_timed=Sum('completed_timed'),
+            completed_duration=Sum('completed_duration'),
+            checked_timed=Sum('checked_timed'),
+            checked_duration=Sum('checked_duration'),
+        )
+        .order_by()
+    )
+
+    for row in rows:
+        day = days[row['date']]
+        if row['cleaning_type'] == CleaningTypeChoices.DEPARTURE_CLEANING:
+            day["checkoutTotal"] = row['total']
+            day["checkoutCompleted"] = row['completed']
+            day["checkoutAvgTime"] = _average_minutes(row['completed_duration'], row['completed_timed'])
+        else:
+            day["currentTotal"] = row['total']
+            day["currentCompleted"] = row['checked']
+            day["currentAvgTime"] = _average_minutes(row['checked_duration'], row['checked_timed'])
+    return days
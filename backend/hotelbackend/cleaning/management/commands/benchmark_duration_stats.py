@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask
+from hotel.models import Room
+from utills.durationStats import duration_stats
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _python_stats(queryset):
+    """
+    Прежний способ: загрузка всех задач и расчет в Python (для сравнения).
+    The previous approach: load every task and compute in Python (for comparison).
+    """
+    durations = sorted(
+        (task.completed_at - task.started_at).total_seconds()
+        for task in queryset
+        if task.started_at and task.completed_at and task.completed_at > task.started_at
+    )
+    if not durations:
+        return 0, None
+    return len(durations), sum(durations) / len(durations)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает расчет продолжительности уборок в БД и в Python на синтетических задачах '
+        '(данные создаются в транзакции и откатываются). '
+        'Benchmarks database-side vs Python cleaning duration stats on synthetic tasks '
+        '(the data is created in a transaction and rolled back).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def _timed(self, func, repeat):
+        best = None
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        total = options['tasks']
+        now = timezone.now()
+        today = timezone.localdate()
+        room = Room.objects.create(number=999_999, floor=999)
+
+        self.stdout.write(f'Creating {total} tasks...')
+        for start in range(0, total, options['batch_size']):
+            CleaningTask.objects.bulk_create([
+                CleaningTask(
+                    room=room,
+                    cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING,
+                    status=CleaningTask.Status.CHECKED,
+                    scheduled_date=today - timedelta(days=index % 365),
+                    started_at=now - timedelta(minutes=20 + index % 60),
+                    completed_at=now,
+                )
+                for index in range(start, min(start + options['batch_size'], total))
+            ])
+
+        queryset = CleaningTask.objects.filter(room=room)
+        sql_stats, sql_time = self._timed(lambda: duration_stats(queryset), options['repeat'])
+        (python_count, python_mean), python_time = self._timed(lambda: _python_stats(queryset), options['repeat'])
+
+        stats = sql_stats.as_minutes()
+        self.stdout.write(
+            f"database: {sql_time * 1000:.1f} ms "
+            f"(count={stats['count']}, mean={stats['mean']}, median={stats['median']}, p90={stats['p90']} min)"
+        )
+        self.stdout.write(
+            f"python:   {python_time * 1000:.1f} ms (count={python_count}, mean={round(python_mean / 60.0, 2)} min)"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {python_time / sql_time:.1f}x'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from cleaning.models import ChecklistLastScheduled
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает индекс последних уборок по шаблонам чек-листов из истории задач. '
+        'Rebuilds the last-scheduled checklist index from the cleaning task history.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = ChecklistLastScheduled.objects.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt checklist index: {count} rows.'))
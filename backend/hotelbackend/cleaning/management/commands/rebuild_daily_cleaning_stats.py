@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from cleaning.models import DailyCleaningStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает сводку KPI уборок по дням из задач (весь период или --date-from/--date-to). '
+        'Rebuilds the daily housekeeping KPI rollup from the tasks (everything or --date-from/--date-to).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='YYYY-MM-DD')
+        parser.add_argument('--date-to', help='YYYY-MM-DD')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def _date(self, value, option):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'{option} must be a date in YYYY-MM-DD format.')
+        return parsed
+
+    def handle(self, *args, **options):
+        count = DailyCleaningStats.objects.rebuild(
+            date_from=self._date(options['date_from'], '--date-from'),
+            date_to=self._date(options['date_to'], '--date-to'),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt daily cleaning stats: {count} rows.'))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-17 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_checklist_index(apps, schema_editor):
+    CleaningTask = apps.get_model("cleaning", "CleaningTask")
+    ChecklistLastScheduled = apps.get_model("cleaning", "ChecklistLastScheduled")
+    rows = CleaningTask.associated_checklists.through.objects.filter(
+        cleaningtask__room__isnull=False,
+        cleaningtask__scheduled_date__isnull=False,
+    ).values(
+        'cleaningtask__room_id',
+        'cleaningtask__cleaning_type',
+        'checklisttemplate_id',
+    ).annotate(last_scheduled_date=Max('cleaningtask__scheduled_date')).order_by()
+    ChecklistLastScheduled.objects.bulk_create(
+        [
+            ChecklistLastScheduled(
+                room_id=row['cleaningtask__room_id'],
+                cleaning_type=row['cleaningtask__cleaning_type'],
+                checklist_template_id=row['checklisttemplate_id'],
+                last_scheduled_date=row['last_scheduled_date'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleaning', '0011_alter_cleaningtask_options_and_more'),
+        ('hotel', '0004_roomtype_default_prepared_guests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChecklistLastScheduled',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cleaning_type', models.CharField(choices=[('stayover', 'Ежедневная уборка'), ('departure_cleaning', 'Уборка при выезде'), ('deep_cleaning', 'Генеральная уборка'), ('on_demand', 'Уборка по запросу'), ('post_renovation_cleaning', 'Уборка после ремонта'), ('public_area_cleaning', 'Текущая уборка общих зон'), ('pre_arrival', 'Подготовка к заезду')], max_length=40, verbose_name='Тип уборки')),
+                ('last_scheduled_date', models.DateField(verbose_name='Дата последней уборки')),
+                ('checklist_template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='last_scheduled_entries', to='cleaning.checklisttemplate', verbose_name='Шаблон чек-листа')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_last_scheduled', to='hotel.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'Последняя уборка по шаблону',
+                'verbose_name_plural': 'Последние уборки по шаблонам',
+                'unique_together': {('room', 'cleaning_type', 'checklist_template')},
+            },
+        ),
+        migrations.RunPython(backfill_checklist_index, migrations.RunPython.noop),
+    ]
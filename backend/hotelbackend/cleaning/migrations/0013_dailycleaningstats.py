@@ -0,0 +1,81 @@
+# Generated by Django 5.2 on 2026-10-17 23:39
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+
+
+def backfill_daily_cleaning_stats(apps, schema_editor):
+    CleaningTask = apps.get_model("cleaning", "CleaningTask")
+    DailyCleaningStats = apps.get_model("cleaning", "DailyCleaningStats")
+    duration = ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField())
+    done = Q(status__in=['completed', 'waiting_check', 'checked'])
+    checked = Q(status='checked')
+    timed = Q(started_at__isnull=False, completed_at__isnull=False, completed_at__gt=F('started_at'))
+    rows = CleaningTask.objects.filter(scheduled_date__isnull=False).annotate(
+        is_zone=ExpressionWrapper(Q(zone__isnull=False), output_field=models.BooleanField()),
+    ).values('scheduled_date', 'cleaning_type', 'assigned_to', 'is_zone').annotate(
+        total=Count('pk'),
+        completed=Count('pk', filter=done),
+        checked=Count('pk', filter=checked),
+        completed_timed=Count('pk', filter=done & timed),
+        completed_duration=Sum(duration, filter=done & timed),
+        checked_timed=Count('pk', filter=checked & timed),
+        checked_duration=Sum(duration, filter=checked & timed),
+    ).order_by()
+    DailyCleaningStats.objects.bulk_create(
+        [
+            DailyCleaningStats(
+                date=row['scheduled_date'],
+                cleaning_type=row['cleaning_type'],
+                housekeeper_id=row['assigned_to'],
+                is_zone=row['is_zone'],
+                total=row['total'],
+                completed=row['completed'],
+                checked=row['checked'],
+                completed_timed=row['completed_timed'],
+                completed_duration=row['completed_duration'] or datetime.timedelta(0),
+                checked_timed=row['checked_timed'],
+                checked_duration=row['checked_duration'] or datetime.timedelta(0),
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleaning', '0012_checklistlastscheduled'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCleaningStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('cleaning_type', models.CharField(choices=[('stayover', 'Ежедневная уборка'), ('departure_cleaning', 'Уборка при выезде'), ('deep_cleaning', 'Генеральная уборка'), ('on_demand', 'Уборка по запросу'), ('post_renovation_cleaning', 'Уборка после ремонта'), ('public_area_cleaning', 'Текущая уборка общих зон'), ('pre_arrival', 'Подготовка к заезду')], max_length=40, verbose_name='Тип уборки')),
+                ('is_zone', models.BooleanField(default=False, verbose_name='Уборка зоны')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего задач')),
+                ('completed', models.PositiveIntegerField(default=0, verbose_name='Выполнено')),
+                ('checked', models.PositiveIntegerField(default=0, verbose_name='Проверено')),
+                ('completed_timed', models.PositiveIntegerField(default=0)),
+                ('completed_duration', models.DurationField(default=datetime.timedelta(0))),
+                ('checked_timed', models.PositiveIntegerField(default=0)),
+                ('checked_duration', models.DurationField(default=datetime.timedelta(0))),
+                ('housekeeper', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_cleaning_stats', to=settings.AUTH_USER_MODEL, verbose_name='Горничная')),
+            ],
+            options={
+                'verbose_name': 'Статистика уборок за день',
+                'verbose_name_plural': 'Статистика уборок по дням',
+                'indexes': [models.Index(fields=['date', 'cleaning_type'], name='cleaning_da_date_b4fec5_idx')],
+                'unique_together': {('date', 'cleaning_type', 'housekeeper', 'is_zone')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_cleaning_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.2 on 2026-10-17 23:46
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+SNAPSHOT_VERSION = 1
+BATCH_SIZE = 1000
+
+
+def _hash(data):
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), cls=DjangoJSONEncoder)
+    return hashlib.sha256(f'v{SNAPSHOT_VERSION}:{payload}'.encode()).hexdigest()
+
+
+def _template_data(template):
+    # Формат ChecklistTemplateSerializer / ChecklistTemplateSerializer format
+    return {
+        'id': template.id,
+        'name': template.name,
+        'cleaning_type': template.cleaning_type,
+        'cleaning_type_display': template.get_cleaning_type_display(),
+        'periodicity': template.periodicity,
+        'offset_days': template.offset_days,
+        'description': template.description,
+        'items': [
+            {'id': item.id, 'text': item.text, 'order': item.order}
+            for item in template.items.all()
+        ],
+    }
+
+
+def move_checklist_data_to_snapshots(apps, schema_editor):
+    """
+    Переносит checklist_data задач в общие снимки; задачам без данных, но с чек-листами,
+    снимок строится из шаблонов.
+    Moves task checklist_data into shared snapshots; tasks without data but with checklists
+    get a snapshot built from their templates.
+    """
+    CleaningTask = apps.get_model("cleaning", "CleaningTask")
+    ChecklistTemplate = apps.get_model("cleaning", "ChecklistTemplate")
+    ChecklistSnapshot = apps.get_model("cleaning", "ChecklistSnapshot")
+    through_model = CleaningTask.associated_checklists.through
+
+    templates = {template.id: template for template in ChecklistTemplate.objects.prefetch_related('items')}
+    template_ids_by_task = {}
+    for task_id, template_id in through_model.objects.values_list('cleaningtask_id', 'checklisttemplate_id'):
+        template_ids_by_task.setdefault(task_id, []).append(template_id)
+
+    snapshot_ids = {}
+
+    def snapshot_id(data):
+        content_hash = _hash(data)
+        if content_hash not in snapshot_ids:
+            snapshot_ids[content_hash] = ChecklistSnapshot.objects.get_or_create(
+                content_hash=content_hash, defaults={'data': data, 'version': SNAPSHOT_VERSION},
+            )[0].id
+        return snapshot_ids[content_hash]
+
+    batch = []
+    for task in CleaningTask.objects.only('id', 'checklist_data').iterator(chunk_size=BATCH_SIZE):
+        data = task.checklist_data
+        if not data and task.id in template_ids_by_task:
+            task_templates = [templates[template_id] for template_id in template_ids_by_task[task.id]]
+            data = [_template_data(template) for template in sorted(task_templates, key=lambda template: template.name)]
+        if not data:
+            continue
+        task.checklist_snapshot_id = snapshot_id(data)
+        batch.append(task)
+        if len(batch) >= BATCH_SIZE:
+            CleaningTask.objects.bulk_update(batch, ['checklist_snapshot'])
+            batch = []
+    if batch:
+        CleaningTask.objects.bulk_update(batch, ['checklist_snapshot'])
+
+
+def move_snapshots_back_to_checklist_data(apps, schema_editor):
+    """
+    Обратная миграция: данные снимка копируются обратно в checklist_data каждой задачи.
+    Reverse migration: the snapshot data is copied back into each task's checklist_data.
+    """
+    CleaningTask = apps.get_model("cleaning", "CleaningTask")
+
+    batch = []
+    tasks = CleaningTask.objects.filter(checklist_snapshot__isnull=False).select_related('checklist_snapshot')
+    for task in tasks.only('id', 'checklist_snapshot__data').iterator(chunk_size=BATCH_SIZE):
+        task.checklist_data = task.checklist_snapshot.data
+        batch.append(task)
+        if len(batch) >= BATCH_SIZE:
+            CleaningTask.objects.bulk_update(batch, ['checklist_data'])
+            batch = []
+    if batch:
+        CleaningTask.objects.bulk_update(batch, ['checklist_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleaning', '0013_dailycleaningstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChecklistSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True, verbose_name='Хэш содержимого')),
+                ('version', models.PositiveSmallIntegerField(default=1, verbose_name='Версия формата')),
+                ('data', models.JSONField(default=list, verbose_name='Данные чек-листов')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Снимок чек-листов',
+                'verbose_name_plural': 'Снимки чек-листов',
+            },
+        ),
+        migrations.AddField(
+            model_name='cleaningtask',
+            name='checklist_snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='tasks', to='cleaning.checklistsnapshot', verbose_name='Снимок чек-листов'),
+        ),
+        migrations.RunPython(move_checklist_data_to_snapshots, move_snapshots_back_to_checklist_data),
+        migrations.RemoveField(
+            model_name='cleaningtask',
+            name='checklist_data',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleaning', '0014_checklistsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cleaningtask',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата и время обновления'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 00:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+COUNTER_FIELDS = (
+    'total', 'completed', 'checked',
+    'completed_timed', 'completed_duration', 'checked_timed', 'checked_duration',
+)
+
+
+def fill_housekeeper_key(apps, schema_editor):
+    """
+    housekeeper_key = housekeeper_id; повторяющиеся строки без горничной сливаются в одну.
+    housekeeper_key = housekeeper_id; duplicate rows without a housekeeper are merged into one.
+    """
+    DailyCleaningStats = apps.get_model('cleaning', 'DailyCleaningStats')
+    DailyCleaningStats.objects.filter(housekeeper__isnull=False).update(housekeeper_key=F('housekeeper_id'))
+    duplicates = (
+        DailyCleaningStats.objects.filter(housekeeper__isnull=True)
+        .values('date', 'cleaning_type', 'is_zone')
+        .annotate(rows=models.Count('pk'), **{f'sum_{name}': Sum(name) for name in COUNTER_FIELDS})
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        rows = DailyCleaningStats.objects.filter(
+            housekeeper__isnull=True, date=group['date'], cleaning_type=group['cleaning_type'], is_zone=group['is_zone']
+        )
+        keep = rows.order_by('pk').first()
+        rows.exclude(pk=keep.pk).delete()
+        for name in COUNTER_FIELDS:
+            setattr(keep, name, group[f'sum_{name}'])
+        keep.save(update_fields=COUNTER_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleaning', '0015_cleaningtask_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='dailycleaningstats',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='dailycleaningstats',
+            name='housekeeper_key',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ключ горничной'),
+        ),
+        migrations.RunPython(fill_housekeeper_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='dailycleaningstats',
+            name='housekeeper',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_cleaning_stats', to=settings.AUTH_USER_MODEL, verbose_name='Горничная'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailycleaningstats',
+            unique_together={('date', 'cleaning_type', 'housekeeper_key', 'is_zone')},
+        ),
+    ]
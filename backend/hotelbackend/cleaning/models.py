@@ -1,13 +1,20 @@
-from django.db import models
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from hotel.models import Room, Zone
 from users.models import User
 from booking.models import Booking
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import time
-from datetime import date
+from datetime import date, timedelta
 from .cleaningTypeChoices import CleaningTypeChoices
-from django.db.models import Q
+from django.db.models import Count, ExpressionWrapper, F, Max, Q, Sum
+from utills.durationStats import DURATION
+from sync.models import ChangeTrackedModel
+from typing import NamedTuple, Optional
 
 # Create your models here.
 # Создайте свои модели здесь.
@@ -115,7 +122,103 @@ class ChecklistItemTemplate(models.Model):
     def __str__(self):
         return self.text
 
-class CleaningTask(models.Model):
+class ChecklistSnapshotManager(models.Manager):
+    """
+    Создание снимков чек-листов с дедупликацией по хэшу содержимого.
+    Creation of checklist snapshots deduplicated by content hash.
+    """
+
+    @staticmethod
+    def hash_data(data, version=None):
+        version = version or ChecklistSnapshot.CURRENT_VERSION
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), cls=DjangoJSONEncoder)
+        return hashlib.sha256(f'v{version}:{payload}'.encode()).hexdigest()
+
+    @staticmethod
+    def serialize_templates(templates):
+        """
+        Данные снимка текущей версии: шаблоны (с пунктами) по имени.
+        Snapshot data of the current version: templates (with items) ordered by name.
+        """
+        from .serializers import ChecklistTemplateSerializer
+
+        return list(ChecklistTemplateSerializer(sorted(templates, key=lambda template: template.name), many=True).data)
+
+    def get_many_for_data(self, data_list):
+        """
+        Снимки для списка данных: один INSERT ... ON CONFLICT DO NOTHING и один SELECT по хэшам.
+        Возвращает снимки в порядке data_list (пустые данные — None).
+
+        Snapshots for a list of data: one INSERT ... ON CONFLICT DO NOTHING and one SELECT by hash.
+        Returns the snapshots in data_list order (empty data gives None).
+        """
+        hashes = [self.hash_data(data) if data else None for data in data_list]
+        wanted = {content_hash: data for content_hash, data in zip(hashes, data_list) if content_hash}
+        if not wanted:
+            return [None] * len(data_list)
+
+        # Вставка с игнорированием конфликтов и одно чтение: число запросов не зависит от попаданий
+        # (ignore_conflicts не возвращает pk, а снимки могут создаваться параллельно)
+        # Insert ignoring conflicts and read back once: the query count does not depend on hits
+        # (ignore_conflicts does not return pks, and snapshots may be created concurrently)
+        self.bulk_create(
+            [self.model(content_hash=content_hash, data=data) for content_hash, data in wanted.items()],
+            ignore_conflicts=True,
+        )
+        snapshots = {snapshot.content_hash: snapshot for snapshot in self.filter(content_hash__in=wanted)}
+        return [snapshots.get(content_hash) if content_hash else None for content_hash in hashes]
+
+    def for_templates(self, templates):
+        return self.get_many_for_data([self.serialize_templates(templates)])[0]
+
+
+class ChecklistSnapshot(models.Model):
+    """
+    Неизменяемый снимок чек-листов задачи (шаблоны с пунктами на момент назначения).
+    Одинаковые снимки хранятся один раз: задачи ссылаются на общую запись по хэшу.
+    version — версия формата data, входит в хэш.
+
+    Immutable snapshot of a task's checklists (templates with items at assignment time).
+    Identical snapshots are stored once: tasks reference a shared row by hash.
+    version is the format version of data and is part of the hash.
+    """
+    # Версия 1: список сериализованных ChecklistTemplateSerializer шаблонов, по имени
+    # Version 1: a list of templates serialized by ChecklistTemplateSerializer, by name
+    CURRENT_VERSION = 1
+
+    class Meta:
+        verbose_name = "Снимок чек-листов"
+        verbose_name_plural = "Снимки чек-листов"
+
+    content_hash = models.CharField(max_length=64, unique=True, verbose_name="Хэш содержимого")
+    version = models.PositiveSmallIntegerField(default=CURRENT_VERSION, verbose_name="Версия формата")
+    data = models.JSONField(default=list, verbose_name="Данные чек-листов")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ChecklistSnapshotManager()
+
+    def __str__(self):
+        return f'Снимок {self.content_hash[:12]} (v{self.version})'
+
+
+class CleaningTaskQuerySet(models.QuerySet):
+    def with_related(self):
+        """
+        Загружает все, что читает CleaningTaskSerializer, фиксированным числом запросов:
+        комната, зона, пользователи и снимок чек-листов через JOIN, имена чек-листов — prefetch.
+
+        Loads everything CleaningTaskSerializer reads in a fixed number of queries:
+        room, zone, users and the checklist snapshot via JOIN, checklist names with a prefetch.
+        """
+        return self.select_related(
+            'room', 'zone', 'assigned_to', 'assigned_by', 'checked_by', 'checklist_snapshot',
+        ).prefetch_related(
+            # Пункты не нужны: checklist_data читается из снимка / Items are not needed: checklist_data comes from the snapshot
+            models.Prefetch('associated_checklists', queryset=ChecklistTemplate.objects.only('id', 'name')),
+        )
+
+
+class CleaningTask(ChangeTrackedModel):
     # Варианты статуса задачи по уборке
     # Choices for the cleaning task status
     class Status(models.TextChoices):
@@ -129,6 +232,10 @@ class CleaningTask(models.Model):
         CANCELED = "canceled", "Отменена" # Задача отменена / Task is canceled
        
 
+    # Точка отсчета периодичности для задач по зонам
+    # Fixed reference point for zone task periodicity
+    ZONE_PERIODICITY_EPOCH = date(2000, 1, 1)
+
     # Мета-параметры модели
     # Model meta options
     class Meta:
@@ -291,10 +398,15 @@ class CleaningTask(models.Model):
     is_rush = models.BooleanField(default=False)
 
 
-    checklist_data = models.JSONField(
-        default=list,
+    # Снимок чек-листов на момент назначения (общий для задач с одинаковыми чек-листами)
+    # Checklist snapshot at assignment time (shared by tasks with identical checklists)
+    checklist_snapshot = models.ForeignKey(
+        ChecklistSnapshot,
+        on_delete=models.PROTECT,
+        null=True,
         blank=True,
-        verbose_name="Данные чек-листа"
+        related_name='tasks',
+        verbose_name="Снимок чек-листов"
     )
 
     associated_checklists = models.ManyToManyField(
@@ -305,6 +417,43 @@ class CleaningTask(models.Model):
     )
 
 
+    objects = CleaningTaskQuerySet.as_manager()
+
+    @property
+    def checklist_data(self):
+        """
+        Данные чек-листов задачи из снимка (пустой список, если снимка нет).
+        The task's checklist data from its snapshot (an empty list without a snapshot).
+        """
+        return self.checklist_snapshot.data if self.checklist_snapshot_id else []
+
+    def set_checklists(self, templates):
+        """
+        associated_checklists.set() отправляет post_remove и post_add — снимок пересчитывается
+        один раз после обоих, а не в каждом сигнале.
+        associated_checklists.set() sends post_remove and post_add — the snapshot is recomputed
+        once after both instead of in each signal.
+        """
+        self._defer_checklist_snapshot = True
+        try:
+            self.associated_checklists.set(templates)
+        finally:
+            self._defer_checklist_snapshot = False
+        self.refresh_checklist_snapshot()
+
+    def refresh_checklist_snapshot(self):
+        """
+        Пересоздает ссылку на снимок по текущим чек-листам задачи.
+        Re-points the snapshot reference to the task's current checklists.
+        """
+        templates = list(self.associated_checklists.prefetch_related('items'))
+        snapshot = ChecklistSnapshot.objects.for_templates(templates) if templates else None
+        if (snapshot.pk if snapshot else None) != self.checklist_snapshot_id:
+            self.checklist_snapshot = snapshot
+            # update() — без пересчета статуса в save(); updated_at ставится явно
+            # update() skips the status logic of save(); updated_at is set explicitly
+            CleaningTask.objects.filter(pk=self.pk).update(checklist_snapshot=snapshot, updated_at=timezone.now())
+
     # Метод для пользовательской валидации данных модели
     # Method for custom model data validation
     def clean(self):
@@ -396,57 +545,17 @@ class CleaningTask(models.Model):
         if not cleaning_type or not scheduled_date:
             return []
 
-      
-        checklist_templates_qs = ChecklistTemplate.objects.filter(
-            Q(cleaning_type=cleaning_type) | Q(cleaning_type__isnull=True) | Q(cleaning_type='')
-        ).prefetch_related('items')
-
-        applicable_checklists = []
-
-       
-        if room:
-            for template in checklist_templates_qs:
-                latest_relevant_task = CleaningTask.objects.filter(
-                    room=room,
-                    cleaning_type=cleaning_type,
-                    associated_checklists=template,
-                    # status=CleaningTask.Status.CHECKED,
-                ).order_by('-scheduled_date').first()
-
-                days_since_last_event = -1 
-
-                if latest_relevant_task and latest_relevant_task.scheduled_date:
-                    # Если существует предыдущая задача с этим шаблоном для этой комнаты/бронирования,
-                    # вычисляем количество дней с даты планирования этой задачи.
-                    days_since_last_event = (scheduled_date - latest_relevant_task.scheduled_date).days
-                elif booking and booking.check_in:
-                    # Если предыдущей задачи с этим шаблоном нет для этой комнаты/бронирования,
-                    # вычисляем количество дней с даты заезда бронирования.
-                    # Это служит "точкой отсчета" для начальных периодических проверок.
-                    days_since_last_event = (scheduled_date - booking.check_in.date()).days
-                else:
-                    # Если нет ни комнаты, ни даты заезда бронирования, ни предыдущей задачи,
-                    # этот шаблон не применим в данной логике.
-                    continue # Пропускаем этот шаблон
-
-                # Убедимся, что days_since_last_event неотрицательно для операций по модулю
-                days_since_last_event = max(0, days_since_last_event)
-
-                # Проверяем периодичность относительно вычисленного days_since_last_event
-                if (days_since_last_event >= template.offset_days) and \
-                   ((days_since_last_event - template.offset_days) % template.periodicity == 0):
-                    applicable_checklists.append(template)
-
-       
-        elif zone:
-            days_from_fixed_point = (scheduled_date - date(2000, 1, 1)).days
-            for template in checklist_templates_qs:
-                if (days_from_fixed_point >= template.offset_days) and \
-                   ((days_from_fixed_point - template.offset_days) % template.periodicity == 0):
-                    applicable_checklists.append(template)
-        
-    
-        return applicable_checklists
+        # Одиночный вызов — частный случай пакетного резолвера
+        # A single call is a special case of the batched resolver
+        return ChecklistPeriodicityResolver().resolve([
+            ChecklistRequest(
+                cleaning_type=cleaning_type,
+                scheduled_date=scheduled_date,
+                booking=booking,
+                room=room,
+                zone=zone,
+            )
+        ])[0]
 
 
     # Строковое представление объекта CleaningTask
@@ -468,4 +577,506 @@ class CleaningTask(models.Model):
 
         # Форматируем строку для отображения
         # Format the string for display
-        return f'Задача: {target} ({self.get_status_display()}) - Назначена: {assigned_to_name}'
\ No newline at end of file
+        return f'Задача: {target} ({self.get_status_display()}) - Назначена: {assigned_to_name}'
+
+
+class ChecklistLastScheduledManager(models.Manager):
+    """
+    Поддержка денормализованного индекса "последняя дата уборки по шаблону".
+    Maintenance of the denormalized "last scheduled date per template" index.
+    Ключ записи: (room_id, cleaning_type, checklist_template_id).
+    Entry key: (room_id, cleaning_type, checklist_template_id).
+    """
+
+    def bump(self, entries):
+        """
+        Поднимает last_scheduled_date до переданных дат (только вперед).
+        Moves last_scheduled_date forward to the given dates (never backwards).
+        entries: итерируемое из (room_id, cleaning_type, template_id, scheduled_date).
+        """
+        latest = {}
+        for room_id, cleaning_type, template_id, scheduled_date in entries:
+            if not room_id or not template_id or not scheduled_date:
+                continue
+            key = (room_id, cleaning_type, template_id)
+            if key not in latest or latest[key] < scheduled_date:
+                latest[key] = scheduled_date
+        if not latest:
+            return
+
+        # Недостающие строки создаются, существующие не трогаются
+        # Missing rows are created, existing ones are left alone
+        self.bulk_create(
+            [
+                self.model(room_id=key[0], cleaning_type=key[1], checklist_template_id=key[2], last_scheduled_date=scheduled_date)
+                for key, scheduled_date in latest.items()
+            ],
+            ignore_conflicts=True,
+        )
+        # Условный UPDATE ... WHERE last_scheduled_date < дата: параллельный bump с более
+        # старой датой не перезапишет более новую. Один запрос на каждую дату.
+        # A conditional UPDATE ... WHERE last_scheduled_date < date: a concurrent bump with an
+        # older date cannot overwrite a newer one. One query per distinct date.
+        by_date = {}
+        for key, scheduled_date in latest.items():
+            by_date.setdefault(scheduled_date, []).append(key)
+        for scheduled_date, keys in by_date.items():
+            self.filter(self._keys_filter(keys), last_scheduled_date__lt=scheduled_date).update(
+                last_scheduled_date=scheduled_date
+            )
+
+    @staticmethod
+    def _keys_filter(keys):
+        query = Q()
+        for room_id, cleaning_type, template_id in keys:
+            query |= Q(room_id=room_id, cleaning_type=cleaning_type, checklist_template_id=template_id)
+        return query
+
+    def _history(self, room_ids=None):
+        """
+        Последняя дата по истории CleaningTask, сгруппированная по ключу индекса.
+        Last scheduled date from the CleaningTask history, grouped by the index key.
+        """
+        through_model = CleaningTask.associated_checklists.through
+        rows = through_model.objects.filter(
+            cleaningtask__room__isnull=False,
+            cleaningtask__scheduled_date__isnull=False,
+        )
+        if room_ids is not None:
+            rows = rows.filter(cleaningtask__room_id__in=room_ids)
+        return rows.values(
+            'cleaningtask__room_id',
+            'cleaningtask__cleaning_type',
+            'checklisttemplate_id',
+        ).annotate(last_scheduled_date=Max('cleaningtask__scheduled_date')).order_by()
+
+    def refresh(self, keys):
+        """
+        Пересчитывает указанные ключи по истории (после удаления чек-листов у задачи
+        или изменения ее даты, комнаты или типа уборки): создает, обновляет или удаляет строки.
+        Recomputes the given keys from history (after checklists were removed from a task or its
+        date, room or cleaning type changed): creates, updates or deletes rows.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        room_ids = {key[0] for key in keys}
+        history = {
+            (row['cleaningtask__room_id'], row['cleaningtask__cleaning_type'], row['checklisttemplate_id']):
+                row['last_scheduled_date']
+            for row in self._history(room_ids)
+        }
+        existing = set()
+        for row in self.filter(room_id__in=room_ids):
+            key = (row.room_id, row.cleaning_type, row.checklist_template_id)
+            existing.add(key)
+            if key in keys and key not in history:
+                row.delete()
+            elif key in keys and row.last_scheduled_date != history[key]:
+                row.last_scheduled_date = history[key]
+                row.save(update_fields=['last_scheduled_date'])
+        missing = [key for key in keys if key in history and key not in existing]
+        if missing:
+            self.bump((*key, history[key]) for key in missing)
+
+    def rebuild(self, batch_size=1000):
+        """
+        Полностью перестраивает индекс по истории задач. Возвращает число записей.
+        Fully rebuilds the index from the task history. Returns the number of rows.
+        """
+        rows = [
+            self.model(
+                room_id=row['cleaningtask__room_id'],
+                cleaning_type=row['cleaningtask__cleaning_type'],
+                checklist_template_id=row['checklisttemplate_id'],
+                last_scheduled_date=row['last_scheduled_date'],
+            )
+            for row in self._history()
+        ]
+        self.all().delete()
+        self.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+
+class ChecklistLastScheduled(models.Model):
+    """
+    Денормализованный индекс: последняя дата планирования задачи с шаблоном
+    чек-листа для пары (комната, тип уборки). Используется для решений о периодичности
+    вместо просмотра всей истории CleaningTask.
+
+    Denormalized index: the last scheduled date of a task carrying the checklist
+    template for a (room, cleaning type) pair. Used by periodicity decisions instead
+    of scanning the whole CleaningTask history.
+    """
+    class Meta:
+        verbose_name = "Последняя уборка по шаблону"
+        verbose_name_plural = "Последние уборки по шаблонам"
+        unique_together = (('room', 'cleaning_type', 'checklist_template'),)
+
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE, # Индекс не нужен без комнаты / The index is meaningless without the room
+        related_name='checklist_last_scheduled',
+        verbose_name="Номер"
+    )
+
+    cleaning_type = models.CharField(
+        max_length=40,
+        choices=CleaningTypeChoices.choices,
+        verbose_name="Тип уборки"
+    )
+
+    checklist_template = models.ForeignKey(
+        ChecklistTemplate,
+        on_delete=models.CASCADE,
+        related_name='last_scheduled_entries', # Имя обратной связи из ChecklistTemplate / Reverse relationship name from ChecklistTemplate
+        verbose_name="Шаблон чек-листа"
+    )
+
+    last_scheduled_date = models.DateField(
+        verbose_name="Дата последней уборки"
+    )
+
+    objects = ChecklistLastScheduledManager()
+
+    def __str__(self):
+        return f'Комната {self.room_id} / {self.cleaning_type} / {self.checklist_template_id}: {self.last_scheduled_date}'
+
+
+class DailyCleaningStatsManager(models.Manager):
+    """
+    Поддержка сводной таблицы KPI уборок по дням.
+    Maintenance of the daily housekeeping KPI rollup.
+    Ключ записи: (date, cleaning_type, housekeeper_id, is_zone).
+    Entry key: (date, cleaning_type, housekeeper_id, is_zone).
+    """
+    # Уникальный ключ строки (housekeeper_key = housekeeper_id или 0) и пересчитываемые поля
+    # Unique row key (housekeeper_key = housekeeper_id or 0) and the recomputed fields
+    KEY_FIELDS = ('date', 'cleaning_type', 'housekeeper_key', 'is_zone')
+    COUNTER_FIELDS = (
+        'total', 'completed', 'checked',
+        'completed_timed', 'completed_duration', 'checked_timed', 'checked_duration',
+    )
+
+    @staticmethod
+    def task_key(task):
+        """
+        Ключ сводки для задачи (None, если у задачи нет даты).
+        Rollup key of a task (None when the task has no date).
+        """
+        if not task.scheduled_date:
+            return None
+        return (task.scheduled_date, task.cleaning_type, task.assigned_to_id, task.zone_id is not None)
+
+    def _aggregate(self, tasks):
+        done = Q(status__in=DailyCleaningStats.COMPLETED_STATUSES)
+        checked = Q(status=CleaningTask.Status.CHECKED)
+        timed = Q(started_at__isnull=False, completed_at__isnull=False, completed_at__gt=F('started_at'))
+        return tasks.filter(scheduled_date__isnull=False).annotate(
+            is_zone=ExpressionWrapper(Q(zone__isnull=False), output_field=models.BooleanField()),
+        ).values('scheduled_date', 'cleaning_type', 'assigned_to', 'is_zone').annotate(
+            total=Count('pk'),
+            completed=Count('pk', filter=done),
+            checked=Count('pk', filter=checked),
+            completed_timed=Count('pk', filter=done & timed),
+            completed_duration=Sum(DURATION, filter=done & timed),
+            checked_timed=Count('pk', filter=checked & timed),
+            checked_duration=Sum(DURATION, filter=checked & timed),
+        ).order_by()
+
+    def _rows(self, tasks):
+        return [
+            self.model(
+                date=row['scheduled_date'],
+                cleaning_type=row['cleaning_type'],
+                housekeeper_id=row['assigned_to'],
+                housekeeper_key=row['assigned_to'] or 0,
+                is_zone=row['is_zone'],
+                total=row['total'],
+                completed=row['completed'],
+                checked=row['checked'],
+                completed_timed=row['completed_timed'],
+                completed_duration=row['completed_duration'] or timedelta(0),
+                checked_timed=row['checked_timed'],
+                checked_duration=row['checked_duration'] or timedelta(0),
+            )
+            for row in self._aggregate(tasks)
+        ]
+
+    @staticmethod
+    def _rows_filter(keys):
+        query = Q()
+        for date_value, cleaning_type, housekeeper_id, is_zone in keys:
+            query |= Q(date=date_value, cleaning_type=cleaning_type, housekeeper_key=housekeeper_id or 0, is_zone=is_zone)
+        return query
+
+    @staticmethod
+    def _tasks_filter(keys):
+        query = Q()
+        for date_value, cleaning_type, housekeeper_id, is_zone in keys:
+            query |= Q(
+                scheduled_date=date_value,
+                cleaning_type=cleaning_type,
+                assigned_to_id=housekeeper_id,
+                zone__isnull=not is_zone,
+            )
+        return query
+
+    def refresh(self, keys):
+        """
+        Пересчитывает записи сводки для ключей по задачам в одной транзакции:
+        сначала блокирует строки ключей (создавая недостающие), затем считает агрегат
+        и делает upsert; ключи без задач удаляются. Параллельное сохранение задачи той же
+        группы ждет блокировку и считает уже зафиксированные данные.
+
+        Recomputes the rollup rows of the keys from the tasks in one transaction:
+        first locks the keys' rows (creating the missing ones), then aggregates and upserts;
+        keys without tasks are deleted. A concurrent save of a task in the same group waits
+        for the lock and aggregates the committed data.
+        """
+        keys = sorted(
+            {key for key in keys if key is not None},
+            key=lambda key: (key[0], key[1], key[2] or 0, key[3]),
+        )
+        if not keys:
+            return
+        with transaction.atomic():
+            # Блокировка по ключу: строка-заготовка + SELECT FOR UPDATE в порядке ключей (без взаимоблокировок)
+            # Per-key lock: a placeholder row + SELECT FOR UPDATE in key order (no deadlocks)
+            self.bulk_create(
+                [
+                    self.model(
+                        date=date_value,
+                        cleaning_type=cleaning_type,
+                        housekeeper_id=housekeeper_id,
+                        housekeeper_key=housekeeper_id or 0,
+                        is_zone=is_zone,
+                    )
+                    for date_value, cleaning_type, housekeeper_id, is_zone in keys
+                ],
+                ignore_conflicts=True,
+            )
+            list(
+                self.select_for_update().filter(self._rows_filter(keys))
+                .order_by(*self.KEY_FIELDS).values_list('pk', flat=True)
+            )
+            rows = self._rows(CleaningTask.objects.filter(self._tasks_filter(keys)))
+            if rows:
+                self.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=self.KEY_FIELDS,
+                    update_fields=self.COUNTER_FIELDS,
+                )
+            counted = {(row.date, row.cleaning_type, row.housekeeper_key, row.is_zone) for row in rows}
+            empty = [key for key in keys if (key[0], key[1], key[2] or 0, key[3]) not in counted]
+            if empty:
+                self.filter(self._rows_filter(empty)).delete()
+
+    def rebuild(self, date_from=None, date_to=None, batch_size=1000):
+        """
+        Перестраивает сводку за период (по умолчанию целиком). Возвращает число записей.
+        Rebuilds the rollup for the period (everything by default). Returns the number of rows.
+        """
+        tasks = CleaningTask.objects.all()
+        stale = self.all()
+        if date_from:
+            tasks = tasks.filter(scheduled_date__gte=date_from)
+            stale = stale.filter(date__gte=date_from)
+        if date_to:
+            tasks = tasks.filter(scheduled_date__lte=date_to)
+            stale = stale.filter(date__lte=date_to)
+        rows = self._rows(tasks)
+        with transaction.atomic():
+            stale.delete()
+            self.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+
+class DailyCleaningStats(models.Model):
+    """
+    Сводка KPI уборок по дням: одна запись на (дата, тип уборки, горничная, зона/номер).
+    Обновляется при каждом изменении задачи (start/complete/check, переназначение, удаление),
+    так что отчеты читают сотни готовых строк вместо таблицы задач.
+
+    Daily housekeeping KPI rollup: one row per (date, cleaning type, housekeeper, zone/room).
+    Refreshed on every task change (start/complete/check, reassignment, deletion),
+    so reports read a few hundred pre-aggregated rows instead of the task table.
+    """
+    # Статусы, в которых уборка считается выполненной горничной
+    # Statuses in which the cleaning counts as done by the housekeeper
+    COMPLETED_STATUSES = [
+        CleaningTask.Status.COMPLETED,
+        CleaningTask.Status.WAITING_CHECK,
+        CleaningTask.Status.CHECKED,
+    ]
+
+    class Meta:
+        verbose_name = "Статистика уборок за день"
+        verbose_name_plural = "Статистика уборок по дням"
+        # housekeeper_key вместо housekeeper: NULL не конфликтует в уникальном ключе, 0 — конфликтует
+        # housekeeper_key instead of housekeeper: NULL never conflicts in a unique key, 0 does
+        unique_together = (('date', 'cleaning_type', 'housekeeper_key', 'is_zone'),)
+        indexes = [
+            models.Index(fields=['date', 'cleaning_type']),
+        ]
+
+    date = models.DateField(verbose_name="Дата")
+
+    cleaning_type = models.CharField(
+        max_length=40,
+        choices=CleaningTypeChoices.choices,
+        verbose_name="Тип уборки"
+    )
+
+    housekeeper = models.ForeignKey(
+        User,
+        # Строки удаляются, а неназначенные группы пересчитываются сигналом (cleaning.signals)
+        # Rows are deleted and the unassigned groups are recomputed by a signal (cleaning.signals)
+        on_delete=models.CASCADE,
+        null=True, # Задачи без исполнителя / Unassigned tasks
+        blank=True,
+        related_name='daily_cleaning_stats',
+        verbose_name="Горничная"
+    )
+
+    # id горничной или 0 для неназначенных задач — часть уникального ключа (upsert)
+    # Housekeeper id or 0 for unassigned tasks — part of the unique key (upsert)
+    housekeeper_key = models.PositiveIntegerField(default=0, verbose_name="Ключ горничной")
+
+    is_zone = models.BooleanField(default=False, verbose_name="Уборка зоны")
+
+    total = models.PositiveIntegerField(default=0, verbose_name="Всего задач")
+    completed = models.PositiveIntegerField(default=0, verbose_name="Выполнено")
+    checked = models.PositiveIntegerField(default=0, verbose_name="Проверено")
+
+    # Сумма и число интервалов для среднего времени: выполненные и проверенные задачи
+    # Sum and number of intervals for the average time: completed and checked tasks
+    completed_timed = models.PositiveIntegerField(default=0)
+    completed_duration = models.DurationField(default=timedelta(0))
+    checked_timed = models.PositiveIntegerField(default=0)
+    checked_duration = models.DurationField(default=timedelta(0))
+
+    objects = DailyCleaningStatsManager()
+
+    def __str__(self):
+        return f'{self.date} / {self.cleaning_type} / {self.housekeeper_id}: {self.completed}/{self.total}'
+
+
+class ChecklistRequest(NamedTuple):
+    """
+    Входные данные для определения применимых чек-листов одной задачи.
+    Input for resolving the applicable checklists of a single task.
+    """
+    cleaning_type: str
+    scheduled_date: date
+    booking: Optional[Booking] = None
+    room: Optional[Room] = None
+    zone: Optional[Zone] = None
+
+
+class ChecklistPeriodicityResolver:
+    """
+    Пакетно определяет применимые ChecklistTemplates для многих задач сразу.
+    Последняя дата планирования для каждой пары (комната, тип уборки, шаблон)
+    читается одним запросом из индекса ChecklistLastScheduled вместо запроса на шаблон и комнату.
+    Приоритет отдается последней задаче с данным чек-листом; если ее нет,
+    точкой отсчета служит дата заезда бронирования. Для зон используется фиксированная дата.
+
+    Resolves the applicable ChecklistTemplates for many tasks at once.
+    The last scheduled date per (room, cleaning type, template) is read with a single
+    indexed query from ChecklistLastScheduled instead of one query per template per room.
+    """
+
+    def __init__(self, templates=None):
+        if templates is None:
+            templates = ChecklistTemplate.objects.prefetch_related('items')
+        self.templates = list(templates)
+        self._last_scheduled = {}
+        self._loaded = set()
+
+    def templates_for(self, cleaning_type):
+        """
+        Шаблоны, подходящие для типа уборки (включая шаблоны без типа).
+        Templates matching the cleaning type (including untyped templates).
+        """
+        return [
+            template for template in self.templates
+            if template.cleaning_type in (cleaning_type, None, '')
+        ]
+
+    def preload(self, requests):
+        """
+        Загружает историю для всех комнат из запросов одним запросом к индексу.
+        Уже загруженные пары (комната, тип уборки) повторно не запрашиваются.
+        Loads the history for every room in the requests with one index query.
+        """
+        missing = {
+            (request.room.id, request.cleaning_type)
+            for request in requests
+            if request.room and request.cleaning_type and request.scheduled_date
+        } - self._loaded
+        if not missing:
+            return
+
+        rows = ChecklistLastScheduled.objects.filter(
+            room_id__in={room_id for room_id, _ in missing},
+            cleaning_type__in={cleaning_type for _, cleaning_type in missing},
+        ).values_list('room_id', 'cleaning_type', 'checklist_template_id', 'last_scheduled_date')
+
+        for room_id, cleaning_type, template_id, last_scheduled_date in rows:
+            if (room_id, cleaning_type) in missing:
+                self._last_scheduled[(room_id, cleaning_type, template_id)] = last_scheduled_date
+        self._loaded |= missing
+
+    def record(self, room_id, cleaning_type, templates, scheduled_date):
+        """
+        Учитывает задачу, созданную в памяти, в последующих решениях этого резолвера.
+        Makes a task created in memory visible to later decisions of this resolver.
+        """
+        for template in templates:
+            key = (room_id, cleaning_type, template.id)
+            last_date = self._last_scheduled.get(key)
+            if last_date is None or last_date < scheduled_date:
+                self._last_scheduled[key] = scheduled_date
+
+    @staticmethod
+    def is_due(days_since_last_event, template):
+        return (days_since_last_event >= template.offset_days) and \
+            ((days_since_last_event - template.offset_days) % template.periodicity == 0)
+
+    def _resolve_one(self, request):
+        if not request.cleaning_type or not request.scheduled_date:
+            return []
+
+        applicable_checklists = []
+        if request.room:
+            for template in self.templates_for(request.cleaning_type):
+                last_date = self._last_scheduled.get((request.room.id, request.cleaning_type, template.id))
+                if last_date:
+                    # Дни с даты последней задачи с этим шаблоном для комнаты
+                    # Days since the last task with this template for the room
+                    days_since_last_event = (request.scheduled_date - last_date).days
+                elif request.booking and request.booking.check_in:
+                    # Точка отсчета — дата заезда бронирования
+                    # The booking check-in date is the reference point
+                    days_since_last_event = (request.scheduled_date - request.booking.check_in.date()).days
+                else:
+                    continue
+                if self.is_due(max(0, days_since_last_event), template):
+                    applicable_checklists.append(template)
+        elif request.zone:
+            days_from_fixed_point = (request.scheduled_date - CleaningTask.ZONE_PERIODICITY_EPOCH).days
+            for template in self.templates_for(request.cleaning_type):
+                if self.is_due(days_from_fixed_point, template):
+                    applicable_checklists.append(template)
+        return applicable_checklists
+
+    def resolve(self, requests):
+        """
+        Возвращает список применимых шаблонов для каждого запроса (в том же порядке).
+        Returns the list of applicable templates for every request, in order.
+        """
+        requests = list(requests)
+        self.preload(requests)
+        return [self._resolve_one(request) for request in requests]
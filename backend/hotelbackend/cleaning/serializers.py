@@ -6,6 +6,7 @@ from rest_framework.exceptions import ValidationError as DRFValidationError
 from cleaning.cleaningTypeChoices import CleaningTypeChoices
 from hotel.models import Room
 from booking.models import Booking
+from utills.fieldProjection import ProjectableSerializerMixin
 import logging 
 import copy 
 
@@ -137,7 +138,7 @@ class MultipleTaskAssignmentSerializer(serializers.Serializer):
 
 # --- CleaningTask Serializer ---
 
-class CleaningTaskSerializer(serializers.ModelSerializer):
+class CleaningTaskSerializer(ProjectableSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the CleaningTask model.
     Handles serialization and deserialization of cleaning task data.
@@ -161,6 +162,19 @@ class CleaningTaskSerializer(serializers.ModelSerializer):
     zone_name = serializers.CharField(source='zone.name', read_only=True, allow_null=True)
     cleaning_type_display = serializers.SerializerMethodField()
 
+    # Пути ORM, которые читают поля-методы (для ?fields= / ?omit=)
+    # ORM paths read by the method fields (for ?fields= / ?omit=)
+    projection_sources = {
+        'assigned_to_name': ('assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__username'),
+        'assigned_by_name': ('assigned_by__first_name', 'assigned_by__last_name', 'assigned_by__username'),
+        'checked_by_name': ('checked_by__first_name', 'checked_by__last_name', 'checked_by__username'),
+        'cleaning_type_display': ('cleaning_type',),
+        'status_display': ('status',),
+        'is_guest_checked_out': ('cleaning_type', 'room__status'),
+        'associated_checklist_names': ('associated_checklists',),
+        'checklist_data': ('checklist_snapshot__data',),
+    }
+
     # Read-only field for human-readable status display
     # Поле только для чтения для человекочитаемого отображения статуса
     status_display = serializers.SerializerMethodField()
@@ -284,10 +298,9 @@ class CleaningTaskSerializer(serializers.ModelSerializer):
         return [template.name for template in obj.associated_checklists.all()]
 
     def get_checklist_data(self, obj: CleaningTask):
-        # Аналогично get_associated_checklist_names
-        if hasattr(obj, '_temp_auto_checklists'):
-            return ChecklistTemplateSerializer(obj._temp_auto_checklists, many=True, context=self.context).data
-        return ChecklistTemplateSerializer(obj.associated_checklists.all().prefetch_related('items'), many=True, context=self.context).data
+        # Снимок читается как есть (JOIN в CleaningTask.objects.with_related()), без сериализации шаблонов
+        # The snapshot is served as is (JOIN in CleaningTask.objects.with_related()), templates are not re-serialized
+        return obj.checklist_data
 
     def create(self, validated_data):
         associated_checklists_input = validated_data.pop('associated_checklists', None)
@@ -314,7 +327,7 @@ class CleaningTaskSerializer(serializers.ModelSerializer):
                     raise DRFValidationError({"associated_checklists": "Invalid item type in checklist list."})
             
             associated_templates = list(ChecklistTemplate.objects.filter(id__in=extracted_ids))
-            instance.associated_checklists.set(associated_templates)
+            instance.set_checklists(associated_templates)
             instance._temp_auto_checklists = associated_templates
         else:
             room = validated_data.get('room')
@@ -336,7 +349,7 @@ class CleaningTaskSerializer(serializers.ModelSerializer):
                 room=room,
                 zone=zone
             )
-            instance.associated_checklists.set(applicable_checklists)
+            instance.set_checklists(applicable_checklists)
             instance._temp_auto_checklists = applicable_checklists
         
         instance.save() 
@@ -370,7 +383,7 @@ class CleaningTaskSerializer(serializers.ModelSerializer):
             
             # Теперь extracted_ids должен корректно содержать только целые числа.
             associated_templates = list(ChecklistTemplate.objects.filter(id__in=extracted_ids))
-            instance.associated_checklists.set(associated_templates)
+            instance.set_checklists(associated_templates)
         
         instance.save() 
         return instance
@@ -425,3 +438,37 @@ class CleaningTaskSerializer(serializers.ModelSerializer):
             'checked_at',
             'is_guest_checked_out',
         ]
+
+
+class CleaningTaskCompactSerializer(ProjectableSerializerMixin, serializers.ModelSerializer):
+    """
+    Компактное представление задачи для списков (?compact=true): только колонки задачи
+    и номер комнаты / название зоны — без полей-методов и вложенных чек-листов.
+    Полное представление загружается при открытии задачи.
+
+    Compact task representation for lists (?compact=true): task columns plus the room
+    number / zone name only — no method fields and no nested checklists.
+    The full representation is loaded when a task is opened.
+    """
+    room_number = serializers.CharField(source='room.number', read_only=True, allow_null=True)
+    zone_name = serializers.CharField(source='zone.name', read_only=True, allow_null=True)
+
+    class Meta:
+        model = CleaningTask
+        fields = [
+            'id',
+            'room',
+            'room_number',
+            'zone',
+            'zone_name',
+            'booking',
+            'cleaning_type',
+            'status',
+            'scheduled_date',
+            'due_time',
+            'assigned_to',
+            'started_at',
+            'completed_at',
+            'is_rush',
+        ]
+        read_only_fields = fields
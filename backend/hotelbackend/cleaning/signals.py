@@ -0,0 +1,243 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import User
+from utills.responseCache import CHECKLISTS, CLEANING_TASKS, invalidate
+
+from . import taskEvents
+from .models import ChecklistItemTemplate, ChecklistLastScheduled, ChecklistTemplate, CleaningTask, DailyCleaningStats
+
+ChecklistThrough = CleaningTask.associated_checklists.through
+
+
+def _index_keys(task, template_ids):
+    """
+    Ключи индекса ChecklistLastScheduled для задачи и шаблонов.
+    ChecklistLastScheduled index keys for the task and templates.
+    """
+    if not task.room_id or not task.scheduled_date:
+        return set()
+    return {(task.room_id, task.cleaning_type, template_id) for template_id in template_ids}
+
+
+@receiver(m2m_changed, sender=ChecklistThrough)
+def update_checklist_index(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Поддерживает индекс периодичности при изменении чек-листов задачи.
+    Keeps the periodicity index in sync when a task's checklists change.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if action == 'post_clear':
+        ChecklistLastScheduled.objects.refresh(getattr(instance, '_checklist_index_keys', set()))
+        return
+
+    if reverse:
+        # Изменение со стороны шаблона / Change made from the template side
+        tasks = instance.cleaning_tasks.all() if action == 'pre_clear' else CleaningTask.objects.filter(pk__in=pk_set)
+        pairs = [(task, {instance.pk}) for task in tasks]
+    elif action == 'pre_clear':
+        pairs = [(instance, set(instance.associated_checklists.values_list('pk', flat=True)))]
+    else:
+        pairs = [(instance, pk_set)]
+
+    if action == 'post_add':
+        ChecklistLastScheduled.objects.bump(
+            (task.room_id, task.cleaning_type, template_id, task.scheduled_date)
+            for task, template_ids in pairs
+            for template_id in template_ids
+        )
+    elif action == 'pre_clear':
+        # Ключи нужно запомнить до очистки / Keys must be captured before the clear
+        instance._checklist_index_keys = set().union(*(_index_keys(task, ids) for task, ids in pairs))
+    else:
+        ChecklistLastScheduled.objects.refresh(
+            set().union(*(_index_keys(task, ids) for task, ids in pairs))
+        )
+
+
+_INDEX_KEY_FIELDS = ('room_id', 'cleaning_type', 'scheduled_date')
+
+
+def _index_task_key(task):
+    return (task.room_id, task.cleaning_type, task.scheduled_date)
+
+
+@receiver(post_init, sender=CleaningTask)
+def remember_checklist_index_task_key(sender, instance, **kwargs):
+    """
+    Запоминает (комната, тип уборки, дата) при загрузке: если они изменятся при сохранении,
+    а набор чек-листов нет, m2m_changed не придет — индекс пересчитывается в post_save.
+
+    Remembers (room, cleaning type, date) on load: if they change on save while the checklist
+    set does not, no m2m_changed arrives, so the index is recomputed in post_save.
+    """
+    if all(field in instance.__dict__ for field in _INDEX_KEY_FIELDS):
+        instance._checklist_index_task_key = _index_task_key(instance)
+
+
+@receiver(post_save, sender=CleaningTask)
+def refresh_checklist_index_on_move(sender, instance, created, **kwargs):
+    old_key = getattr(instance, '_checklist_index_task_key', None)
+    new_key = _index_task_key(instance)
+    instance._checklist_index_task_key = new_key
+    if created or old_key is None or old_key == new_key:
+        return
+    template_ids = list(instance.associated_checklists.values_list('pk', flat=True))
+    if not template_ids:
+        return
+    old_room_id, old_cleaning_type, old_date = old_key
+    old_keys = (
+        {(old_room_id, old_cleaning_type, template_id) for template_id in template_ids}
+        if old_room_id and old_date else set()
+    )
+    ChecklistLastScheduled.objects.refresh(old_keys | _index_keys(instance, template_ids))
+
+
+@receiver(pre_delete, sender=CleaningTask)
+def remember_checklist_index_keys(sender, instance, **kwargs):
+    """
+    Каскадное удаление строк связи не отправляет m2m_changed — запоминаем ключи заранее.
+    Cascading deletion of the through rows does not send m2m_changed, so remember the keys first.
+    """
+    instance._checklist_index_keys = _index_keys(
+        instance, instance.associated_checklists.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=CleaningTask)
+def refresh_checklist_index(sender, instance, **kwargs):
+    ChecklistLastScheduled.objects.refresh(getattr(instance, '_checklist_index_keys', set()))
+
+
+@receiver([post_save, post_delete], sender=CleaningTask)
+def invalidate_cleaning_task_responses(sender, **kwargs):
+    invalidate(CLEANING_TASKS)
+
+
+@receiver([post_save, post_delete], sender=ChecklistTemplate)
+@receiver([post_save, post_delete], sender=ChecklistItemTemplate)
+def invalidate_checklist_responses(sender, **kwargs):
+    invalidate(CHECKLISTS)
+
+
+_STATS_KEY_FIELDS = ('scheduled_date', 'cleaning_type', 'assigned_to_id', 'zone_id')
+_STATS_STATE_FIELDS = ('status', 'started_at', 'completed_at')
+_STATS_UPDATE_FIELDS = frozenset(_STATS_KEY_FIELDS + _STATS_STATE_FIELDS + ('assigned_to', 'zone'))
+
+
+def _daily_stats_state(task):
+    return tuple(getattr(task, field) for field in _STATS_STATE_FIELDS)
+
+
+@receiver(post_init, sender=CleaningTask)
+def remember_daily_stats_key(sender, instance, **kwargs):
+    """
+    Запоминает ключ сводки и поля счетчиков при загрузке: при сохранении пересчитываются старая
+    и новая группы, а если ничего из этого не изменилось — пересчет пропускается.
+    Отложенные поля не читаются, чтобы не делать лишних запросов.
+
+    Remembers the rollup key and the counted fields on load: saving recomputes both the old and
+    the new group, and skips the recompute when none of them changed.
+    Deferred fields are not read to avoid extra queries.
+    """
+    if all(field in instance.__dict__ for field in _STATS_KEY_FIELDS):
+        instance._daily_stats_key = DailyCleaningStats.objects.task_key(instance)
+    if all(field in instance.__dict__ for field in _STATS_STATE_FIELDS):
+        instance._daily_stats_state = _daily_stats_state(instance)
+
+
+@receiver(post_save, sender=CleaningTask)
+def refresh_daily_stats(sender, instance, created, update_fields=None, **kwargs):
+    # save(update_fields=...) без полей сводки ее не меняет
+    # save(update_fields=...) without any rollup field cannot change it
+    if update_fields is not None and not _STATS_UPDATE_FIELDS.intersection(update_fields):
+        return
+    old_key = getattr(instance, '_daily_stats_key', None)
+    old_state = getattr(instance, '_daily_stats_state', None)
+    new_key = DailyCleaningStats.objects.task_key(instance)
+    new_state = _daily_stats_state(instance)
+    instance._daily_stats_key = new_key
+    instance._daily_stats_state = new_state
+    if not created and old_key is not None and old_key == new_key and old_state == new_state:
+        return
+    DailyCleaningStats.objects.refresh({old_key, new_key})
+
+
+@receiver(post_delete, sender=CleaningTask)
+def refresh_daily_stats_on_delete(sender, instance, **kwargs):
+    DailyCleaningStats.objects.refresh({
+        getattr(instance, '_daily_stats_key', None),
+        DailyCleaningStats.objects.task_key(instance),
+    })
+
+
+@receiver(pre_delete, sender=User)
+def remember_housekeeper_stats_keys(sender, instance, **kwargs):
+    """
+    Строки сводки горничной удаляются каскадом, а ее задачи становятся неназначенными:
+    запоминаем группы, чтобы пересчитать их неназначенные строки после удаления.
+
+    The housekeeper's rollup rows are deleted by the cascade and their tasks become unassigned:
+    remember the groups to recompute their unassigned rows after the deletion.
+    """
+    instance._daily_stats_keys = [
+        (date_value, cleaning_type, None, is_zone)
+        for date_value, cleaning_type, is_zone in DailyCleaningStats.objects.filter(housekeeper=instance)
+        .values_list('date', 'cleaning_type', 'is_zone')
+    ]
+
+
+@receiver(post_delete, sender=User)
+def refresh_unassigned_daily_stats(sender, instance, **kwargs):
+    DailyCleaningStats.objects.refresh(getattr(instance, '_daily_stats_keys', ()))
+
+
+@receiver(m2m_changed, sender=ChecklistThrough)
+def refresh_checklist_snapshot(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Снимок чек-листов задачи следует за изменением ее набора чек-листов.
+    A task's checklist snapshot follows changes to its set of checklists.
+    """
+    # Снимок обновляется через update() без post_save — ответы задач инвалидируются здесь
+    # The snapshot is updated with update() and no post_save, so task responses are invalidated here
+    if not reverse:
+        # set_checklists() пересчитывает снимок сам, один раз / set_checklists() refreshes the snapshot itself, once
+        if action in ('post_add', 'post_remove', 'post_clear') and not getattr(instance, '_defer_checklist_snapshot', False):
+            instance.refresh_checklist_snapshot()
+            invalidate(CLEANING_TASKS)
+        return
+
+    # Изменение со стороны шаблона / Change made from the template side
+    if action == 'pre_clear':
+        instance._snapshot_task_ids = set(instance.cleaning_tasks.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        task_ids = getattr(instance, '_snapshot_task_ids', set())
+    elif action in ('post_add', 'post_remove'):
+        task_ids = pk_set or set()
+    else:
+        return
+    for task in CleaningTask.objects.filter(pk__in=task_ids):
+        task.refresh_checklist_snapshot()
+    invalidate(CLEANING_TASKS)
+
+
+@receiver(post_init, sender=CleaningTask)
+def remember_task_event_state(sender, instance, **kwargs):
+    """
+    Запоминает отслеживаемые поля при загрузке: событие доски задач содержит только изменения.
+    Remembers the tracked fields on load, so a task board event carries only the changes.
+    """
+    instance._task_event_state = taskEvents.task_state(instance)
+
+
+@receiver(post_save, sender=CleaningTask)
+def publish_task_saved(sender, instance, created, **kwargs):
+    taskEvents.task_saved(instance, getattr(instance, '_task_event_state', {}), created)
+    instance._task_event_state = taskEvents.task_state(instance)
+
+
+@receiver(post_delete, sender=CleaningTask)
+def publish_task_deleted(sender, instance, **kwargs):
+    taskEvents.task_deleted(instance, getattr(instance, '_task_event_state', {}))
@@ -0,0 +1,219 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from utills.webNotifications import channel_message
+
+from .models import CleaningTask
+
+logger = logging.getLogger(__name__)
+
+# События жизненного цикла задачи / Task lifecycle events
+CREATED = 'created'
+ASSIGNED = 'assigned'
+STARTED = 'started'
+COMPLETED = 'completed'
+CHECKED = 'checked'
+CANCELED = 'canceled'
+RUSH_TOGGLED = 'rush_toggled'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+STATUS_EVENTS = {
+    CleaningTask.Status.IN_PROGRESS: STARTED,
+    CleaningTask.Status.COMPLETED: COMPLETED,
+    CleaningTask.Status.WAITING_CHECK: COMPLETED,
+    CleaningTask.Status.CHECKED: CHECKED,
+    CleaningTask.Status.CANCELED: CANCELED,
+}
+
+# Поля, изменения которых отправляются клиентам (attname -> имя поля в API)
+# Fields whose changes are pushed to clients (attname -> API field name)
+TRACKED_FIELDS = {
+    'status': 'status',
+    'assigned_to_id': 'assigned_to',
+    'is_rush': 'is_rush',
+    'scheduled_date': 'scheduled_date',
+    'due_time': 'due_time',
+    'cleaning_type': 'cleaning_type',
+    'notes': 'notes',
+    'started_at': 'started_at',
+    'completed_at': 'completed_at',
+    'checked_at': 'checked_at',
+    'checked_by_id': 'checked_by',
+    'room_id': 'room',
+    'zone_id': 'zone',
+}
+
+
+def date_group(scheduled_date):
+    """
+    Группа доски задач на дату (менеджеры и ресепшн).
+    Task board group of a date (managers and front desk).
+    """
+    return f"task_board_{scheduled_date.isoformat()}"
+
+
+def housekeeper_group(user_id):
+    """
+    Группа задач одной горничной.
+    Task group of a single housekeeper.
+    """
+    return f"task_board_housekeeper_{user_id}"
+
+
+def task_state(task):
+    """
+    Значения отслеживаемых полей; отложенные поля (only()/defer()) пропускаются без запросов.
+    Values of the tracked fields; deferred fields (only()/defer()) are skipped without queries.
+    """
+    return {attname: task.__dict__[attname] for attname in TRACKED_FIELDS if attname in task.__dict__}
+
+
+def _event_name(created, changes):
+    if created:
+        return CREATED
+    if 'status' in changes and changes['status'] in STATUS_EVENTS:
+        return STATUS_EVENTS[changes['status']]
+    if 'assigned_to_id' in changes:
+        return ASSIGNED
+    if 'is_rush' in changes:
+        return RUSH_TOGGLED
+    return UPDATED
+
+
+def _groups(task, old_state):
+    groups = set()
+    for state in (old_state, task_state(task)):
+        if state.get('scheduled_date'):
+            groups.add(date_group(state['scheduled_date']))
+        if state.get('assigned_to_id'):
+            groups.add(housekeeper_group(state['assigned_to_id']))
+    return groups
+
+
+def _json_safe(values):
+    return json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+
+
+def task_saved(task, old_state, created=False):
+    """
+    Публикует изменение задачи: только измененные поля (для новой — все), в группы старой
+    и новой даты и старой и новой горничной (прежняя исполнительница убирает задачу у себя).
+
+    Publishes a task change: only the changed fields (all of them for a new task), to the
+    groups of the old and new date and of the old and new housekeeper (the previous assignee
+    drops the task from their list).
+    """
+    new_state = task_state(task)
+    changes = {
+        attname: value for attname, value in new_state.items()
+        if created or attname not in old_state or old_state[attname] != value
+    }
+    if not changes:
+        return
+    publish(_groups(task, old_state), {
+        "id": task.pk,
+        "event": _event_name(created, changes),
+        "scheduled_date": new_state.get('scheduled_date'),
+        "changes": {TRACKED_FIELDS[attname]: value for attname, value in changes.items()},
+    })
+
+
+def task_deleted(task, state):
+    publish(_groups(task, state), {
+        "id": task.pk,
+        "event": DELETED,
+        "scheduled_date": state.get('scheduled_date'),
+        "changes": {},
+    })
+
+
+class _Batch:
+    """
+    События, собранные для отправки одним сообщением на группу.
+    Events collected to be sent as one message per group.
+    """
+
+    def __init__(self):
+        self.by_group = defaultdict(list)
+
+    def add(self, groups, payload):
+        for group in groups:
+            self.by_group[group].append(payload)
+
+    def flush(self):
+        by_group, self.by_group = self.by_group, defaultdict(list)
+        _send(by_group)
+
+
+class _ActiveBatch(threading.local):
+    batch = None
+
+
+_active = _ActiveBatch()
+
+
+@contextmanager
+def batch():
+    """
+    События внутри блока уходят одним сообщением на группу (массовое назначение, автогенерация).
+    Каждое событие по-прежнему регистрируется своим on_commit: события отмененной точки
+    сохранения отбрасываются Django, а отправка пакета регистрируется последней и выполняется
+    после фиксации (или сразу вне транзакции).
+
+    Events inside the block go out as one message per group (bulk assignment, auto-generation).
+    Every event is still registered with its own on_commit: Django discards the events of a
+    rolled-back savepoint, and the batch send is registered last and runs after the commit
+    (or at once outside a transaction).
+    """
+    if _active.batch is not None:
+        yield _active.batch
+        return
+    current = _active.batch = _Batch()
+    try:
+        yield current
+    finally:
+        _active.batch = None
+        transaction.on_commit(current.flush, robust=True)
+
+
+def publish(groups, payload):
+    """
+    Откладывает событие до фиксации транзакции. Вне batch() событие уходит отдельным
+    сообщением на каждую группу; внутри — вместе с остальными событиями блока.
+
+    Defers the event until the transaction commits. Outside batch() the event goes out as its own
+    message per group; inside it goes out together with the block's other events.
+    """
+    if not groups:
+        return
+    payload = _json_safe(payload)
+    current = _active.batch
+    if current is not None:
+        transaction.on_commit(partial(current.add, groups, payload), robust=True)
+    else:
+        transaction.on_commit(partial(_send, {group: [payload] for group in groups}), robust=True)
+
+
+def _send(by_group):
+    channel_layer = get_channel_layer()
+    if not by_group or not channel_layer:
+        return
+
+    async def _send_all():
+        for group, events in by_group.items():
+            try:
+                await channel_layer.group_send(group, channel_message("task_event", {"type": "task_events", "events": events}))
+            except Exception as e:
+                logger.error(f"Error sending task events to '{group}': {e}", exc_info=True)
+
+    async_to_sync(_send_all)()
@@ -0,0 +1,306 @@
+import logging
+from collections import defaultdict
+from datetime import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Booking
+from hotel.models import Zone
+from utills.responseCache import CLEANING_TASKS, invalidate
+
+from . import taskEvents
+from .cleaningTypeChoices import CleaningTypeChoices
+from .models import (
+    ChecklistLastScheduled,
+    ChecklistPeriodicityResolver,
+    ChecklistRequest,
+    ChecklistSnapshot,
+    ChecklistTemplate,
+    CleaningTask,
+    DailyCleaningStats,
+)
+
+logger = logging.getLogger(__name__)
+
+# Стандартное количество гостей для подготовки, если у номера нет типа
+# Default number of prepared guests when the room has no room type
+DEFAULT_PREPARED_GUESTS = 2
+
+
+class CleaningTaskGenerator:
+    """
+    Пакетный генератор задач по уборке на указанную дату.
+    Загружает выезды, проживания, заезды и зоны фиксированным числом запросов,
+    рассчитывает задачи в памяти и записывает их через bulk_create
+    вместе с одной пакетной вставкой в промежуточную таблицу чек-листов.
+
+    Set-based generator of cleaning tasks for a given date.
+    Loads departures, stayovers, arrivals and zones in a fixed number of queries,
+    computes the tasks in memory and writes them with bulk_create plus
+    a single bulk insert into the checklist through table.
+    """
+
+    def __init__(self, scheduled_date, assigned_by=None):
+        self.scheduled_date = scheduled_date
+        self.assigned_by = assigned_by
+        self.created_tasks_details = []
+
+        self._new_tasks = []
+        self._new_task_checklists = []
+        self._existing_keys = set()
+        self._resolver = None
+        self._template_data = {}
+        self._arrivals_by_room = defaultdict(list)
+        self._departures_by_room = defaultdict(list)
+
+    # --- Загрузка данных / Data loading ---
+
+    def _load_existing_tasks(self):
+        """
+        Ключи уже существующих задач на дату (аналог прежней проверки exists()).
+        Keys of tasks that already exist for the date (replaces the per-task exists() check).
+        """
+        existing = CleaningTask.objects.filter(
+            scheduled_date=self.scheduled_date
+        ).values_list('room_id', 'zone_id', 'booking_id', 'cleaning_type')
+
+        for room_id, zone_id, booking_id, cleaning_type in existing:
+            if room_id:
+                self._existing_keys.add(('room', room_id, booking_id, cleaning_type))
+            if zone_id:
+                self._existing_keys.add(('zone', zone_id, cleaning_type))
+
+    def _load_templates(self):
+        """
+        Загружает все шаблоны чек-листов с пунктами одним запросом (+ prefetch)
+        и заранее сериализует их для снимков чек-листов.
+        Loads all checklist templates with their items in one query (+ prefetch)
+        and pre-serializes them for the checklist snapshots.
+        """
+        from .serializers import ChecklistTemplateSerializer
+
+        templates = list(ChecklistTemplate.objects.prefetch_related('items'))
+        self._resolver = ChecklistPeriodicityResolver(templates)
+        for template, data in zip(templates, ChecklistTemplateSerializer(templates, many=True).data):
+            self._template_data[template.id] = data
+
+    # --- Расчет / Computation ---
+
+    @staticmethod
+    def _standard_guests(room):
+        return room.room_type.default_prepared_guests if room.room_type else DEFAULT_PREPARED_GUESTS
+
+    def _due_time(self, booking):
+        """
+        Повторяет логику CleaningTask.save() для due_time, не обращаясь к БД.
+        Mirrors the due_time logic of CleaningTask.save() without touching the DB.
+        """
+        if booking and booking.check_out and self.scheduled_date == booking.check_out.date():
+            next_bookings = self._arrivals_by_room.get(booking.room_id)
+            if next_bookings and next_bookings[0].check_in:
+                due_time = next_bookings[0].check_in
+                if timezone.is_naive(due_time):
+                    due_time = timezone.make_aware(due_time)
+                return due_time
+            return timezone.make_aware(timezone.datetime.combine(self.scheduled_date, time(14, 0, 0)))
+        return None
+
+    def _add_task(self, cleaning_type, room=None, zone=None, booking=None, notes=""):
+        if room:
+            key = ('room', room.id, booking.id if booking else None, cleaning_type)
+        else:
+            key = ('zone', zone.id, cleaning_type)
+        if key in self._existing_keys:
+            return
+        self._existing_keys.add(key)
+
+        request = ChecklistRequest(
+            cleaning_type=cleaning_type,
+            scheduled_date=self.scheduled_date,
+            booking=booking,
+            room=room,
+            zone=zone,
+        )
+        applicable_checklists = self._resolver.resolve([request])[0]
+        if room:
+            # Новые задачи учитываются последующими расчетами периодичности в этом же прогоне
+            # New tasks are visible to later periodicity decisions within the same run
+            self._resolver.record(room.id, cleaning_type, applicable_checklists, self.scheduled_date)
+
+        task = CleaningTask(
+            room=room,
+            zone=zone,
+            booking=booking,
+            scheduled_date=self.scheduled_date,
+            due_time=self._due_time(booking) if room else None,
+            cleaning_type=cleaning_type,
+            status=CleaningTask.Status.UNASSIGNED,
+            assigned_by=self.assigned_by,
+            notes=notes,
+        )
+        self._new_tasks.append(task)
+        self._new_task_checklists.append(applicable_checklists)
+
+        if room:
+            self.created_tasks_details.append(f"Комната {room.number} ({cleaning_type})")
+        elif zone:
+            self.created_tasks_details.append(f"Зона {zone.name} ({cleaning_type})")
+
+    # --- Запись / Writing ---
+
+    def _write(self):
+        if not self._new_tasks:
+            return []
+
+        # Одинаковые наборы чек-листов получают общий снимок / Identical checklist sets share one snapshot
+        snapshots = ChecklistSnapshot.objects.get_many_for_data([
+            [self._template_data[template.id] for template in sorted(templates, key=lambda x: x.name)]
+            for templates in self._new_task_checklists
+        ])
+        for task, snapshot in zip(self._new_tasks, snapshots):
+            task.checklist_snapshot = snapshot
+
+        created_tasks = CleaningTask.objects.bulk_create(self._new_tasks)
+
+        through_model = CleaningTask.associated_checklists.through
+        through_rows = [
+            through_model(cleaningtask_id=task.id, checklisttemplate_id=template.id)
+            for task, templates in zip(created_tasks, self._new_task_checklists)
+            for template in templates
+        ]
+        if through_rows:
+            through_model.objects.bulk_create(through_rows)
+
+        # bulk_create не отправляет m2m_changed — индекс периодичности обновляем явно
+        # bulk_create does not send m2m_changed, so the periodicity index is bumped explicitly
+        ChecklistLastScheduled.objects.bump(
+            (task.room_id, task.cleaning_type, template.id, task.scheduled_date)
+            for task, templates in zip(created_tasks, self._new_task_checklists)
+            for template in templates
+        )
+        # bulk_create не отправляет post_save — сводку и закэшированные ответы обновляем явно
+        # bulk_create does not send post_save, so the rollup and cached responses are refreshed explicitly
+        DailyCleaningStats.objects.refresh({DailyCleaningStats.objects.task_key(task) for task in created_tasks})
+        invalidate(CLEANING_TASKS)
+        # События доски задач собираются в одно сообщение на группу при фиксации транзакции
+        # Task board events are coalesced into one message per group when the transaction commits
+        with taskEvents.batch():
+            for task in created_tasks:
+                taskEvents.task_saved(task, {}, created=True)
+
+        return created_tasks
+
+    def generate(self):
+        """
+        Генерирует задачи на дату и возвращает список созданных задач:
+        - Уборка после выезда: если у бронирования выезд в указанную дату
+        - Текущая уборка: если гость живёт, но не выезжает в указанную дату
+        - Подготовка к заезду: если гостей больше стандарта и в номере нет выезда
+        - Задачи по зонам: для всех зон, если задача еще не существует
+
+        Generates the tasks for the date and returns the created tasks.
+        """
+        scheduled_date = self.scheduled_date
+
+        departures = list(
+            Booking.objects.filter(check_out__date=scheduled_date).select_related('room', 'room__room_type')
+        )
+        stayovers = list(
+            Booking.objects.filter(
+                check_in__date__lt=scheduled_date,
+                check_out__date__gt=scheduled_date,
+            ).select_related('room')
+        )
+        arrivals = list(
+            Booking.objects.filter(check_in__date=scheduled_date).select_related('room', 'room__room_type')
+        )
+        zones = list(Zone.objects.all())
+
+        for booking in departures:
+            self._departures_by_room[booking.room_id].append(booking)
+        for booking in arrivals:
+            self._arrivals_by_room[booking.room_id].append(booking)
+
+        self._load_existing_tasks()
+        self._load_templates()
+        # История чек-листов всех затронутых номеров — одним сгруппированным запросом
+        # Checklist history of every affected room in a single grouped query
+        self._resolver.preload([
+            ChecklistRequest(cleaning_type=cleaning_type, scheduled_date=scheduled_date, room=booking.room)
+            for bookings, cleaning_type in (
+                (departures, CleaningTypeChoices.DEPARTURE_CLEANING),
+                (stayovers, CleaningTypeChoices.STAYOVER),
+                (arrivals, CleaningTypeChoices.PRE_ARRIVAL),
+            )
+            for booking in bookings
+            if booking.room
+        ])
+
+        # --- Уборка после выезда / Departure cleaning ---
+        for booking in departures:
+            if not booking.room:
+                continue
+            notes = ""
+            next_booking = next(
+                (b for b in self._arrivals_by_room.get(booking.room_id, []) if b.pk != booking.pk),
+                None
+            )
+            if next_booking and next_booking.guest_count > self._standard_guests(booking.room):
+                notes = f"Подготовить номер для {next_booking.guest_count} гостей."
+            self._add_task(
+                CleaningTypeChoices.DEPARTURE_CLEANING,
+                room=booking.room,
+                booking=booking,
+                notes=notes,
+            )
+
+        # --- Текущая уборка / Stayover cleaning ---
+        for booking in stayovers:
+            if booking.room:
+                self._add_task(CleaningTypeChoices.STAYOVER, room=booking.room, booking=booking)
+
+        # --- Подготовка номера к заезду / Pre-arrival preparation ---
+        for booking in arrivals:
+            if not booking.room:
+                continue
+            has_checkout_today_for_room = any(
+                b.pk != booking.pk for b in self._departures_by_room.get(booking.room_id, [])
+            )
+            if booking.guest_count > self._standard_guests(booking.room) and not has_checkout_today_for_room:
+                self._add_task(
+                    CleaningTypeChoices.PRE_ARRIVAL,
+                    room=booking.room,
+                    booking=booking,
+                    notes=f"Подготовить номер для {booking.guest_count} гостей.",
+                )
+
+        # --- Зоны / Zones ---
+        for zone in zones:
+            self._add_task(CleaningTypeChoices.PUBLIC_AREA_CLEANING, zone=zone)
+
+        created_tasks = self._write()
+        logger.info(f"Auto-generated {len(created_tasks)} cleaning tasks for {scheduled_date}.")
+        return created_tasks
+
+
+def generate_for_dates(scheduled_dates, assigned_by=None, on_progress=None):
+    """
+    Генерирует задачи на несколько дат подряд; каждая дата — отдельная транзакция.
+    on_progress(done, total) вызывается после каждой даты (для фоновых задач).
+    Возвращает (количество созданных задач, список описаний).
+
+    Generates tasks for several dates; each date runs in its own transaction.
+    on_progress(done, total) is called after every date (used by background jobs).
+    Returns (created task count, list of details).
+    """
+    created_count = 0
+    details = []
+    for index, scheduled_date in enumerate(scheduled_dates, start=1):
+        with transaction.atomic():
+            generator = CleaningTaskGenerator(scheduled_date=scheduled_date, assigned_by=assigned_by)
+            created_count += len(generator.generate())
+            details.extend(generator.created_tasks_details)
+        if on_progress:
+            on_progress(index, len(scheduled_dates))
+    return created_count, details
@@ -0,0 +1,43 @@
+import logging
+from datetime import date
+
+from celery import shared_task
+
+from jobs.models import BackgroundJob
+from users.models import User
+
+from .taskGenerator import generate_for_dates
+
+logger = logging.getLogger(__name__)
+
+AUTO_GENERATE_JOB = 'cleaning_auto_generate'
+
+
+@shared_task
+def auto_generate_cleaning_tasks(job_id, scheduled_dates, assigned_by_id=None):
+    """
+    Фоновая генерация задач по уборке на одну или несколько дат.
+    Прогресс и результат записываются в BackgroundJob.
+
+    Background generation of cleaning tasks for one or several dates.
+    Progress and result are stored on the BackgroundJob.
+    """
+    job = BackgroundJob.objects.get(pk=job_id)
+    job.mark_running()
+    try:
+        assigned_by = User.objects.filter(pk=assigned_by_id).first() if assigned_by_id else None
+        created_count, details = generate_for_dates(
+            [date.fromisoformat(value) for value in scheduled_dates],
+            assigned_by=assigned_by,
+            on_progress=lambda done, total: job.set_progress(done * 100 // total),
+        )
+    except Exception as e:
+        logger.error(f"Background job {job_id} failed: {e}", exc_info=True)
+        job.mark_failed(e)
+        return
+
+    job.mark_succeeded({
+        "created_count": created_count,
+        "details": details,
+        "message": f"Создано {created_count} задач по уборке.",
+    })
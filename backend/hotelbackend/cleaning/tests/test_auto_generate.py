@@ -0,0 +1,223 @@
+import pytest
+from datetime import date, datetime, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import Booking
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistItemTemplate, ChecklistTemplate, CleaningTask
+from hotel.models import Room, RoomType, Zone
+from users.models import User
+
+SCHEDULED_DATE = date(2025, 7, 10)
+
+
+def local_dt(day, hour):
+    """Aware datetime in the current time zone / Aware datetime в текущем часовом поясе."""
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour))
+
+
+@pytest.fixture
+def manager_client():
+    manager = User.objects.create_user(username="manager_gen", password="password", role=User.Role.MANAGER)
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    return client
+
+
+@pytest.fixture
+def room_type():
+    return RoomType.objects.create(name="Standard_Gen", capacity=4, default_prepared_guests=2)
+
+
+@pytest.fixture
+def templates():
+    daily_stayover = ChecklistTemplate.objects.create(
+        name="Stayover daily", cleaning_type=CleaningTypeChoices.STAYOVER, periodicity=1
+    )
+    ChecklistItemTemplate.objects.create(checklist_template=daily_stayover, text="Make bed", order=0)
+    every_other_day = ChecklistTemplate.objects.create(
+        name="Stayover towels", cleaning_type=CleaningTypeChoices.STAYOVER, periodicity=2
+    )
+    departure = ChecklistTemplate.objects.create(
+        name="Departure", cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING, periodicity=1
+    )
+    ChecklistItemTemplate.objects.create(checklist_template=departure, text="Change linen", order=0)
+    return {"daily_stayover": daily_stayover, "every_other_day": every_other_day, "departure": departure}
+
+
+def generate(client, scheduled_date=SCHEDULED_DATE):
+    url = reverse('cleaningtask-auto-generate')
+    return client.post(url, {"scheduled_date": scheduled_date.isoformat()}, format='json')
+
+
+@pytest.mark.django_db
+def test_auto_generate_creates_expected_tasks(manager_client, room_type, templates):
+    """
+    Пакетная генерация создает те же задачи, что и прежний поштучный путь.
+    Bulk generation creates the same tasks as the former per-task path.
+    """
+    room_101 = Room.objects.create(number=101, floor=1, room_type=room_type)
+    room_102 = Room.objects.create(number=102, floor=1, room_type=room_type)
+    room_103 = Room.objects.create(number=103, floor=1, room_type=room_type)
+    room_104 = Room.objects.create(number=104, floor=1, room_type=room_type)
+    zone = Zone.objects.create(name="Lobby_Gen")
+
+    departing = Booking.objects.create(
+        room=room_101, check_in=local_dt(SCHEDULED_DATE - timedelta(days=2), 15), check_out=local_dt(SCHEDULED_DATE, 11)
+    )
+    arriving_same_room = Booking.objects.create(
+        room=room_101, check_in=local_dt(SCHEDULED_DATE, 15), check_out=local_dt(SCHEDULED_DATE + timedelta(days=2), 11),
+        guest_count=3,
+    )
+    staying = Booking.objects.create(
+        room=room_102, check_in=local_dt(SCHEDULED_DATE - timedelta(days=3), 15), check_out=local_dt(SCHEDULED_DATE + timedelta(days=2), 11)
+    )
+    arriving = Booking.objects.create(
+        room=room_103, check_in=local_dt(SCHEDULED_DATE, 15), check_out=local_dt(SCHEDULED_DATE + timedelta(days=3), 11),
+        guest_count=4,
+    )
+    departing_alone = Booking.objects.create(
+        room=room_104, check_in=local_dt(SCHEDULED_DATE - timedelta(days=1), 15), check_out=local_dt(SCHEDULED_DATE, 11)
+    )
+
+    response = generate(manager_client)
+
+    assert response.status_code == 201
+    assert response.data["created_count"] == 5
+    assert response.data["details"] == [
+        "Комната 101 (departure_cleaning)",
+        "Комната 104 (departure_cleaning)",
+        "Комната 102 (stayover)",
+        "Комната 103 (pre_arrival)",
+        "Зона Lobby_Gen (public_area_cleaning)",
+    ]
+
+    departure_task = CleaningTask.objects.get(booking=departing)
+    assert departure_task.cleaning_type == CleaningTypeChoices.DEPARTURE_CLEANING
+    assert departure_task.due_time == arriving_same_room.check_in
+    assert departure_task.notes == "Подготовить номер для 3 гостей."
+    assert list(departure_task.associated_checklists.all()) == [templates["departure"]]
+    assert [item["name"] for item in departure_task.checklist_data] == ["Departure"]
+    assert departure_task.checklist_data[0]["items"][0]["text"] == "Change linen"
+
+    lonely_departure = CleaningTask.objects.get(booking=departing_alone)
+    assert lonely_departure.due_time == local_dt(SCHEDULED_DATE, 14)
+    assert lonely_departure.notes == ""
+
+    stayover_task = CleaningTask.objects.get(booking=staying)
+    assert stayover_task.due_time is None
+    # 3 дня с заезда: ежедневный шаблон применим, шаблон "раз в 2 дня" — нет
+    # 3 days since check-in: the daily template applies, the every-other-day one does not
+    assert list(stayover_task.associated_checklists.all()) == [templates["daily_stayover"]]
+
+    pre_arrival_task = CleaningTask.objects.get(booking=arriving)
+    assert pre_arrival_task.cleaning_type == CleaningTypeChoices.PRE_ARRIVAL
+    assert pre_arrival_task.notes == "Подготовить номер для 4 гостей."
+    assert not CleaningTask.objects.filter(booking=arriving_same_room).exists()
+
+    zone_task = CleaningTask.objects.get(zone=zone)
+    assert zone_task.cleaning_type == CleaningTypeChoices.PUBLIC_AREA_CLEANING
+    assert zone_task.status == CleaningTask.Status.UNASSIGNED
+
+
+@pytest.mark.django_db
+def test_auto_generate_is_idempotent(manager_client, room_type, templates):
+    """
+    Повторный запуск на ту же дату не создает дубликатов.
+    Running again for the same date does not create duplicates.
+    """
+    room = Room.objects.create(number=201, floor=2, room_type=room_type)
+    Booking.objects.create(
+        room=room, check_in=local_dt(SCHEDULED_DATE - timedelta(days=1), 15), check_out=local_dt(SCHEDULED_DATE + timedelta(days=1), 11)
+    )
+    Zone.objects.create(name="Gym_Gen")
+
+    assert generate(manager_client).data["created_count"] == 2
+    assert generate(manager_client).data["created_count"] == 0
+    assert CleaningTask.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_auto_generate_respects_checklist_history(manager_client, room_type, templates):
+    """
+    Периодичность отсчитывается от последней задачи с этим шаблоном, а не от даты заезда.
+    Periodicity counts from the last task with the template, not from check-in.
+    """
+    room = Room.objects.create(number=301, floor=3, room_type=room_type)
+    booking = Booking.objects.create(
+        room=room, check_in=local_dt(SCHEDULED_DATE - timedelta(days=3), 15), check_out=local_dt(SCHEDULED_DATE + timedelta(days=2), 11)
+    )
+    previous = CleaningTask.objects.create(
+        room=room, booking=booking, cleaning_type=CleaningTypeChoices.STAYOVER,
+        scheduled_date=SCHEDULED_DATE - timedelta(days=2),
+    )
+    previous.associated_checklists.set([templates["every_other_day"]])
+
+    generate(manager_client)
+
+    task = CleaningTask.objects.get(scheduled_date=SCHEDULED_DATE, room=room)
+    assert set(task.associated_checklists.all()) == {templates["daily_stayover"], templates["every_other_day"]}
+
+
+@pytest.mark.django_db
+def test_auto_generate_query_count_does_not_grow_with_rooms(manager_client, room_type, templates):
+    """
+    Количество запросов не зависит от количества номеров.
+    The number of queries does not depend on the number of rooms.
+    """
+    def populate(first_number, count, day):
+        for number in range(first_number, first_number + count):
+            room = Room.objects.create(number=number, floor=1, room_type=room_type)
+            Booking.objects.create(
+                room=room, check_in=local_dt(day - timedelta(days=1), 15), check_out=local_dt(day, 11)
+            )
+            Booking.objects.create(
+                room=room, check_in=local_dt(day, 15), check_out=local_dt(day + timedelta(days=2), 11), guest_count=3
+            )
+
+    small_day = SCHEDULED_DATE
+    large_day = SCHEDULED_DATE + timedelta(days=10)
+    populate(1000, 2, small_day)
+    populate(2000, 12, large_day)
+
+    with CaptureQueriesContext(connection) as small_run:
+        assert generate(manager_client, small_day).data["created_count"] == 2
+    with CaptureQueriesContext(connection) as large_run:
+        assert generate(manager_client, large_day).data["created_count"] == 12
+
+    assert len(large_run.captured_queries) == len(small_run.captured_queries)
+
+
+@pytest.mark.django_db
+def test_auto_generate_async_returns_job_and_stores_result(manager_client, room_type, templates, django_capture_on_commit_callbacks):
+    """
+    С ?async=true ответ 202 с job_id, а результат (по дням) доступен через опрос задачи.
+    With ?async=true the response is 202 with a job_id and the result (for all days) is polled from the job.
+    """
+    room = Room.objects.create(number=601, floor=6, room_type=room_type)
+    Booking.objects.create(
+        room=room, check_in=local_dt(SCHEDULED_DATE - timedelta(days=1), 15), check_out=local_dt(SCHEDULED_DATE + timedelta(days=5), 11)
+    )
+
+    url = reverse('cleaningtask-auto-generate') + '?async=true'
+    with django_capture_on_commit_callbacks(execute=True):
+        response = manager_client.post(url, {"scheduled_date": SCHEDULED_DATE.isoformat(), "days": 3}, format='json')
+
+    assert response.status_code == 202
+    job_response = manager_client.get(reverse('backgroundjob-detail', args=[response.data["job_id"]]))
+    assert job_response.status_code == 200
+    assert job_response.data["status"] == "succeeded"
+    assert job_response.data["progress"] == 100
+    assert job_response.data["result"]["created_count"] == 3
+    assert CleaningTask.objects.filter(room=room).count() == 3
+
+
+@pytest.mark.django_db
+def test_auto_generate_rejects_invalid_days(manager_client):
+    url = reverse('cleaningtask-auto-generate')
+    response = manager_client.post(url, {"scheduled_date": SCHEDULED_DATE.isoformat(), "days": 40}, format='json')
+    assert response.status_code == 400
@@ -0,0 +1,134 @@
+import pytest
+from datetime import date, datetime, timedelta
+from django.core.management import call_command
+from django.utils import timezone
+
+from booking.models import Booking
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistLastScheduled, ChecklistTemplate, CleaningTask
+from cleaning.taskGenerator import CleaningTaskGenerator
+from hotel.models import Room
+
+SCHEDULED_DATE = date(2025, 7, 10)
+
+
+@pytest.fixture
+def template():
+    return ChecklistTemplate.objects.create(
+        name="Index_Template", cleaning_type=CleaningTypeChoices.STAYOVER, periodicity=1
+    )
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(number=501, floor=5)
+
+
+def index_dates(room):
+    return dict(
+        ChecklistLastScheduled.objects.filter(room=room).values_list('checklist_template_id', 'last_scheduled_date')
+    )
+
+
+def make_task(room, scheduled_date):
+    return CleaningTask.objects.create(
+        room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=scheduled_date
+    )
+
+
+@pytest.mark.django_db
+def test_index_follows_checklist_changes(room, template):
+    """
+    Добавление, удаление и очистка чек-листов поддерживают индекс в актуальном состоянии.
+    Adding, removing and clearing checklists keep the index up to date.
+    """
+    older = make_task(room, SCHEDULED_DATE - timedelta(days=3))
+    newer = make_task(room, SCHEDULED_DATE)
+
+    older.associated_checklists.add(template)
+    assert index_dates(room) == {template.id: SCHEDULED_DATE - timedelta(days=3)}
+
+    newer.associated_checklists.add(template)
+    assert index_dates(room) == {template.id: SCHEDULED_DATE}
+
+    # Добавление более старой задачи не откатывает дату / An older task does not move the date back
+    make_task(room, SCHEDULED_DATE - timedelta(days=10)).associated_checklists.add(template)
+    assert index_dates(room) == {template.id: SCHEDULED_DATE}
+
+    newer.associated_checklists.remove(template)
+    assert index_dates(room) == {template.id: SCHEDULED_DATE - timedelta(days=3)}
+
+    older.delete()
+    assert index_dates(room) == {template.id: SCHEDULED_DATE - timedelta(days=10)}
+
+    CleaningTask.objects.get(scheduled_date=SCHEDULED_DATE - timedelta(days=10)).associated_checklists.clear()
+    assert index_dates(room) == {}
+
+
+@pytest.mark.django_db
+def test_generator_updates_index(room, template):
+    """
+    bulk_create генератора не отправляет сигналы, поэтому индекс обновляется явно.
+    The generator's bulk_create sends no signals, so it updates the index explicitly.
+    """
+    Booking.objects.create(
+        room=room,
+        check_in=timezone.make_aware(datetime(2025, 7, 8, 15)),
+        check_out=timezone.make_aware(datetime(2025, 7, 12, 11)),
+    )
+
+    CleaningTaskGenerator(scheduled_date=SCHEDULED_DATE).generate()
+
+    assert index_dates(room) == {template.id: SCHEDULED_DATE}
+
+
+@pytest.mark.django_db
+def test_rebuild_command_restores_index(room, template):
+    """
+    Команда перестраивает индекс по истории задач.
+    The command rebuilds the index from the task history.
+    """
+    make_task(room, SCHEDULED_DATE - timedelta(days=1)).associated_checklists.add(template)
+    make_task(room, SCHEDULED_DATE).associated_checklists.add(template)
+    ChecklistLastScheduled.objects.all().delete()
+
+    call_command('rebuild_checklist_index')
+
+    assert index_dates(room) == {template.id: SCHEDULED_DATE}
+
+
+@pytest.mark.django_db
+def test_index_follows_task_date_and_room_changes(room, template):
+    """
+    Перенос задачи на другую дату или в другую комнату без изменения чек-листов
+    пересчитывает старый и новый ключи индекса.
+    Moving a task to another date or room without changing its checklists
+    recomputes both the old and the new index keys.
+    """
+    older = make_task(room, SCHEDULED_DATE - timedelta(days=3))
+    older.associated_checklists.add(template)
+    task = make_task(room, SCHEDULED_DATE)
+    task.associated_checklists.add(template)
+
+    task = CleaningTask.objects.get(pk=task.pk)
+    task.scheduled_date = SCHEDULED_DATE + timedelta(days=5)
+    task.save()
+    assert index_dates(room) == {template.id: SCHEDULED_DATE + timedelta(days=5)}
+
+    task.scheduled_date = SCHEDULED_DATE - timedelta(days=7)
+    task.save()
+    assert index_dates(room) == {template.id: SCHEDULED_DATE - timedelta(days=3)}
+
+    other_room = Room.objects.create(number=502, floor=5)
+    older.room = other_room
+    older.save()
+    assert index_dates(room) == {template.id: SCHEDULED_DATE - timedelta(days=7)}
+    assert index_dates(other_room) == {template.id: SCHEDULED_DATE - timedelta(days=3)}
+
+
+@pytest.mark.django_db
+def test_bump_never_moves_the_date_back(room, template):
+    key = (room.id, CleaningTypeChoices.STAYOVER, template.id)
+    ChecklistLastScheduled.objects.bump([(*key, SCHEDULED_DATE)])
+    ChecklistLastScheduled.objects.bump([(*key, SCHEDULED_DATE - timedelta(days=1))])
+    assert index_dates(room) == {template.id: SCHEDULED_DATE}
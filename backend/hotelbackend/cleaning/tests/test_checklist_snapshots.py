@@ -0,0 +1,117 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistItemTemplate, ChecklistSnapshot, ChecklistTemplate, CleaningTask
+from cleaning.serializers import ChecklistTemplateSerializer, CleaningTaskSerializer
+from hotel.models import Room
+
+
+@pytest.fixture
+def templates():
+    created = []
+    for name in ("Bathroom", "Bedroom"):
+        template = ChecklistTemplate.objects.create(name=name, cleaning_type=CleaningTypeChoices.STAYOVER)
+        for order in range(2):
+            ChecklistItemTemplate.objects.create(checklist_template=template, text=f"{name} {order}", order=order)
+        created.append(template)
+    return created
+
+
+def make_task(number):
+    return CleaningTask.objects.create(
+        room=Room.objects.create(number=number, floor=1),
+        cleaning_type=CleaningTypeChoices.STAYOVER,
+        scheduled_date=timezone.localdate(),
+    )
+
+
+@pytest.mark.django_db
+def test_identical_checklists_share_one_snapshot(templates):
+    tasks = [make_task(number) for number in (101, 102, 103)]
+    for task in tasks:
+        task.associated_checklists.set(templates)
+
+    snapshot_ids = set(CleaningTask.objects.values_list('checklist_snapshot_id', flat=True))
+    assert len(snapshot_ids) == 1
+    assert ChecklistSnapshot.objects.count() == 1
+
+    snapshot = ChecklistSnapshot.objects.get()
+    assert snapshot.data == ChecklistTemplateSerializer(templates, many=True).data
+    assert snapshot.content_hash == ChecklistSnapshot.objects.hash_data(snapshot.data)
+
+
+@pytest.mark.django_db
+def test_snapshot_follows_checklist_changes(templates):
+    task = make_task(201)
+    task.associated_checklists.set(templates)
+    full = CleaningTask.objects.get(pk=task.pk).checklist_snapshot_id
+
+    task.associated_checklists.remove(templates[0])
+    task.refresh_from_db()
+    assert task.checklist_snapshot_id != full
+    assert [template["name"] for template in task.checklist_data] == ["Bedroom"]
+
+    task.associated_checklists.clear()
+    task.refresh_from_db()
+    assert task.checklist_snapshot_id is None
+    assert task.checklist_data == []
+    # Прежние снимки сохраняются для других задач / Previous snapshots are kept for other tasks
+    assert ChecklistSnapshot.objects.filter(pk=full).exists()
+
+
+@pytest.mark.django_db
+def test_reverse_side_changes_refresh_snapshots(templates):
+    task = make_task(301)
+    task.associated_checklists.set([templates[0]])
+
+    templates[1].cleaning_tasks.add(task)
+    task.refresh_from_db()
+    assert [template["name"] for template in task.checklist_data] == ["Bathroom", "Bedroom"]
+
+    templates[0].cleaning_tasks.clear()
+    task.refresh_from_db()
+    assert [template["name"] for template in task.checklist_data] == ["Bedroom"]
+
+
+@pytest.mark.django_db
+def test_serializer_reads_snapshot_without_template_queries(templates):
+    task = make_task(401)
+    task.associated_checklists.set(templates)
+    task = CleaningTask.objects.with_related().get(pk=task.pk)
+
+    with CaptureQueriesContext(connection) as context:
+        data = CleaningTaskSerializer(task).data
+
+    assert len(context.captured_queries) == 0
+    assert data["checklist_data"] == ChecklistSnapshot.objects.get().data
+    assert data["associated_checklist_names"] == ["Bathroom", "Bedroom"]
+
+
+@pytest.mark.django_db
+def test_serializer_builds_the_snapshot_once_per_edit(templates, monkeypatch):
+    """
+    set() отправляет post_remove и post_add; снимок при этом строится один раз.
+    set() sends post_remove and post_add; the snapshot is still built once.
+    """
+    task = make_task(501)
+    task.associated_checklists.set(templates)
+    extra = ChecklistTemplate.objects.create(name="Kitchen", cleaning_type=CleaningTypeChoices.STAYOVER)
+    calls = []
+    for_templates = ChecklistSnapshot.objects.for_templates
+    monkeypatch.setattr(
+        ChecklistSnapshot.objects, 'for_templates', lambda items: calls.append(items) or for_templates(items)
+    )
+
+    serializer = CleaningTaskSerializer(
+        task, data={"associated_checklists": [templates[1].id, extra.id]}, partial=True,
+        context={"user_can_manage_checklists": True},
+    )
+    assert serializer.is_valid(), serializer.errors
+    serializer.save()
+
+    assert len(calls) == 1
+    task.refresh_from_db()
+    assert [template["name"] for template in task.checklist_data] == ["Bedroom", "Kitchen"]
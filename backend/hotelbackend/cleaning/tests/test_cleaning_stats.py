@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask
+from hotel.models import Room, Zone
+from users.models import User
+
+
+@pytest.fixture
+def client():
+    manager = User.objects.create_user(username="mgr_stats", password="password", role=User.Role.MANAGER)
+    api_client = APIClient()
+    api_client.force_authenticate(user=manager)
+    return api_client
+
+
+@pytest.fixture
+def tasks():
+    """
+    Задачи на сегодня и вчера: выезды, текущие уборки и уборка зоны (в статистику не входит).
+    Tasks for today and yesterday: departures, stayovers and a zone cleaning (excluded from stats).
+    """
+    today = timezone.localdate()
+    now = timezone.now()
+    rooms = [Room.objects.create(number=900 + index, floor=9) for index in range(4)]
+    zone = Zone.objects.create(name="Lobby", floor=1)
+
+    def task(room, cleaning_type, status, scheduled_date, minutes=None, zone=None):
+        return CleaningTask.objects.create(
+            room=room,
+            zone=zone,
+            cleaning_type=cleaning_type,
+            status=status,
+            scheduled_date=scheduled_date,
+            started_at=now - timedelta(minutes=minutes) if minutes else None,
+            completed_at=now if minutes else None,
+        )
+
+    task(rooms[0], CleaningTypeChoices.DEPARTURE_CLEANING, CleaningTask.Status.WAITING_CHECK, today, minutes=30)
+    task(rooms[1], CleaningTypeChoices.DEPARTURE_CLEANING, CleaningTask.Status.CHECKED, today, minutes=50)
+    task(rooms[2], CleaningTypeChoices.DEPARTURE_CLEANING, CleaningTask.Status.ASSIGNED, today)
+    task(rooms[3], CleaningTypeChoices.STAYOVER, CleaningTask.Status.CHECKED, today, minutes=20)
+    # Завершена, но не проверена — для текущих уборок не считается выполненной
+    # Completed but not checked — does not count as done for stayovers
+    task(rooms[0], CleaningTypeChoices.STAYOVER, CleaningTask.Status.COMPLETED, today, minutes=90)
+    task(None, CleaningTypeChoices.STAYOVER, CleaningTask.Status.CHECKED, today, minutes=5, zone=zone)
+    task(rooms[1], CleaningTypeChoices.DEPARTURE_CLEANING, CleaningTask.Status.CHECKED, today - timedelta(days=1), minutes=40)
+    return today
+
+
+@pytest.mark.django_db
+def test_day_stats_in_one_query(client, tasks, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        response = client.get(reverse('cleaning-stats'), {"scheduled_date": tasks.isoformat()})
+
+    assert response.status_code == 200
+    assert response.data == {
+        "checkoutTotal": 3,
+        "checkoutCompleted": 2,
+        "checkoutAvgTime": 40.0,
+        "currentTotal": 2,
+        "currentCompleted": 1,
+        "currentAvgTime": 20.0,
+    }
+
+
+@pytest.mark.django_db
+def test_range_returns_series_with_empty_days(client, tasks, django_assert_num_queries):
+    date_from = tasks - timedelta(days=2)
+    with django_assert_num_queries(1):
+        response = client.get(reverse('cleaning-stats'), {"date_from": date_from.isoformat(), "date_to": tasks.isoformat()})
+
+    assert response.status_code == 200
+    days = response.data["days"]
+    assert [day["date"] for day in days] == [(date_from + timedelta(days=offset)).isoformat() for offset in range(3)]
+    assert days[0]["checkoutTotal"] == 0
+    assert days[1]["checkoutTotal"] == 1
+    assert days[1]["checkoutAvgTime"] == 40.0
+    assert days[2]["checkoutTotal"] == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [
+    {"date_from": "2025-01-10"},
+    {"date_from": "2025-01-10", "date_to": "bad"},
+    {"date_from": "2025-01-10", "date_to": "2025-01-09"},
+    {"date_from": "2024-01-01", "date_to": "2025-12-31"},
+])
+def test_invalid_range(client, params):
+    assert client.get(reverse('cleaning-stats'), params).status_code == 400
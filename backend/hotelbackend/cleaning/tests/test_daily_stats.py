@@ -0,0 +1,185 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask, DailyCleaningStats
+from hotel.models import Room
+from users.models import User
+
+
+@pytest.fixture
+def housekeepers():
+    return [
+        User.objects.create_user(username=f"hk_daily_{index}", password="password", role=User.Role.HOUSEKEEPER)
+        for index in range(2)
+    ]
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(number=960, floor=9)
+
+
+def _rows():
+    return sorted(
+        DailyCleaningStats.objects.values_list('housekeeper_id', 'total', 'completed', 'checked', 'completed_timed', 'checked_timed'),
+        key=lambda row: (row[0] or 0, row),
+    )
+
+
+@pytest.mark.django_db
+def test_rollup_follows_task_lifecycle(housekeepers, room):
+    today = timezone.localdate()
+    task = CleaningTask.objects.create(
+        room=room,
+        cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING,
+        scheduled_date=today,
+        assigned_to=housekeepers[0],
+        status=CleaningTask.Status.ASSIGNED,
+    )
+    assert _rows() == [(housekeepers[0].id, 1, 0, 0, 0, 0)]
+
+    task.status = CleaningTask.Status.IN_PROGRESS
+    task.started_at = timezone.now() - timedelta(minutes=25)
+    task.save()
+    assert _rows() == [(housekeepers[0].id, 1, 0, 0, 0, 0)]
+
+    task.status = CleaningTask.Status.WAITING_CHECK
+    task.completed_at = timezone.now()
+    task.save()
+    assert _rows() == [(housekeepers[0].id, 1, 1, 0, 1, 0)]
+
+    task.status = CleaningTask.Status.CHECKED
+    task.save()
+    row = DailyCleaningStats.objects.get()
+    assert (row.completed, row.checked, row.checked_timed) == (1, 1, 1)
+    assert abs(row.checked_duration - timedelta(minutes=25)) < timedelta(seconds=1)
+
+
+@pytest.mark.django_db
+def test_reassignment_and_deletion_move_counts(housekeepers, room):
+    today = timezone.localdate()
+    task = CleaningTask.objects.create(
+        room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=today, assigned_to=housekeepers[0]
+    )
+    CleaningTask.objects.create(
+        room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=today, assigned_to=housekeepers[0]
+    )
+
+    # Задача перезагружена из БД — ключ сводки берется из загруженного экземпляра
+    # The task is reloaded from the DB — the rollup key comes from the loaded instance
+    task = CleaningTask.objects.get(pk=task.pk)
+    task.assigned_to = housekeepers[1]
+    task.save()
+    assert _rows() == [(housekeepers[0].id, 1, 0, 0, 0, 0), (housekeepers[1].id, 1, 0, 0, 0, 0)]
+
+    task.delete()
+    assert _rows() == [(housekeepers[0].id, 1, 0, 0, 0, 0)]
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_rollup(housekeepers, room):
+    today = timezone.localdate()
+    now = timezone.now()
+    for offset, housekeeper in enumerate(housekeepers * 3):
+        CleaningTask.objects.create(
+            room=room,
+            cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING,
+            scheduled_date=today - timedelta(days=offset % 2),
+            assigned_to=housekeeper if offset % 3 else None,
+            status=CleaningTask.Status.CHECKED,
+            started_at=now - timedelta(minutes=10 + offset),
+            completed_at=now,
+        )
+    incremental = sorted(DailyCleaningStats.objects.values_list('date', 'housekeeper_id', 'total', 'checked_duration'), key=str)
+
+    DailyCleaningStats.objects.all().delete()
+    call_command('rebuild_daily_cleaning_stats')
+
+    assert sorted(DailyCleaningStats.objects.values_list('date', 'housekeeper_id', 'total', 'checked_duration'), key=str) == incremental
+    assert sum(row[2] for row in incremental) == 6
+
+
+@pytest.mark.django_db
+def test_partial_rebuild_keeps_other_days(housekeepers, room):
+    today = timezone.localdate()
+    for offset in range(3):
+        CleaningTask.objects.create(
+            room=room, cleaning_type=CleaningTypeChoices.STAYOVER,
+            scheduled_date=today - timedelta(days=offset), assigned_to=housekeepers[0],
+        )
+    DailyCleaningStats.objects.filter(date=today).update(total=99)
+
+    call_command('rebuild_daily_cleaning_stats', date_from=today.isoformat(), date_to=today.isoformat())
+
+    assert DailyCleaningStats.objects.count() == 3
+    assert DailyCleaningStats.objects.get(date=today).total == 1
+
+
+@pytest.mark.django_db
+def test_unassigned_tasks_share_one_row(room):
+    """
+    Группа без горничной — одна строка (housekeeper_key=0): повторный пересчет делает upsert, а не дубликат.
+    The unassigned group is one row (housekeeper_key=0): a repeated refresh upserts instead of duplicating.
+    """
+    today = timezone.localdate()
+    for _ in range(2):
+        CleaningTask.objects.create(room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=today)
+    key = (today, CleaningTypeChoices.STAYOVER, None, False)
+    DailyCleaningStats.objects.refresh([key])
+    DailyCleaningStats.objects.refresh([key])
+
+    assert _rows() == [(None, 2, 0, 0, 0, 0)]
+
+
+@pytest.mark.django_db
+def test_deleting_a_housekeeper_moves_counts_to_unassigned(housekeepers, room):
+    today = timezone.localdate()
+    CleaningTask.objects.create(room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=today)
+    CleaningTask.objects.create(
+        room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=today, assigned_to=housekeepers[0]
+    )
+
+    housekeepers[0].delete()
+
+    assert _rows() == [(None, 2, 0, 0, 0, 0)]
+
+
+def _stats_queries(queries):
+    table = DailyCleaningStats._meta.db_table
+    return [query['sql'] for query in queries if table in query['sql']]
+
+
+@pytest.mark.django_db
+def test_saves_without_rollup_changes_skip_refresh(housekeepers, room):
+    """
+    Сохранение без изменения ключа и полей счетчиков не трогает сводку; смена статуса пересчитывает.
+    A save that changes neither the key nor the counted fields leaves the rollup alone; a status change refreshes it.
+    """
+    task = CleaningTask.objects.create(
+        room=room,
+        cleaning_type=CleaningTypeChoices.STAYOVER,
+        scheduled_date=timezone.localdate(),
+        assigned_to=housekeepers[0],
+        status=CleaningTask.Status.ASSIGNED,
+    )
+    task = CleaningTask.objects.get(pk=task.pk)
+
+    with CaptureQueriesContext(connection) as queries:
+        task.notes = "Extra towels"
+        task.save()
+        task.notes = "Extra towels, please"
+        task.save(update_fields=['notes'])
+    assert _stats_queries(queries.captured_queries) == []
+
+    with CaptureQueriesContext(connection) as queries:
+        task.status = CleaningTask.Status.WAITING_CHECK
+        task.completed_at = timezone.now()
+        task.save(update_fields=['status', 'completed_at'])
+    assert _stats_queries(queries.captured_queries)
+    assert _rows() == [(housekeepers[0].id, 1, 1, 0, 0, 0)]
@@ -0,0 +1,114 @@
+import pytest
+from datetime import date, datetime, timedelta
+from django.utils import timezone
+
+from booking.models import Booking
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistPeriodicityResolver, ChecklistRequest, ChecklistTemplate, CleaningTask
+from hotel.models import Room, Zone
+
+SCHEDULED_DATE = date(2025, 7, 10)
+
+
+@pytest.fixture
+def templates():
+    return {
+        "daily": ChecklistTemplate.objects.create(
+            name="Daily_Res", cleaning_type=CleaningTypeChoices.STAYOVER, periodicity=1
+        ),
+        "every_three_days": ChecklistTemplate.objects.create(
+            name="Every3_Res", cleaning_type=CleaningTypeChoices.STAYOVER, periodicity=3
+        ),
+        "weekly_offset": ChecklistTemplate.objects.create(
+            name="WeeklyOffset_Res", cleaning_type=CleaningTypeChoices.STAYOVER, periodicity=7, offset_days=1
+        ),
+        "zone_every_other_day": ChecklistTemplate.objects.create(
+            name="Zone_Res", cleaning_type=CleaningTypeChoices.PUBLIC_AREA_CLEANING, periodicity=2
+        ),
+    }
+
+
+@pytest.fixture
+def stays():
+    """
+    Несколько номеров с проживанием разной длительности.
+    Several rooms with stays of different lengths.
+    """
+    result = []
+    for offset, number in enumerate(range(401, 409)):
+        room = Room.objects.create(number=number, floor=4)
+        check_in = timezone.make_aware(datetime(2025, 7, 1 + offset, 15))
+        booking = Booking.objects.create(
+            room=room, check_in=check_in, check_out=check_in + timedelta(days=20)
+        )
+        result.append((room, booking))
+    return result
+
+
+@pytest.mark.django_db
+def test_batched_resolver_matches_single_calls(templates, stays):
+    """
+    Пакетный резолвер возвращает те же шаблоны, что и одиночные вызовы.
+    The batched resolver returns the same templates as single calls.
+    """
+    room, booking = stays[0]
+    history = CleaningTask.objects.create(
+        room=room, booking=booking, cleaning_type=CleaningTypeChoices.STAYOVER,
+        scheduled_date=SCHEDULED_DATE - timedelta(days=2),
+    )
+    history.associated_checklists.set([templates["every_three_days"]])
+    zone = Zone.objects.create(name="Hall_Res")
+
+    requests = [
+        ChecklistRequest(CleaningTypeChoices.STAYOVER, SCHEDULED_DATE, booking=booking, room=room)
+        for room, booking in stays
+    ] + [ChecklistRequest(CleaningTypeChoices.PUBLIC_AREA_CLEANING, SCHEDULED_DATE, zone=zone)]
+
+    batched = ChecklistPeriodicityResolver().resolve(requests)
+    single = [
+        CleaningTask.determine_applicable_checklists_by_periodicity(
+            cleaning_type=request.cleaning_type,
+            scheduled_date=request.scheduled_date,
+            booking=request.booking,
+            room=request.room,
+            zone=request.zone,
+        )
+        for request in requests
+    ]
+
+    assert batched == single
+    # 9 дней с заезда, но 2 дня с последней задачи с шаблоном — история важнее даты заезда
+    # 9 days since check-in but 2 days since the last task with the template — history wins
+    assert templates["every_three_days"] not in batched[0]
+    assert templates["every_three_days"] in batched[3]
+
+
+@pytest.mark.django_db
+def test_batched_resolver_uses_fixed_number_of_queries(templates, stays, django_assert_num_queries):
+    """
+    Templates + items prefetch + one index query, whatever the number of rooms.
+    Шаблоны + prefetch пунктов + один запрос к индексу при любом числе номеров.
+    """
+    requests = [
+        ChecklistRequest(CleaningTypeChoices.STAYOVER, SCHEDULED_DATE, booking=booking, room=room)
+        for room, booking in stays
+    ]
+
+    with django_assert_num_queries(3):
+        ChecklistPeriodicityResolver().resolve(requests)
+
+
+@pytest.mark.django_db
+def test_resolver_record_affects_later_decisions(templates, stays):
+    """
+    Записанная в памяти задача становится новой точкой отсчета.
+    A task recorded in memory becomes the new reference point.
+    """
+    room, booking = stays[0]
+    resolver = ChecklistPeriodicityResolver()
+    request = ChecklistRequest(CleaningTypeChoices.STAYOVER, SCHEDULED_DATE, booking=booking, room=room)
+    resolver.preload([request])
+
+    resolver.record(room.id, CleaningTypeChoices.STAYOVER, [templates["every_three_days"]], SCHEDULED_DATE - timedelta(days=1))
+
+    assert templates["every_three_days"] not in resolver.resolve([request])[0]
@@ -0,0 +1,268 @@
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import channel_layers
+from channels.testing import WebsocketCommunicator
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Booking
+from cleaning import taskEvents
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask
+from cleaning.taskGenerator import CleaningTaskGenerator
+from hotel.models import Room
+from notifications.consumers import NotificationConsumer
+from users.models import User
+
+
+class RecordingTaskLayer:
+    """
+    Заменитель channel layer: запоминает (группа, события).
+    Stand-in for the channel layer: records (group, events).
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, json.loads(message["text"])["events"]))
+
+
+@pytest.fixture
+def task_layer(monkeypatch):
+    layer = RecordingTaskLayer()
+    monkeypatch.setattr(taskEvents, 'get_channel_layer', lambda: layer)
+    return layer
+
+
+@pytest.fixture
+def housekeepers():
+    return [
+        User.objects.create_user(username=f"hk_events_{index}", password="password", role=User.Role.HOUSEKEEPER)
+        for index in range(2)
+    ]
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(number=970, floor=9)
+
+
+def _by_group(layer):
+    return {group: events for group, events in layer.sent}
+
+
+@pytest.mark.django_db
+def test_task_lifecycle_sends_compact_diffs(task_layer, housekeepers, room, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    with django_capture_on_commit_callbacks(execute=True):
+        task = CleaningTask.objects.create(
+            room=room,
+            cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING,
+            scheduled_date=today,
+        )
+    [(group, [created])] = task_layer.sent
+    assert group == taskEvents.date_group(today)
+    assert created["event"] == taskEvents.CREATED
+    assert created["changes"]["room"] == room.id
+
+    task_layer.sent.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        task.assigned_to = housekeepers[0]
+        task.status = CleaningTask.Status.ASSIGNED
+        task.save()
+    sent = _by_group(task_layer)
+    assert set(sent) == {taskEvents.date_group(today), taskEvents.housekeeper_group(housekeepers[0].id)}
+    [assigned] = sent[taskEvents.date_group(today)]
+    assert assigned["event"] == taskEvents.ASSIGNED
+    assert assigned["changes"] == {"status": CleaningTask.Status.ASSIGNED, "assigned_to": housekeepers[0].id}
+
+    task_layer.sent.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        task.status = CleaningTask.Status.IN_PROGRESS
+        task.save()
+    [started] = _by_group(task_layer)[taskEvents.housekeeper_group(housekeepers[0].id)]
+    assert started["event"] == taskEvents.STARTED
+    assert started["changes"] == {"status": CleaningTask.Status.IN_PROGRESS}
+
+    task_layer.sent.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        task.save()
+    assert task_layer.sent == []
+
+
+@pytest.mark.django_db
+def test_reassignment_reaches_both_housekeepers(task_layer, housekeepers, room, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    with django_capture_on_commit_callbacks(execute=True):
+        task = CleaningTask.objects.create(
+            room=room,
+            cleaning_type=CleaningTypeChoices.STAYOVER,
+            scheduled_date=today,
+            assigned_to=housekeepers[0],
+        )
+    task = CleaningTask.objects.get(pk=task.pk)
+    task_layer.sent.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        task.assigned_to = housekeepers[1]
+        task.is_rush = True
+        task.save()
+
+    sent = _by_group(task_layer)
+    assert set(sent) == {
+        taskEvents.date_group(today),
+        taskEvents.housekeeper_group(housekeepers[0].id),
+        taskEvents.housekeeper_group(housekeepers[1].id),
+    }
+    [event] = sent[taskEvents.housekeeper_group(housekeepers[0].id)]
+    assert event["event"] == taskEvents.ASSIGNED
+    assert event["changes"] == {"assigned_to": housekeepers[1].id, "is_rush": True}
+
+
+@pytest.mark.django_db
+def test_moving_task_and_deleting_notify_old_date(task_layer, room, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    with django_capture_on_commit_callbacks(execute=True):
+        task = CleaningTask.objects.create(
+            room=room,
+            cleaning_type=CleaningTypeChoices.STAYOVER,
+            scheduled_date=today,
+        )
+    task_layer.sent.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        task.scheduled_date = today + timedelta(days=1)
+        task.save()
+    assert set(_by_group(task_layer)) == {
+        taskEvents.date_group(today),
+        taskEvents.date_group(today + timedelta(days=1)),
+    }
+
+    task_layer.sent.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        task_id = task.id
+        task.delete()
+    [(group, [deleted])] = task_layer.sent
+    assert group == taskEvents.date_group(today + timedelta(days=1))
+    assert deleted == {"id": task_id, "event": taskEvents.DELETED, "scheduled_date": (today + timedelta(days=1)).isoformat(), "changes": {}}
+
+
+@pytest.mark.django_db
+def test_generated_tasks_are_sent_as_one_message_per_group(task_layer, django_capture_on_commit_callbacks):
+    today = timezone.localdate()
+    rooms = [Room.objects.create(number=980 + index, floor=9) for index in range(3)]
+    for room in rooms:
+        Booking.objects.create(
+            room=room,
+            check_in=timezone.now() - timedelta(days=2),
+            check_out=timezone.now(),
+        )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        created = CleaningTaskGenerator(today).generate()
+
+    assert len(created) == 3
+    [(group, events)] = task_layer.sent
+    assert group == taskEvents.date_group(today)
+    assert sorted(event["id"] for event in events) == sorted(task.id for task in created)
+    assert {event["event"] for event in events} == {taskEvents.CREATED}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_changes_send_nothing(task_layer, room):
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            CleaningTask.objects.create(
+                room=room,
+                cleaning_type=CleaningTypeChoices.STAYOVER,
+                scheduled_date=timezone.localdate(),
+            )
+            raise RuntimeError
+    assert task_layer.sent == []
+
+    with transaction.atomic():
+        task = CleaningTask.objects.create(
+            room=room,
+            cleaning_type=CleaningTypeChoices.STAYOVER,
+            scheduled_date=timezone.localdate(),
+        )
+    [(_, [created])] = task_layer.sent
+    assert created["id"] == task.id
+
+
+@pytest.mark.django_db
+def test_consumer_routes_task_board_groups(settings, housekeepers):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    channel_layers.backends.clear()
+    manager = User.objects.create_user(username="manager_events", password="password", role=User.Role.MANAGER)
+    tomorrow = timezone.localdate() + timedelta(days=1)
+
+    async def scenario():
+        housekeeper_socket = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        housekeeper_socket.scope["user"] = housekeepers[0]
+        manager_socket = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        manager_socket.scope["user"] = manager
+        assert (await housekeeper_socket.connect())[0]
+        assert (await manager_socket.connect())[0]
+
+        await manager_socket.send_to(text_data=json.dumps({"action": "subscribe_task_board", "date": tomorrow.isoformat()}))
+        assert json.loads(await manager_socket.receive_from()) == {"type": "task_board_subscribed", "date": tomorrow.isoformat()}
+
+        layer = channel_layers['default']
+        events = [{"id": 1, "event": taskEvents.CREATED, "scheduled_date": tomorrow.isoformat(), "changes": {}}]
+        for group in (taskEvents.date_group(tomorrow), taskEvents.housekeeper_group(housekeepers[0].id)):
+            await layer.group_send(group, {"type": "task_event", "message": {"type": "task_events", "events": events}})
+        assert json.loads(await manager_socket.receive_from()) == {"type": "task_events", "events": events}
+        assert json.loads(await housekeeper_socket.receive_from()) == {"type": "task_events", "events": events}
+
+        await housekeeper_socket.send_to(text_data=json.dumps({"action": "subscribe_task_board", "date": tomorrow.isoformat()}))
+        assert json.loads(await housekeeper_socket.receive_from())["type"] == "error"
+
+        await housekeeper_socket.disconnect()
+        await manager_socket.disconnect()
+
+    try:
+        async_to_sync(scenario)()
+    finally:
+        channel_layers.backends.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_savepoint_events_are_not_sent(task_layer, room):
+    with transaction.atomic():
+        kept = CleaningTask.objects.create(
+            room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=timezone.localdate(),
+        )
+        try:
+            with transaction.atomic():
+                CleaningTask.objects.create(
+                    room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=timezone.localdate(),
+                )
+                raise RuntimeError
+        except RuntimeError:
+            pass
+    assert [[event["id"] for event in events] for _, events in task_layer.sent] == [[kept.id]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_sends_one_message_per_group_and_skips_rolled_back_events(task_layer, room):
+    with transaction.atomic(), taskEvents.batch():
+        kept = [
+            CleaningTask.objects.create(
+                room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=timezone.localdate(),
+            )
+            for _ in range(2)
+        ]
+        try:
+            with transaction.atomic():
+                CleaningTask.objects.create(
+                    room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=timezone.localdate(),
+                )
+                raise RuntimeError
+        except RuntimeError:
+            pass
+    [(group, events)] = task_layer.sent
+    assert group == taskEvents.date_group(timezone.localdate())
+    assert [event["id"] for event in events] == [task.id for task in kept]
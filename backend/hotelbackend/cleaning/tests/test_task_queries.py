@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistItemTemplate, ChecklistTemplate, CleaningTask
+from hotel.models import Room, Zone
+from users.models import User
+
+# Потолок запросов не зависит от числа задач: задачи со снимками (+ COUNT пагинации), имена чек-листов
+# The query ceiling does not depend on the number of tasks: tasks with snapshots (+ pagination COUNT), checklist names
+LIST_QUERY_BUDGET = 3
+
+
+@pytest.fixture
+def users():
+    return {
+        "manager": User.objects.create_user(username="mgr_q", password="password", role=User.Role.MANAGER),
+        "housekeeper": User.objects.create_user(username="hk_q", password="password", role=User.Role.HOUSEKEEPER),
+    }
+
+
+@pytest.fixture
+def make_tasks(users):
+    templates = []
+    for index in range(2):
+        template = ChecklistTemplate.objects.create(name=f"Checklist {index}", cleaning_type=CleaningTypeChoices.STAYOVER)
+        for order in range(3):
+            ChecklistItemTemplate.objects.create(checklist_template=template, text=f"Item {order}", order=order)
+        templates.append(template)
+    zone = Zone.objects.create(name="Hall", floor=1)
+    counter = iter(range(1000, 2000))
+
+    def _make(count, status=CleaningTask.Status.ASSIGNED):
+        created = []
+        for _ in range(count):
+            task = CleaningTask.objects.create(
+                room=Room.objects.create(number=next(counter), floor=1),
+                cleaning_type=CleaningTypeChoices.STAYOVER,
+                scheduled_date=timezone.localdate(),
+                status=status,
+                assigned_to=users["housekeeper"],
+                assigned_by=users["manager"],
+                checked_by=users["manager"],
+            )
+            task.associated_checklists.set(templates)
+            created.append(task.pk)
+        created.append(CleaningTask.objects.create(
+            zone=zone, cleaning_type=CleaningTypeChoices.PUBLIC_AREA_CLEANING, scheduled_date=timezone.localdate(),
+        ).pk)
+        # save() выводит статус из назначения — нужный статус проставляем напрямую
+        # save() derives the status from the assignment, so the wanted status is set directly
+        CleaningTask.objects.filter(pk__in=created).update(status=status)
+    return _make
+
+
+def _count_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return len(context.captured_queries), response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("role, url_name, status, params", [
+    ("manager", "cleaningtask-list", CleaningTask.Status.ASSIGNED, {"all": "true"}),
+    ("manager", "cleaningtask-list", CleaningTask.Status.ASSIGNED, {}),
+    ("housekeeper", "cleaningtask-list", CleaningTask.Status.ASSIGNED, {"all": "true"}),
+    ("manager", "cleaningtask-ready-for-check", CleaningTask.Status.WAITING_CHECK, {}),
+])
+def test_list_query_count_does_not_grow(users, make_tasks, role, url_name, status, params):
+    client = APIClient()
+    client.force_authenticate(user=users[role])
+    url = reverse(url_name)
+
+    make_tasks(3, status)
+    small, response = _count_queries(client, url, params)
+    rows = response.data["results"] if "results" in response.data else response.data
+    assert any(row["checklist_data"] and row["checklist_data"][0]["items"] for row in rows)
+
+    make_tasks(20, status)
+    large, _ = _count_queries(client, url, params)
+
+    assert small == large
+    assert large <= LIST_QUERY_BUDGET
+
+
+@pytest.mark.django_db
+def test_retrieve_query_budget(users, make_tasks, django_assert_max_num_queries):
+    make_tasks(1)
+    task = CleaningTask.objects.filter(room__isnull=False).first()
+    client = APIClient()
+    client.force_authenticate(user=users["manager"])
+
+    with django_assert_max_num_queries(2):
+        response = client.get(reverse('cleaningtask-detail', args=[task.id]))
+
+    assert response.status_code == 200
+    assert response.data["assigned_to_name"] == "hk_q"
+    assert [item["text"] for item in response.data["checklist_data"][0]["items"]] == ["Item 0", "Item 1", "Item 2"]
@@ -7,22 +7,28 @@ from rest_framework.decorators import action ,api_view
 from django.utils import timezone 
 from django.db import transaction 
 from django.db.models import Q
+from datetime import timedelta
 
 from .models import ChecklistTemplate, CleaningTask
-from users.models import User, PushToken
+from users.models import User
 from hotel.models import Zone, Room
 from booking.models import Booking
 
 from utills.views import LoggingModelViewSet
-from utills.mixins import AllowAllPaginationMixin
-from utills.calculateAverageDuration import calculate_average_duration
+from utills.mixins import AllowAllPaginationMixin, FieldProjectionMixin
+from utills.responseCache import BOOKINGS, CHECKLISTS, CLEANING_TASKS, ROOMS, USERS, cache_response, conditional_response
 from .cleaningTypeChoices import CleaningTypeChoices 
-from utills.mobileNotifications import send_notifications_in_thread
-from utills.webNotifications import send_broadcast_notification_to_roles
+from utills.notificationService import notification_service
 
 
+from .cleaningStats import MAX_STATS_RANGE_DAYS, cleaning_stats_by_day
+from .taskGenerator import generate_for_dates
+from .tasks import AUTO_GENERATE_JOB, auto_generate_cleaning_tasks
+from . import taskEvents
+from jobs.models import BackgroundJob
 from .serializers import (
     ChecklistTemplateSerializer,
+    CleaningTaskCompactSerializer,
     CleaningTaskSerializer,
     MultipleTaskAssignmentSerializer
 )
@@ -36,6 +42,18 @@ logger = logging.getLogger(__name__)
 
 
 
+def task_identifier(task):
+    """
+    Короткое описание задачи для текста уведомления.
+    Short task description for notification texts.
+    """
+    if task.room:
+        return f"Комната {task.room.number}"
+    if task.zone:
+        return f"Зона {task.zone.name}"
+    return "Новая задача"
+
+
 # --- ChecklistTemplate ViewSet ---
 
 class ChecklistTemplateViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
@@ -55,6 +73,7 @@ class ChecklistTemplateViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
     # Permissions: Requires manager or front desk role / Разрешения: Требуется роль менеджера или службы приема
     permission_classes = [IsAuthenticated, IsManagerOrFrontDesk]
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    @cache_response(CHECKLISTS)
     def available_checklists(self, request):
         """
         Возвращает список доступных шаблонов чек-листов по типу уборки.
@@ -79,7 +98,7 @@ class ChecklistTemplateViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
 
 # --- CleaningTask ViewSet ---
 
-class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.ModelViewSet):
+class CleaningTaskViewSet(FieldProjectionMixin,AllowAllPaginationMixin,LoggingModelViewSet,viewsets.ModelViewSet):
     """
     ViewSet for managing Cleaning Tasks (CleaningTask) with detailed permissions and custom actions.
     - Managers/Admins: Full access to all tasks.
@@ -95,41 +114,29 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
     """
     queryset = CleaningTask.objects.all() # Base queryset / Базовый набор данных
     serializer_class = CleaningTaskSerializer # Serializer class / Класс сериализатора
+    # Списки с ?compact=true — без полей-методов и чек-листов / Lists with ?compact=true skip method fields and checklists
+    compact_serializer_class = CleaningTaskCompactSerializer
 
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        
-        self.perform_create(serializer)
-        task = serializer.instance 
-
-        logger.info(f"Cleaning task {task.id} created by user {request.user.username}.")
 
-        if task.assigned_to:
-            logger.info(f"Task {task.id} was created and immediately assigned to {task.assigned_to.username}. Sending notification.")           
-            
-            try:
-                
-                assigned_housekeeper_tokens_qs = PushToken.objects.filter(
-                    user=task.assigned_to
-                ).values_list('token', flat=True)
-
-                tokens_to_notify = list(assigned_housekeeper_tokens_qs)
-
-                if tokens_to_notify:
-                    title = "Новая задача назначена!"
-                    task_identifier = ""
-                    if task.room:
-                        task_identifier = f"Комната {task.room.number}"
-                    elif task.zone:
-                        task_identifier = f"Зона {task.zone.name}"
-                    else:
-                        task_identifier = "Новая задача" 
-
-                    body = f"{task_identifier}: Вам назначена новая задача на уборку."
-                    
-                    data = {
+        # Задача и уведомление о ней записываются в одной транзакции
+        # The task and its notification are written in one transaction
+        with transaction.atomic():
+            self.perform_create(serializer)
+            task = serializer.instance 
+
+            logger.info(f"Cleaning task {task.id} created by user {request.user.username}.")
+
+            if task.assigned_to:
+                logger.info(f"Task {task.id} was created and immediately assigned to {task.assigned_to.username}. Queueing notification.")
+                notification_service.notify(
+                    "task_assigned",
+                    "Новая задача назначена!",
+                    f"{task_identifier(task)}: Вам назначена новая задача на уборку.",
+                    {
                         "notification_type": "new_task_assigned", # Явный тип уведомления для клиента
                         "task_id": str(task.id),
                         "room_number": task.room.number if task.room else None,
@@ -137,22 +144,13 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
                         "cleaning_type": task.cleaning_type,
                         "scheduled_date": str(task.scheduled_date),
                         "assigned_housekeeper_id": str(task.assigned_to.id),
-                    }
-
-                    send_notifications_in_thread(
-                        tokens_to_notify,
-                        title,
-                        body,
-                        data
-                    )
-                    logger.info(f"Notification sent for new assigned task {task.id} to {task.assigned_to.username}.")
-                else:
-                    logger.warning(f"No push tokens found for assigned housekeeper {task.assigned_to.username} for new task {task.id}.")
-
-            except Exception as e:
-                logger.error(f"Error sending notification for new task {task.id} assigned to {task.assigned_to.username}: {e}", exc_info=True)
-        else:
-            logger.info(f"Task {task.id} created but not immediately assigned. No specific housekeeper notification sent.")
+                    },
+                    users=[task.assigned_to],
+                    persist=True,
+                    dedup_key=f"task_assigned:{task.id}:{task.assigned_to.id}",
+                )
+            else:
+                logger.info(f"Task {task.id} created but not immediately assigned. No specific housekeeper notification sent.")
 
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
@@ -164,35 +162,20 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
        
         serializer = self.get_serializer(task, data=request.data)
         serializer.is_valid(raise_exception=True)
-        
-        self.perform_update(serializer)
-        task = serializer.instance 
 
-        logger.info(f"Cleaning task {task.id} fully updated by user {request.user.username}.")
+        with transaction.atomic():
+            self.perform_update(serializer)
+            task = serializer.instance 
 
-        if task.assigned_to and task.assigned_to != old_assigned_to:
-            logger.info(f"Task {task.id} was assigned/reassigned to {task.assigned_to.username} during full update. Sending notification.")
-            try:
-                
-                assigned_housekeeper_tokens_qs = PushToken.objects.filter(
-                    user=task.assigned_to
-                ).values_list('token', flat=True)
-
-                tokens_to_notify = list(assigned_housekeeper_tokens_qs)
-
-                if tokens_to_notify:
-                    title = "Новая задача назначена!"
-                    task_identifier = ""
-                    if task.room:
-                        task_identifier = f"Комната {task.room.number}"
-                    elif task.zone:
-                        task_identifier = f"Зона {task.zone.name}"
-                    else:
-                        task_identifier = "Новая задача" 
+            logger.info(f"Cleaning task {task.id} fully updated by user {request.user.username}.")
 
-                    body = f"{task_identifier}: Вам назначена новая задача на уборку."
-                    
-                    data = {
+            if task.assigned_to and task.assigned_to != old_assigned_to:
+                logger.info(f"Task {task.id} was assigned/reassigned to {task.assigned_to.username} during full update. Queueing notification.")
+                notification_service.notify(
+                    "task_assigned",
+                    "Новая задача назначена!",
+                    f"{task_identifier(task)}: Вам назначена новая задача на уборку.",
+                    {
                         "notification_type": "single_task_assigned", 
                         "task_id": str(task.id),
                         "room_number": task.room.number if task.room else None,
@@ -200,22 +183,13 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
                         "cleaning_type": task.cleaning_type,
                         "scheduled_date": str(task.scheduled_date),
                         "assigned_housekeeper_id": str(task.assigned_to.id),
-                    }
-
-                    send_notifications_in_thread(
-                        tokens_to_notify,
-                        title,
-                        body,
-                        data
-                    )
-                    logger.info(f"Notification sent for assigned task {task.id} to {task.assigned_to.username} during full update.")
-                else:
-                    logger.warning(f"No push tokens found for assigned housekeeper {task.assigned_to.username} for task {task.id} during full update.")
-
-            except Exception as e:
-                logger.error(f"Error sending notification for task {task.id} assigned to {task.assigned_to.username} during full update: {e}", exc_info=True)
-        else:
-            logger.info(f"Task {task.id} fully updated, but 'assigned_to' field was not changed or is still unassigned. No specific housekeeper notification sent.")
+                    },
+                    users=[task.assigned_to],
+                    persist=True,
+                    dedup_key=f"task_assigned:{task.id}:{task.assigned_to.id}",
+                )
+            else:
+                logger.info(f"Task {task.id} fully updated, but 'assigned_to' field was not changed or is still unassigned. No specific housekeeper notification sent.")
        
         return Response(serializer.data)
 
@@ -244,7 +218,7 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         user = self.request.user
         logger.info(f"Filtering CleaningTask queryset for user {user} with role {user.role}.")
         
-        queryset = CleaningTask.objects.all()
+        queryset = CleaningTask.objects.with_related()
 
         if self.action == 'list':
             # Get the scheduled date from query parameters, default to today if not provided
@@ -284,10 +258,19 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         logger.debug("User is neither Manager/Admin nor Housekeeper, returning empty queryset.")
         return CleaningTask.objects.none()
     
+    # Список опрашивается приложениями: ETag из версий задач, номеров, пользователей и чек-листов,
+    # неизменившийся опрос получает 304 без запроса к БД
+    # The list is polled by the apps: the ETag comes from task, room, user and checklist versions,
+    # an unchanged poll gets a 304 without a DB query
+    @conditional_response(CLEANING_TASKS, ROOMS, USERS, CHECKLISTS, per_user=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def retrieve(self, request, pk=None):
         logger.info(f"Attempting to retrieve task with ID: {pk}")
+        queryset = self.project_queryset(CleaningTask.objects.with_related())
         try:
-            task = self.queryset.get(pk=pk)
+            task = queryset.get(pk=pk)
             serializer = self.get_serializer(task)
             logger.info(f"Task found: {task}")
             return Response(serializer.data)
@@ -413,59 +396,40 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         # Проверяем, можно ли начать задачу из текущего статуса
         if task.status in [CleaningTask.Status.UNASSIGNED, CleaningTask.Status.ASSIGNED]:
             logger.info(f"Task {task.pk} status is {task.get_status_display()}, allowing start.")
-            task.status = CleaningTask.Status.IN_PROGRESS # Set status to IN_PROGRESS / Устанавливаем статус "В процессе уборки"
-            task.started_at = timezone.now() # Set start time / Устанавливаем время начала
-            task.save(update_fields=['status', 'started_at']) # Save only the changed fields / Сохраняем только измененные поля
-
-            if task.room:
-                room = task.room
-                room.status = Room.Status.IN_PROGRESS  
-                room.save(update_fields=['status']) 
-                logger.info(f"Room {room.number} status changed to 'in_progress'.")
-
-                title = "Уборка начата"
-                body = f"Уборка номера {room.number} начата горничной {user.first_name} {user.last_name}"
-                data = {
-                        "task_id": str(task.id),
-                        "room_number": room.number,
-                        "cleaning_type": task.cleaning_type,
-                        "notification_type": "cleaning_started",
-                    
-                    }
-
-                send_broadcast_notification_to_roles(
-                        title=title,
-                        body=body,
-                        notification_type="task_started_web",
-                        data=data,
-                        roles_to_notify=[User.Role.MANAGER, User.Role.FRONT_DESK] 
+            with transaction.atomic():
+                task.status = CleaningTask.Status.IN_PROGRESS # Set status to IN_PROGRESS / Устанавливаем статус "В процессе уборки"
+                task.started_at = timezone.now() # Set start time / Устанавливаем время начала
+                task.save(update_fields=['status', 'started_at']) # Save only the changed fields / Сохраняем только измененные поля
+
+                if task.room:
+                    room = task.room
+                    room.status = Room.Status.IN_PROGRESS  
+                    room.save(update_fields=['status']) 
+                    logger.info(f"Room {room.number} status changed to 'in_progress'.")
+
+                    # Web и push отправляются вместе из outbox после фиксации транзакции
+                    # Web and push are delivered together from the outbox after commit
+                    notification_service.notify(
+                        "cleaning_started",
+                        "Уборка начата",
+                        f"Уборка номера {room.number} начата горничной {user.first_name} {user.last_name}",
+                        {
+                            "task_id": str(task.id),
+                            "room_number": room.number,
+                            "cleaning_type": task.cleaning_type,
+                            "notification_type": "cleaning_started",
+                        },
+                        web_type="task_started_web",
+                        web_roles=[User.Role.MANAGER, User.Role.FRONT_DESK],
+                        roles=[User.Role.FRONT_DESK],
+                        persist=True,
+                        dedup_key=f"task_started:{task.id}",
                     )
-                try:
-
-                    frontdesk_tokens_qs = PushToken.objects.filter(
-                        user__role = User.Role.FRONT_DESK
-                    ).values_list('token', flat=True)
-                    tokens_to_notify = list(frontdesk_tokens_qs)
-
-                    if tokens_to_notify:
-                        send_notifications_in_thread(
-                            tokens_to_notify,
-                            title,
-                            body,
-                            data
-                        )
-                        logger.info(f"Notification sent for starting task {task.id} for room {room.number}")
-                    else:
-                        logger.warning(f"No push tokens found for FRONT_DESK users to send starting notification for task {task.id}.")
-                except Exception as e:
-                        logger.error(f"Error sending starting notification for task {task.id}: {e}", exc_info=True)
-
-                logger.info(f"Room {room.number} status changed to 'waiting_inspection'.")
-            if task.zone:
-                zone = task.zone
-                zone.status = Zone.Status.IN_PROGRESS  
-                zone.save(update_fields=['status']) 
-                logger.info(f"Zone {zone.name} status changed to 'in_progress'.")
+                if task.zone:
+                    zone = task.zone
+                    zone.status = Zone.Status.IN_PROGRESS  
+                    zone.save(update_fields=['status']) 
+                    logger.info(f"Zone {zone.name} status changed to 'in_progress'.")
             logger.info(f"Task {task.pk} started successfully by user {user}.")
             serializer = self.get_serializer(task) # Serialize the updated object / Сериализуем обновленный объект
         
@@ -497,72 +461,47 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         # Проверяем, можно ли завершить задачу из текущего статуса
         if task.status == CleaningTask.Status.IN_PROGRESS:
             logger.info(f"Task {task.pk} status is {task.get_status_display()}, allowing completion.")
-            if  task.cleaning_type == None or task.cleaning_type == CleaningTypeChoices.STAYOVER or task.cleaning_type == CleaningTypeChoices.PUBLIC_AREA_CLEANING:
-                task.status = CleaningTask.Status.CHECKED 
-            else:
-                task.status = CleaningTask.Status.WAITING_CHECK 
-             
-
-            task.completed_at = timezone.now() # Set completion time / Устанавливаем время завершения
-            task.save(update_fields=['status', 'completed_at'])
-
-            if task.room:
-                room = task.room
-                if task.cleaning_type == CleaningTypeChoices.STAYOVER or task.cleaning_type == CleaningTypeChoices.ON_DEMAND:
-                    room.status = Room.Status.OCCUPIED 
-                    logger.info(f"Room {room.number} status changed to 'occupied'.")
+            with transaction.atomic():
+                if  task.cleaning_type == None or task.cleaning_type == CleaningTypeChoices.STAYOVER or task.cleaning_type == CleaningTypeChoices.PUBLIC_AREA_CLEANING:
+                    task.status = CleaningTask.Status.CHECKED 
                 else:
-                    room.status = Room.Status.WAITING_INSPECTION 
+                    task.status = CleaningTask.Status.WAITING_CHECK 
 
-                    title = "Уборка завершена"
-                    body = f"Уборка номера {room.number} завершена. Требуется проверка."
-                    data = {
-                        "task_id": str(task.id),
-                        "room_number": room.number,
-                        "cleaning_type": task.cleaning_type,
-                        "notification_type": "cleaning_completed_for_inspection",
-                    
-                    }
-
-                    send_broadcast_notification_to_roles(
-                        title=title,
-                        body=body,
-                        notification_type="task_completed_web",
-                        data=data,
-                        roles_to_notify=[User.Role.MANAGER, User.Role.FRONT_DESK] 
-                    )
-                
-                    try:
-
-
-                        frontdesk_tokens_qs = PushToken.objects.filter(
-                            user__role = User.Role.FRONT_DESK
-                        ).values_list('token', flat=True)
-
-                        tokens_to_notify = list(frontdesk_tokens_qs)
-
-                        if tokens_to_notify:
-                            
-
-                            send_notifications_in_thread(
-                                tokens_to_notify,
-                                title,
-                                body,
-                                data
-                            )
-                            logger.info(f"Notification sent for completed task {task.id} for room {room.number} (awaiting inspection).")
-                        else:
-                            logger.warning(f"No push tokens found for FRONT_DESK users to send completion notification for task {task.id}.")
-                    except Exception as e:
-                            logger.error(f"Error sending completion notification for task {task.id}: {e}", exc_info=True)
-                    logger.info(f"Room {room.number} status changed to 'waiting_inspection'.")
-                room.save(update_fields=['status'])
-            if task.zone:
-                zone = task.zone
-                zone.status = Zone.Status.CLEAN
-                zone.save(update_fields=['status'])
-                logger.info(f"Zone new status {zone.status}.")
-                logger.info(f"Zone {zone.name} status changed to 'clean'.")
+                task.completed_at = timezone.now() # Set completion time / Устанавливаем время завершения
+                task.save(update_fields=['status', 'completed_at'])
+
+                if task.room:
+                    room = task.room
+                    if task.cleaning_type == CleaningTypeChoices.STAYOVER or task.cleaning_type == CleaningTypeChoices.ON_DEMAND:
+                        room.status = Room.Status.OCCUPIED 
+                        logger.info(f"Room {room.number} status changed to 'occupied'.")
+                    else:
+                        room.status = Room.Status.WAITING_INSPECTION 
+
+                        notification_service.notify(
+                            "cleaning_completed",
+                            "Уборка завершена",
+                            f"Уборка номера {room.number} завершена. Требуется проверка.",
+                            {
+                                "task_id": str(task.id),
+                                "room_number": room.number,
+                                "cleaning_type": task.cleaning_type,
+                                "notification_type": "cleaning_completed_for_inspection",
+                            },
+                            web_type="task_completed_web",
+                            web_roles=[User.Role.MANAGER, User.Role.FRONT_DESK],
+                            roles=[User.Role.FRONT_DESK],
+                            persist=True,
+                            dedup_key=f"task_completed:{task.id}",
+                        )
+                        logger.info(f"Room {room.number} status changed to 'waiting_inspection'.")
+                    room.save(update_fields=['status'])
+                if task.zone:
+                    zone = task.zone
+                    zone.status = Zone.Status.CLEAN
+                    zone.save(update_fields=['status'])
+                    logger.info(f"Zone new status {zone.status}.")
+                    logger.info(f"Zone {zone.name} status changed to 'clean'.")
             serializer = self.get_serializer(task)
             logger.info(f"Task {task.pk} completed successfully by user {request.user}.")
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -683,6 +622,14 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         - Уборка после выезда: если у бронирования выезд в указанную дату
         - Текущая уборка: если гость живёт, но не выезжает в указанную дату
         - Задачи по зонам: для всех зон, если задача еще не существует
+
+        Необязательный параметр days (1-31) генерирует задачи на несколько дней подряд.
+        С ?async=true генерация выполняется в Celery: ответ 202 с job_id,
+        статус и результат доступны по /api/jobs/<job_id>/.
+
+        Optional days (1-31) generates tasks for several consecutive days.
+        With ?async=true generation runs in Celery: the response is 202 with a job_id,
+        status and result are polled at /api/jobs/<job_id>/.
         """
         scheduled_date_str = request.data.get('scheduled_date')
         if scheduled_date_str:
@@ -693,142 +640,34 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         else:
             scheduled_date = timezone.localdate()
 
-        created_tasks_count = 0
-        created_tasks_details = []
-
-        # Вспомогательная функция для создания и обработки задачи, избегая повторений
-        def create_and_process_task(room=None, zone=None, cleaning_type=None, booking=None, notes="", assigned_by_user=None):
-            nonlocal created_tasks_count
-
-            # Проверка на существование задачи
-            query_filters = {
-                'scheduled_date': scheduled_date,
-                'cleaning_type': cleaning_type,
-            }
-            if room:
-                query_filters['room'] = room
-            if zone:
-                query_filters['zone'] = zone
-          
-            if booking and room: 
-                query_filters['booking'] = booking
-           
-
-            exists = CleaningTask.objects.filter(**query_filters).exists()
-
-            if not exists:
-                task = CleaningTask(
-                    room=room,
-                    zone=zone,
-                    booking=booking,
-                    scheduled_date=scheduled_date,
-                    cleaning_type=cleaning_type,
-                    status=CleaningTask.Status.UNASSIGNED,
-                    assigned_by=assigned_by_user, 
-                    notes=notes
-                )
-                
-      
-                applicable_checklists = CleaningTask.determine_applicable_checklists_by_periodicity(
-                    cleaning_type=task.cleaning_type,
-                    scheduled_date=task.scheduled_date,
-                    booking=task.booking,
-                    room=task.room,
-                    zone=task.zone,
-                )
-
-               
-                task.save() 
-                
-               
-                task.associated_checklists.set(applicable_checklists)
-
-              
-                task.checklist_data = ChecklistTemplateSerializer(
-                    sorted(applicable_checklists, key=lambda x: x.name), 
-                    many=True,
-                    context={'request': request} 
-                ).data
-                
-                
-                task.save()
-
-                created_tasks_count += 1
-                if room:
-                    created_tasks_details.append(f"Комната {room.number} ({cleaning_type})")
-                elif zone:
-                    created_tasks_details.append(f"Зона {zone.name} ({cleaning_type})")
-                return task
-            return None
-
-        # --- Уборка после выезда ---
-        checkout_bookings = Booking.objects.filter(check_out__date=scheduled_date).select_related("room")
-        for booking in checkout_bookings:
-            if booking.room:
-                notes = ""
-                standard_guests_for_preparation = booking.room.room_type.default_prepared_guests if booking.room.room_type else 2 
-                next_booking = Booking.objects.filter(
-                    check_in__date=scheduled_date,
-                    room=booking.room,
-                ).exclude(pk=booking.pk).first() 
-
-                if next_booking and next_booking.guest_count > standard_guests_for_preparation:
-                    notes = f"Подготовить номер для {next_booking.guest_count} гостей."
-
-                create_and_process_task(
-                    room=booking.room,
-                    cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING,
-                    booking=booking,
-                    notes=notes,
-                    assigned_by_user=request.user
-                )
-
-        # --- Текущая уборка ---
-        staying_bookings = Booking.objects.filter(
-            check_in__date__lt=scheduled_date,
-            check_out__date__gt=scheduled_date
-        ).select_related("room")
-
-        for booking in staying_bookings:
-            if booking.room:
-                create_and_process_task(
-                    room=booking.room,
-                    cleaning_type=CleaningTypeChoices.STAYOVER,
-                    booking=booking,
-                    assigned_by_user=request.user
-                )
-
-        # --- Подготовка номера к заезду ---
-        preparing_bookings = Booking.objects.filter(
-                    check_in__date=scheduled_date,
-                ).select_related("room", "room__room_type")
-
-        for booking in preparing_bookings:
-            if booking.room:
-                standard_guests_for_preparation = booking.room.room_type.default_prepared_guests if booking.room.room_type else 2
-                
-                has_checkout_today_for_room = Booking.objects.filter(
-                    check_out__date=scheduled_date,
-                    room=booking.room
-                ).exclude(pk=booking.pk).exists()
-
-                if booking.guest_count > standard_guests_for_preparation and not has_checkout_today_for_room:
-                    notes = f"Подготовить номер для {booking.guest_count} гостей."
-                    create_and_process_task(
-                        room=booking.room,
-                        cleaning_type=CleaningTypeChoices.PRE_ARRIVAL,
-                        booking=booking,
-                        notes=notes,
-                        assigned_by_user=request.user
-                    )
-        # --- Зоны ---
-        zones = Zone.objects.all()
-        for zone in zones:
-            create_and_process_task(
-                zone=zone,
-                cleaning_type=CleaningTypeChoices.PUBLIC_AREA_CLEANING, # Тип для зон
-                assigned_by_user=request.user
+        try:
+            days = int(request.data.get('days', 1))
+        except (TypeError, ValueError):
+            days = 0
+        if not 1 <= days <= 31:
+            return Response({"detail": "Параметр days должен быть целым числом от 1 до 31."}, status=status.HTTP_400_BAD_REQUEST)
+        scheduled_dates = [scheduled_date + timedelta(days=offset) for offset in range(days)]
+
+        if request.query_params.get('async') == 'true':
+            job = BackgroundJob.objects.create(
+                job_type=AUTO_GENERATE_JOB,
+                params={"scheduled_dates": [value.isoformat() for value in scheduled_dates]},
+                created_by=request.user,
             )
+            # Задача ставится в очередь только после фиксации транзакции с BackgroundJob
+            # The task is queued only after the transaction holding the BackgroundJob commits
+            transaction.on_commit(lambda: auto_generate_cleaning_tasks.delay(
+                str(job.id), job.params["scheduled_dates"], request.user.id
+            ))
+            return Response({
+                "job_id": str(job.id),
+                "status": job.status,
+                "message": "Генерация задач запущена в фоне."
+            }, status=status.HTTP_202_ACCEPTED)
+
+        # Пакетная генерация: фиксированное число запросов независимо от количества номеров
+        # Set-based generation: a fixed number of queries regardless of the number of rooms
+        created_tasks_count, created_tasks_details = generate_for_dates(scheduled_dates, assigned_by=request.user)
 
         return Response({
             "created_count": created_tasks_count,
@@ -872,7 +711,9 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
 
             task_num_assigned = 0
            
-            with transaction.atomic(): 
+            # Одно сообщение доски задач на группу для всего назначения
+            # One task board message per group for the whole assignment
+            with transaction.atomic(), taskEvents.batch():
                 for task in tasks_to_assign:
                     
                     
@@ -888,33 +729,21 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
                 logger.info(f"{task_num_assigned} tasks assigned to housekeeper {assigned_housekeeper.username} for {scheduled_date}.")
 
                 
-                housekeepers_tokens_qs = PushToken.objects.filter(
-                    user=assigned_housekeeper
-                ).values_list('token', flat=True)
-                
-                tokens_to_notify = list(housekeepers_tokens_qs)
-
-                if tokens_to_notify:
-                    title = "Задачи назначены"
-                    body = f"Вам назначили {task_num_assigned} новых задач на {scheduled_date.strftime('%d.%m.%Y')}" # Форматируем дату
-
-                    data = {
+                notification_service.notify(
+                    "tasks_assigned",
+                    "Задачи назначены",
+                    f"Вам назначили {task_num_assigned} новых задач на {scheduled_date.strftime('%d.%m.%Y')}", # Форматируем дату
+                    {
                         "notification_type": "multiple_tasks_assigned",
                         "task_ids": list(task_ids),
                         "assigned_housekeeper_id": str(housekeeper_id),
                         "scheduled_date": str(scheduled_date), 
                         "num_tasks": task_num_assigned,
-                    }
-
-                    send_notifications_in_thread(
-                        tokens_to_notify,
-                        title,
-                        body,
-                        data
-                    )
-                    logger.info(f"Notifications sent for {task_num_assigned} tasks assigned to housekeeper {assigned_housekeeper.username}.")
-                else:
-                    logger.warning(f"No active push tokens found for housekeeper {assigned_housekeeper.username} (ID: {housekeeper_id}) to send assignment notification.")
+                    },
+                    users=[assigned_housekeeper],
+                    persist=True,
+                )
+                logger.info(f"Notification queued for {task_num_assigned} tasks assigned to housekeeper {assigned_housekeeper.username}.")
 
             return Response({"detail": f"Задачи успешно назначены: {task_num_assigned}."}, status=status.HTTP_200_OK)
         else:
@@ -929,51 +758,34 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
             return Response({"detail": "is_rush field is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         old_is_rush = task.is_rush
-        task.is_rush = bool(is_rush)
-        task.save()
-
-        if task.is_rush and not old_is_rush:
-            logger.info(f"Task {task.id} set to RUSH by {request.user.username}. Sending notification to assigned housekeeper.")
-
-            if task.assigned_to and task.assigned_to.role == User.Role.HOUSEKEEPER:
-                try:
-                    # ИЗМЕНЕНИЕ: Убран фильтр is_active, так как такого поля нет в вашей модели PushToken
-                    assigned_housekeeper_tokens_qs = PushToken.objects.filter(
-                        user=task.assigned_to
-                    ).values_list('token', flat=True) #
-
-                    tokens_to_notify = list(assigned_housekeeper_tokens_qs)
-
-                    if tokens_to_notify:
-                        title = "СРОЧНАЯ ЗАДАЧА!"
-                        body = (
+        with transaction.atomic():
+            task.is_rush = bool(is_rush)
+            task.save()
+
+            if task.is_rush and not old_is_rush:
+                logger.info(f"Task {task.id} set to RUSH by {request.user.username}. Queueing notification to assigned housekeeper.")
+
+                if task.assigned_to and task.assigned_to.role == User.Role.HOUSEKEEPER:
+                    notification_service.notify(
+                        "task_rush",
+                        "СРОЧНАЯ ЗАДАЧА!",
+                        (
                             f"Комната {task.room.number} теперь срочная! Статус: {task.get_status_display()}."
                             if task.room
                             else f"Зона {task.zone.name} теперь срочная! Статус: {task.get_status_display()}."
-                        )
-                        data = {
+                        ),
+                        {
                             "task_id": str(task.id),
                             "room_number": task.room.number if task.room else None,
                             "zone_name": task.zone.name if task.zone else None,
                             "is_rush": True
-                        }
-
-                        send_notifications_in_thread(
-                            tokens_to_notify,
-                            title,
-                            body,
-                            data
-                        )
-                        logger.info(f"Rush notification sent to assigned housekeeper for task {task.id}.")
-                    else:
-                        logger.warning(f"No push tokens found for assigned housekeeper {task.assigned_to.username} for task {task.id}.")
-                except ImportError:
-                    logger.error("PushToken model not found. Cannot send push notifications for rush tasks. "
-                                 "Please ensure 'from users.models import PushToken' is correct or adjust token retrieval logic.")
-                except Exception as e:
-                    logger.error(f"Error sending rush notification for task {task.id}: {e}", exc_info=True)
-            else:
-                logger.info(f"Task {task.id} has no assigned housekeeper or assigned user is not a housekeeper. No rush notification sent.")
+                        },
+                        users=[task.assigned_to],
+                        persist=True,
+                        dedup_key=f"task_rush:{task.id}",
+                    )
+                else:
+                    logger.info(f"Task {task.id} has no assigned housekeeper or assigned user is not a housekeeper. No rush notification sent.")
 
         serializer = self.get_serializer(task)
         return Response(serializer.data)
@@ -987,9 +799,9 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         # Удаляем фильтрацию по scheduled_date, если фронтенд должен получать все даты
         # Если нужна фильтрация по дате, фронтенд должен передавать scheduled_date
         
-        tasks = CleaningTask.objects.filter(
+        tasks = self.project_queryset(CleaningTask.objects.with_related()).filter(
             Q(status=CleaningTask.Status.WAITING_CHECK) | Q(status=CleaningTask.Status.COMPLETED)
-        ).select_related('room', 'booking') # Добавьте select_related для оптимизации запросов к связанным объектам
+        )
 
         tasks = tasks.order_by('-is_rush', 'due_time') 
 
@@ -997,76 +809,52 @@ class CleaningTaskViewSet(AllowAllPaginationMixin,LoggingModelViewSet,viewsets.M
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
+@cache_response(CLEANING_TASKS, BOOKINGS)
 def get_cleaning_stats(request):
     """
-    Получает статистику по задачам уборки.
+    Получает статистику по задачам уборки одним запросом к БД.
+    - ?scheduled_date=YYYY-MM-DD (по умолчанию сегодня) — статистика за день;
+    - ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD — ряд по дням за период (не более MAX_STATS_RANGE_DAYS).
+    Ответ кэшируется до изменения задач уборки или бронирований.
+
+    Returns cleaning task stats with a single DB query.
+    - ?scheduled_date=YYYY-MM-DD (defaults to today) — stats for one day;
+    - ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD — a per-day series for the period (at most MAX_STATS_RANGE_DAYS).
+    The response is cached until cleaning tasks or bookings change.
     """
+    date_from_str = request.query_params.get('date_from')
+    date_to_str = request.query_params.get('date_to')
     try:
-        # --- Общая статистика ---
+        if date_from_str or date_to_str:
+            try:
+                date_from = timezone.datetime.strptime(date_from_str or '', '%Y-%m-%d').date()
+                date_to = timezone.datetime.strptime(date_to_str or '', '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {"detail": "Параметры 'date_from' и 'date_to' обязательны в формате YYYY-MM-DD."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if date_from > date_to or (date_to - date_from).days >= MAX_STATS_RANGE_DAYS:
+                return Response(
+                    {"detail": f"Период должен быть от 1 до {MAX_STATS_RANGE_DAYS} дней."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            days = cleaning_stats_by_day(date_from, date_to)
+            return Response({
+                "dateFrom": date_from.isoformat(),
+                "dateTo": date_to.isoformat(),
+                "days": [{"date": day.isoformat(), **stats} for day, stats in days.items()],
+            }, status=status.HTTP_200_OK)
+
         scheduled_date_str = request.query_params.get('scheduled_date')
-        scheduled_date = None
+        scheduled_date = timezone.localdate()
         if scheduled_date_str:
             try:
                 scheduled_date = timezone.datetime.strptime(scheduled_date_str, '%Y-%m-%d').date()
             except ValueError:
                 logger.warning("Invalid date format. Expected YYYY-MM-DD.")
-                scheduled_date = timezone.localdate()
-        else:
-            scheduled_date = timezone.localdate()
-
-        # --- ЗАДАЧИ ПОСЛЕ ВЫЕЗДА ---
-        checkout_tasks = CleaningTask.objects.filter(
-            cleaning_type= CleaningTypeChoices.DEPARTURE_CLEANING
-        )
-        
-        if scheduled_date:
-            checkout_tasks = checkout_tasks.filter(scheduled_date=scheduled_date)
-        
-        checkout_total = checkout_tasks.count()
-        checkout_completed = checkout_tasks.filter(
-            status__in=[CleaningTask.Status.WAITING_CHECK,CleaningTask.Status.CHECKED,CleaningTask.Status.COMPLETED,]
-        ).count()
-
-        # Среднее время уборки для выездов
-        completed_checkout_tasks = checkout_tasks.filter(
-            status__in=[CleaningTask.Status.WAITING_CHECK,CleaningTask.Status.CHECKED,CleaningTask.Status.COMPLETED,],
-            started_at__isnull=False,
-            completed_at__isnull=False
-        )
-        
-        logger.info(f"Completed checkout tasks count: {completed_checkout_tasks.count()}")
-        checkout_avg_time = calculate_average_duration(completed_checkout_tasks, "checkout")
-
-        # --- ТЕКУЩИЕ ЗАДАЧИ ---
-        current_tasks = CleaningTask.objects.filter( cleaning_type=CleaningTypeChoices.STAYOVER,zone__isnull=True) 
-        
-        if scheduled_date:
-            current_tasks = current_tasks.filter(scheduled_date=scheduled_date)
-        
-        current_total = current_tasks.count()
-        current_completed = current_tasks.filter(
-            status=CleaningTask.Status.CHECKED
-        ).count()
-
-        # Среднее время уборки для текущих задач
-        completed_current_tasks = current_tasks.filter(
-            status=CleaningTask.Status.CHECKED,
-            started_at__isnull=False,
-            completed_at__isnull=False
-        )
-        
-        logger.info(f"Completed current tasks count: {completed_current_tasks.count()}")
-        current_avg_time = calculate_average_duration(completed_current_tasks, "current")
-
-        stats = {
-            "checkoutTotal": checkout_total,
-            "checkoutCompleted": checkout_completed,
-            "checkoutAvgTime": checkout_avg_time,
-            "currentTotal": current_total,
-            "currentCompleted": current_completed,
-            "currentAvgTime": current_avg_time,
-        }
 
+        stats = cleaning_stats_by_day(scheduled_date, scheduled_date)[scheduled_date]
         return Response(stats, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Откат транзакции теста не отправляет сигналы инвалидации — кэши очищаются между тестами.
+    Rolling back a test transaction sends no invalidation signals, so caches are cleared between tests.
+    """
+    from utills.pushTokenCache import push_token_cache
+
+    for cache in caches.all():
+        cache.clear()
+    push_token_cache.clear()
+    yield
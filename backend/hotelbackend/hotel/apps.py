@@ -5,4 +5,6 @@ class HotelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hotel'
 
-   
+    def ready(self):
+        # Регистрация обработчиков сигналов / Register signal handlers
+        from . import signals  # noqa: F401
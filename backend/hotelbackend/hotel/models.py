@@ -1,5 +1,7 @@
 from django.db import models
 
+from sync.models import ChangeTrackedModel
+
 # --- RoomType Model ---
 # Модель для представления типов номеров в отеле (например, "Стандарт", "Люкс").
 # Model for representing types of rooms in the hotel (e.g., "Standard", "Suite").
@@ -42,7 +44,7 @@ class RoomType(models.Model):
 # --- Room Model ---
 # Модель для представления отдельных номеров в отеле.
 # Model for representing individual rooms in the hotel.
-class Room(models.Model):
+class Room(ChangeTrackedModel):
     # Мета-класс для определения опций модели.
     # Meta class for defining model options.
     class Meta:
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from hotel.models import Room, RoomType, Zone
+from utills.fieldProjection import ProjectableSerializerMixin
 
 # --- RoomType Serializer ---
 # Сериализатор для модели RoomType.
@@ -31,7 +32,7 @@ class RoomTypeSerializer(serializers.ModelSerializer):
 # Обрабатывает преобразование объектов Room в JSON и обратно.
 # Serializer for the Room model.
 # Handles conversion of Room objects to JSON and back.
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(ProjectableSerializerMixin, serializers.ModelSerializer):
     
    
     room_type = RoomTypeSerializer(read_only=True)  
@@ -57,6 +58,13 @@ class RoomSerializer(serializers.ModelSerializer):
 
     default_prepared_guests = serializers.IntegerField(source='room_type.default_prepared_guests', read_only=True)
 
+    # Пути ORM, которые читают поля-методы (для ?fields= / ?omit=)
+    # ORM paths read by the method fields (for ?fields= / ?omit=)
+    projection_sources = {
+        'room_type_name': ('room_type__name',),
+        'status_display': ('status',),
+    }
+
     # Метод для получения значения поля status_display.
     # Method to get the value for the status_display field.
     def get_status_display(self, obj):
@@ -106,6 +114,9 @@ class RoomSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """ Отображение: показать полный объект RoomType """
         representation = super().to_representation(instance)
+        if 'room_type' not in representation:
+            # Поле убрано проекцией (?fields= / ?omit=) / The field was dropped by projection
+            return representation
         if instance.room_type:
             representation['room_type'] = RoomTypeSerializer(instance.room_type).data
         else:
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utills.responseCache import ROOMS, invalidate
+
+from .models import Room
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_room_responses(sender, **kwargs):
+    invalidate(ROOMS)
@@ -3,12 +3,13 @@ import logging
 from rest_framework.permissions import IsAuthenticated
 from .models import RoomType, Room, Zone
 from .serializers import RoomTypeSerializer, RoomSerializer, ZoneSerializer, RoomStatusSerializer
-from utills.permissions import IsManager, IsManagerOrFrontDesk
+from utills.permissions import IsManager
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import models
-from utills.mixins import AllowAllPaginationMixin
+from utills.mixins import AllowAllPaginationMixin, FieldProjectionMixin
+from utills.responseCache import ROOMS, cache_response, conditional_response
 
 
 
@@ -43,7 +44,7 @@ class RoomTypeViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
     
 # --- Room ViewSet ---
 
-class RoomViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
+class RoomViewSet(FieldProjectionMixin,AllowAllPaginationMixin,viewsets.ModelViewSet):
     """
     ViewSet для управления номерами (Room).
     Доступен только аутентифицированным пользователям с ролью 'manager'.
@@ -67,14 +68,15 @@ class RoomViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
     # Requires authentication (globally or explicitly) AND the 'manager' role.
     permission_classes = [IsAuthenticated, IsManager] 
 
-    @action(detail=False, methods=['get'],url_path='status-summary')
+    @action(detail=False, methods=['get'],url_path='status-summary', permission_classes=[IsAuthenticated, IsManager])
+    @conditional_response(ROOMS)
+    @cache_response(ROOMS)
     def status_summary(self, request):
         """
         Возвращает количество номеров по определенным статусам (dirty, in_progress, waiting_inspection).
-        Доступно аутентифицированным пользователям с ролью 'manager' или 'front desk'.
+        Доступно аутентифицированным пользователям с ролью 'manager'.
+        Ответ кэшируется до изменения любого номера.
         """
-        self.permission_classes = [IsAuthenticated, IsManagerOrFrontDesk] 
-        self.check_permissions(request) 
         summary = Room.objects.filter(is_active=True).aggregate(
             free = models.Count('pk', filter=models.Q(status='free')),
             occupied = models.Count('pk', filter=models.Q(status='occupied')),
@@ -122,3 +124,17 @@ class ZoneViewSet(AllowAllPaginationMixin,viewsets.ModelViewSet):
 class RoomStatusViewSet(AllowAllPaginationMixin,viewsets.ReadOnlyModelViewSet):
     queryset = Room.objects.all()
     serializer_class = RoomStatusSerializer
+
+    # Статусы номеров постоянно опрашиваются приложениями — ответы кэшируются до изменения номеров,
+    # неизменившиеся опросы с If-None-Match получают 304
+    # Room statuses are polled constantly by the apps — responses are cached until a room changes,
+    # unchanged polls with If-None-Match get a 304
+    @conditional_response(ROOMS)
+    @cache_response(ROOMS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_response(ROOMS)
+    @cache_response(ROOMS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
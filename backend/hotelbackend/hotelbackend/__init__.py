@@ -0,0 +1,5 @@
+# Приложение Celery загружается вместе с Django, чтобы @shared_task использовали его
+# The Celery app is loaded with Django so that @shared_task uses it
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,17 @@
+# hotelbackend/celery.py
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotelbackend.settings')
+
+# Приложение Celery для фоновых задач (генерация задач, рассылка уведомлений)
+# Celery application for background jobs (task generation, notification fan-out)
+app = Celery('hotelbackend')
+
+# Все настройки Celery берутся из Django settings с префиксом CELERY_
+# All Celery settings are read from Django settings with the CELERY_ prefix
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+app.autodiscover_tasks()
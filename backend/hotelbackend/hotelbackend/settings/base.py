@@ -2,6 +2,8 @@
 from pathlib import Path
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # Quick-start development settings - unsuitable for production
@@ -36,6 +38,8 @@ INSTALLED_APPS = [
     'incidents.apps.IncidentsConfig',
     'users.apps.UsersConfig',
     'notifications.apps.NotificationsConfig',
+    'jobs.apps.JobsConfig',
+    'sync.apps.SyncConfig',
     'rest_framework',
     'drf_yasg',
     'rest_framework_simplejwt',
@@ -57,6 +61,99 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'hotelbackend.urls'
+# Celery: результаты хранятся в модели BackgroundJob, а не в result backend
+# Celery: results are stored in the BackgroundJob model, not in a result backend
+CELERY_BROKER_URL = 'redis://127.0.0.1:6379/0'
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TIMEZONE = 'Europe/Moscow'
+
+# Push-уведомления Expo: общий пул соединений и ограниченная очередь
+# Expo push notifications: shared connection pool and bounded queue
+EXPO_PUSH_URL = 'https://exp.host/--/api/v2/push/send'
+EXPO_PUSH_WORKERS = 4
+EXPO_PUSH_QUEUE_SIZE = 1000
+EXPO_PUSH_RECEIPTS_URL = 'https://exp.host/--/api/v2/push/getReceipts'
+
+# Токены с DeviceNotRegistered отключаются (True — удаляются);
+# после PUSH_TOKEN_MAX_FAILURES ошибок подряд токен тоже отключается
+# Tokens reporting DeviceNotRegistered are disabled (True deletes them);
+# a token is also disabled after PUSH_TOKEN_MAX_FAILURES consecutive errors
+PUSH_TOKEN_DELETE_UNREGISTERED = False
+PUSH_TOKEN_MAX_FAILURES = 10
+
+# Кэш Django: в памяти процесса для разработки и тестов, Redis в production (prod.py)
+# Django cache: in-process for development and tests, Redis in production (prod.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'easy-inn',
+    },
+}
+
+# Кэш ответов опрашиваемых эндпоинтов (utills.responseCache), секунды
+# Response cache of polled endpoints (utills.responseCache), seconds
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60
+
+# Кэш роль/пользователь → push-токены: LRU в процессе или общий Django cache (alias из CACHES)
+# Role/user → push-token cache: in-process LRU or a shared Django cache (alias from CACHES)
+PUSH_TOKEN_CACHE_ALIAS = None
+PUSH_TOKEN_CACHE_SIZE = 1024
+PUSH_TOKEN_CACHE_TIMEOUT = 300
+
+# Аутентификация WebSocket (utills.socketAuth): кэш пользователя по jti токена и одноразовые билеты, секунды
+# WebSocket authentication (utills.socketAuth): user cache by token jti and single-use tickets, seconds
+SOCKET_AUTH_CACHE_ALIAS = 'default'
+SOCKET_AUTH_CACHE_TIMEOUT = 300
+SOCKET_TICKET_TIMEOUT = 30
+
+# NotificationConsumer: верхняя граница окна объединения кадров (?coalesce=<мс>) и размер пакета
+# NotificationConsumer: upper bound of the frame coalescing window (?coalesce=<ms>) and batch size
+WEBSOCKET_COALESCE_MAX_MS = 1000
+WEBSOCKET_COALESCE_MAX_EVENTS = 50
+
+# Дельта-синхронизация (/api/sync/): повторная выдача последних секунд и срок хранения удалений (дни)
+# Delta sync (/api/sync/): re-sent window of the latest seconds and retention of deletions (days)
+SYNC_CURSOR_OVERLAP_SECONDS = 10
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Хранение уведомлений: прочитанные старше N дней переносятся в архив пакетами (ArchivedNotification)
+# Notification retention: read notifications older than N days move to the archive in batches (ArchivedNotification)
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_ARCHIVE_BATCH_SIZE = 1000
+
+# Условные запросы (utills.responseCache.conditional_response): браузер веб-панели отправляет
+# If-None-Match и читает ETag / Conditional requests: the web dashboard sends If-None-Match and reads ETag
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match')
+CORS_EXPOSE_HEADERS = ['ETag']
+
+# Периодические задачи Celery beat / Celery beat periodic tasks
+CELERY_BEAT_SCHEDULE = {
+    'process-push-receipts': {
+        'task': 'users.tasks.process_push_receipts_task',
+        'schedule': 15 * 60,
+    },
+    # Подстраховка: записи outbox, не отправленные после commit (например, брокер был недоступен)
+    # Safety net: outbox entries not delivered after commit (e.g. the broker was down)
+    'drain-notification-outbox': {
+        'task': 'notifications.tasks.drain_notification_outbox',
+        'schedule': 60,
+    },
+    'purge-notification-outbox': {
+        'task': 'notifications.tasks.purge_notification_outbox',
+        'schedule': 24 * 60 * 60,
+    },
+    'purge-sync-tombstones': {
+        'task': 'sync.tasks.purge_sync_tombstones',
+        'schedule': 24 * 60 * 60,
+    },
+    'archive-notifications': {
+        'task': 'notifications.tasks.archive_notifications',
+        'schedule': 24 * 60 * 60,
+    },
+}
 
 TEMPLATES = [
     {
@@ -53,6 +53,13 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # Если используете Redis для Channels, убедитесь, что он запущен локально
 CHANNEL_LAYERS['default']['CONFIG']["hosts"] = [('127.0.0.1', 6379)]
 
+# Celery в разработке и тестах: задачи выполняются синхронно, брокер в памяти (Redis не нужен).
+# Для настоящего воркера: CELERY_TASK_ALWAYS_EAGER=False и CELERY_BROKER_URL=redis://...
+# Celery in development and tests: tasks run eagerly with an in-memory broker (no Redis needed).
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'True').lower() == 'true'
+CELERY_TASK_EAGER_PROPAGATES = False
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'memory://')
+
 # Настройки SIMPLE_JWT (перемещены из base.py)
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=12),
@@ -77,6 +77,20 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Celery использует тот же Redis, что и Channels (отдельная база)
+# Celery uses the same Redis as Channels (separate database)
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://127.0.0.1:6379/1')
+
+# Общий кэш в Redis (отдельная база): ответы эндпоинтов и кэш push-токенов видны всем процессам
+# Shared Redis cache (separate database): endpoint responses and the push-token cache are seen by every process
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://127.0.0.1:6379/2'),
+    },
+}
+PUSH_TOKEN_CACHE_ALIAS = 'default'
+
 # Firebase Service Account Key (на сервере будет абсолютный путь)
 FIREBASE_CREDENTIALS_PATH = os.getenv('FIREBASE_CREDENTIALS_PATH')
 if FIREBASE_CREDENTIALS_PATH is None:
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import BackgroundJob
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job_type', 'status', 'progress', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'job_type', 'created_at')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
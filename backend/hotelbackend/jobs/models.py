@@ -0,0 +1,122 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundJob(models.Model):
+    """
+    Фоновая задача Celery: статус, прогресс и результат для опроса клиентом.
+    Background Celery job: status, progress and result polled by the client.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает'
+        RUNNING = 'running', 'Выполняется'
+        SUCCEEDED = 'succeeded', 'Завершена'
+        FAILED = 'failed', 'Ошибка'
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+
+    job_type = models.CharField(
+        max_length=50,
+        help_text="Тип задачи (например, 'cleaning_auto_generate')",
+        verbose_name="Тип задачи"
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Статус"
+    )
+
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Прогресс выполнения в процентах (0-100)",
+        verbose_name="Прогресс"
+    )
+
+    params = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Параметры"
+    )
+
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Результат"
+    )
+
+    error = models.TextField(
+        blank=True,
+        verbose_name="Ошибка"
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='background_jobs',
+        verbose_name="Запущена пользователем"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Время создания"
+    )
+
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Время начала"
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Время завершения"
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+
+    def __str__(self):
+        return f"{self.job_type} ({self.get_status_display()}, {self.progress}%)"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    # --- Переходы статуса (вызываются из задач Celery) / Status transitions (called from Celery tasks) ---
+
+    def mark_running(self):
+        self.status = self.Status.RUNNING
+        self.started_at = timezone.now()
+        self.save(update_fields=['status', 'started_at'])
+
+    def set_progress(self, progress):
+        self.progress = max(0, min(100, int(progress)))
+        self.save(update_fields=['progress'])
+
+    def mark_succeeded(self, result):
+        self.status = self.Status.SUCCEEDED
+        self.progress = 100
+        self.result = result
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'progress', 'result', 'finished_at'])
+
+    def mark_failed(self, error):
+        self.status = self.Status.FAILED
+        self.error = str(error)
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'error', 'finished_at'])
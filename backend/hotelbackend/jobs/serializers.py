@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import BackgroundJob
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BackgroundJob
+        fields = (
+            'id', 'job_type', 'status', 'progress', 'params', 'result', 'error',
+            'created_by', 'created_at', 'started_at', 'finished_at',
+        )
+        read_only_fields = fields
@@ -0,0 +1,64 @@
+import pytest
+from datetime import date
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from cleaning.tasks import AUTO_GENERATE_JOB, auto_generate_cleaning_tasks
+from jobs.models import BackgroundJob
+from users.models import User
+
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(username="manager_jobs", password="password", role=User.Role.MANAGER)
+
+
+@pytest.fixture
+def front_desk():
+    return User.objects.create_user(username="front_jobs", password="password", role=User.Role.FRONT_DESK)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_user_sees_only_own_jobs_manager_sees_all(manager, front_desk):
+    """
+    Сотрудник видит только свои задачи, менеджер — все.
+    Staff see only their own jobs, managers see all of them.
+    """
+    own = BackgroundJob.objects.create(job_type=AUTO_GENERATE_JOB, created_by=front_desk)
+    other = BackgroundJob.objects.create(job_type=AUTO_GENERATE_JOB, created_by=manager)
+
+    front_client = client_for(front_desk)
+    assert front_client.get(reverse('backgroundjob-detail', args=[own.id])).status_code == 200
+    assert front_client.get(reverse('backgroundjob-detail', args=[other.id])).status_code == 404
+
+    response = front_client.get(reverse('backgroundjob-list'))
+    assert [item["id"] for item in response.data["results"]] == [str(own.id)]
+
+    response = client_for(manager).get(reverse('backgroundjob-list'))
+    assert {item["id"] for item in response.data["results"]} == {str(own.id), str(other.id)}
+
+
+@pytest.mark.django_db
+def test_failed_job_stores_error(manager, monkeypatch):
+    """
+    Исключение в задаче переводит BackgroundJob в статус failed с текстом ошибки.
+    An exception in the task moves the BackgroundJob to failed with the error text.
+    """
+    def broken_generate(*args, **kwargs):
+        raise RuntimeError("generation failed")
+
+    monkeypatch.setattr('cleaning.tasks.generate_for_dates', broken_generate)
+    job = BackgroundJob.objects.create(job_type=AUTO_GENERATE_JOB, created_by=manager)
+
+    auto_generate_cleaning_tasks.delay(str(job.id), [date(2025, 7, 10).isoformat()], manager.id)
+
+    job.refresh_from_db()
+    assert job.status == BackgroundJob.Status.FAILED
+    assert job.error == "generation failed"
+    assert job.finished_at is not None
@@ -0,0 +1,23 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from users.models import User
+from utills.mixins import AllowAllPaginationMixin
+
+from .models import BackgroundJob
+from .serializers import BackgroundJobSerializer
+
+
+class BackgroundJobViewSet(AllowAllPaginationMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Опрос статуса фоновых задач. Пользователь видит свои задачи, менеджер — все.
+    Polling of background job status. Users see their own jobs, managers see all.
+    """
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == User.Role.MANAGER or user.is_superuser:
+            return BackgroundJob.objects.all()
+        return BackgroundJob.objects.filter(created_by=user)
@@ -1,9 +1,46 @@
 from django.contrib import admin
-from .models import Notification
+from .models import ArchivedNotification, Notification, NotificationOutbox, RoleInboxCursor, RoleNotification, UnreadCounter
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'title', 'notification_type', 'is_read', 'created_at')
     list_filter = ('is_read', 'notification_type', 'created_at', 'user')
     search_fields = ('title', 'body', 'user__username')
-    readonly_fields = ('created_at',)
\ No newline at end of file
+    readonly_fields = ('created_at',)
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('title', 'event_type', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'event_type', 'created_at')
+    search_fields = ('title', 'body', 'dedup_key')
+    readonly_fields = ('created_at', 'sent_at')
+
+
+@admin.register(RoleNotification)
+class RoleNotificationAdmin(admin.ModelAdmin):
+    list_display = ('role', 'title', 'notification_type', 'created_at')
+    list_filter = ('role', 'notification_type', 'created_at')
+    search_fields = ('title', 'body')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(RoleInboxCursor)
+class RoleInboxCursorAdmin(admin.ModelAdmin):
+    list_display = ('user', 'role', 'last_read_id', 'updated_at')
+    list_filter = ('role',)
+    search_fields = ('user__username',)
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread', 'updated_at')
+    search_fields = ('user__username',)
+
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'title', 'notification_type', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'created_at')
+    search_fields = ('title', 'body', 'user__username')
+    readonly_fields = ('created_at', 'archived_at')
@@ -1,9 +1,18 @@
 # notifications/consumers.py
 
+import asyncio
 import json
 import logging
+from datetime import date
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.utils import timezone
+
+from cleaning.taskEvents import date_group, housekeeper_group
 from users.models import User 
+from utills.webNotifications import frame_text
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +20,7 @@ logger = logging.getLogger(__name__)
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"] 
+        self._setup_coalescing()
 
         if self.user.is_authenticated:
             self.user_group_name = f'user_{self.user.id}'
@@ -54,6 +64,13 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 self.role_group_name = None
                 logger.warning(f"User {self.user.username} (ID: {self.user.id}) has no 'role' attribute or it is empty. Not adding to role-specific group.")
 
+            # 4. Доска задач: горничная получает свои задачи, менеджер и ресепшн — задачи на дату
+            # 4. Task board: a housekeeper gets their own tasks, managers and front desk get a date
+            self.task_board_group_name = None
+            if self.user.role == User.Role.HOUSEKEEPER:
+                await self._join_task_board(housekeeper_group(self.user.id))
+            elif self.user.role in (User.Role.MANAGER, User.Role.FRONT_DESK):
+                await self._join_task_board(date_group(timezone.localdate()))
 
             await self.accept()
             logger.info(f"WebSocket connection established for user {self.user.username} (ID: {self.user.id}).")
@@ -83,14 +100,113 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                     self.channel_name
                 )
                 logger.info(f"User {self.user.username} (ID: {self.user.id}) removed from role group: {self.role_group_name}")
+
+            if getattr(self, 'task_board_group_name', None):
+                await self.channel_layer.group_discard(self.task_board_group_name, self.channel_name)
+
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
         else:
             logger.warning("Attempted to disconnect an unauthenticated user from WebSocket groups.")
 
     async def send_notification(self, event):
         """
         Обрабатывает событие "send_notification", отправляя сообщение клиенту.
+        Текст закодирован при публикации (utills.webNotifications.channel_message).
+        """
+        await self._send_frame(frame_text(event))
+
+    # --- Объединение кадров / Frame coalescing ---
+
+    def _setup_coalescing(self):
+        """
+        ?coalesce=<мс> включает окно объединения: события за окно уходят одним кадром-массивом.
+        Без параметра каждое событие — отдельный кадр (как раньше).
+
+        ?coalesce=<ms> enables a coalescing window: the events within the window go out as one
+        array frame. Without the parameter every event is its own frame (as before).
+        """
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        try:
+            window_ms = int(query.get('coalesce', ['0'])[0])
+        except ValueError:
+            window_ms = 0
+        window_ms = max(0, min(window_ms, settings.WEBSOCKET_COALESCE_MAX_MS))
+        self.coalesce_window = window_ms / 1000
+        self._pending_frames = []
+        self._flush_task = None
+
+    async def _send_frame(self, text):
+        if not self.coalesce_window:
+            await self.send(text_data=text)
+            return
+        self._pending_frames.append(text)
+        if len(self._pending_frames) >= settings.WEBSOCKET_COALESCE_MAX_EVENTS:
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+            await self._flush_frames()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.coalesce_window)
+        await self._flush_frames()
+
+    async def _flush_frames(self):
+        frames, self._pending_frames = self._pending_frames, []
+        self._flush_task = None
+        if len(frames) == 1:
+            await self.send(text_data=frames[0])
+        elif frames:
+            # Кадры уже закодированы — массив собирается без повторной сериализации
+            # The frames are already encoded, so the array is joined without re-serializing
+            await self.send(text_data="[" + ",".join(frames) + "]")
+
+  
+    async def _join_task_board(self, group_name):
+        if self.task_board_group_name == group_name:
+            return
+        if self.task_board_group_name:
+            await self.channel_layer.group_discard(self.task_board_group_name, self.channel_name)
+        await self.channel_layer.group_add(group_name, self.channel_name)
+        self.task_board_group_name = group_name
+
+    async def receive(self, text_data=None, bytes_data=None):
+        """
+        Команды клиента: {"action": "subscribe_task_board", "date": "YYYY-MM-DD"} переключает
+        менеджера или ресепшн на доску задач другой даты.
+
+        Client commands: {"action": "subscribe_task_board", "date": "YYYY-MM-DD"} switches
+        a manager or front desk user to the task board of another date.
         """
-        message = event['message']
-        await self.send(text_data=json.dumps(message))
+        try:
+            command = json.loads(text_data or '')
+        except ValueError:
+            return
+        if not isinstance(command, dict) or command.get('action') != 'subscribe_task_board':
+            return
+        if self.user.role not in (User.Role.MANAGER, User.Role.FRONT_DESK):
+            await self.send(text_data=json.dumps({"type": "error", "detail": "Task board dates are available to managers and front desk only."}))
+            return
+        try:
+            board_date = date.fromisoformat(command.get('date') or '')
+        except (TypeError, ValueError):
+            await self.send(text_data=json.dumps({"type": "error", "detail": "Invalid date format. Use YYYY-MM-DD."}))
+            return
+        await self._join_task_board(date_group(board_date))
+        await self.send(text_data=json.dumps({"type": "task_board_subscribed", "date": board_date.isoformat()}))
 
-  
\ No newline at end of file
+    async def unread_count(self, event):
+        """
+        Новое число непрочитанных: {"type": "unread_count", "unread_count": n}.
+        The new unread count: {"type": "unread_count", "unread_count": n}.
+        """
+        await self._send_frame(frame_text(event))
+
+    async def task_event(self, event):
+        """
+        Пакет событий доски задач: {"type": "task_events", "events": [{id, event, scheduled_date, changes}]}.
+        A batch of task board events: {"type": "task_events", "events": [{id, event, scheduled_date, changes}]}.
+        """
+        await self._send_frame(frame_text(event))
@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, Max, Value, When
+
+from utills.responseCache import NOTIFICATIONS, invalidate, role_namespace, user_namespace
+
+from .models import Notification, RoleInboxCursor, RoleNotification, UnreadCounter
+
+# Источник записи inbox / Source of an inbox entry
+PERSONAL = 'personal'
+ROLE = 'role'
+
+# Колонки объединенного inbox: одинаковый порядок в обеих частях UNION
+# Columns of the merged inbox: the same order in both parts of the UNION
+INBOX_FIELDS = ('id', 'title', 'body', 'notification_type', 'data', 'created_at')
+
+
+def role_inbox(user):
+    """
+    Общие уведомления роли пользователя, созданные после его регистрации.
+    Shared notifications of the user's role created after the user joined.
+    """
+    return RoleNotification.objects.filter(role=user.role, created_at__gte=user.date_joined)
+
+
+def read_cursor(user):
+    return (
+        RoleInboxCursor.objects.filter(user=user, role=user.role)
+        .values_list('last_read_id', flat=True)
+        .first()
+    ) or 0
+
+
+def merged_inbox(user, unread_only=False):
+    """
+    Личные уведомления и общий inbox роли одним запросом (UNION ALL), новые сначала.
+    Прочитанность общих уведомлений — сравнение id с курсором пользователя.
+
+    Personal notifications and the role's shared inbox in one query (UNION ALL), newest first.
+    The read state of shared notifications is an id comparison with the user's cursor.
+    """
+    cursor = read_cursor(user)
+    personal = Notification.objects.filter(user=user)
+    shared = role_inbox(user)
+    if unread_only:
+        personal = personal.filter(is_read=False)
+        shared = shared.filter(id__gt=cursor)
+    personal = personal.annotate(read=F('is_read'), scope=Value(PERSONAL)).values(*INBOX_FIELDS, 'read', 'scope')
+    shared = shared.annotate(
+        read=Case(When(id__lte=cursor, then=Value(True)), default=Value(False), output_field=BooleanField()),
+        scope=Value(ROLE),
+    ).values(*INBOX_FIELDS, 'read', 'scope')
+    return personal.order_by().union(shared.order_by(), all=True).order_by('-created_at', '-id')
+
+
+def unread_count(user):
+    """
+    Непрочитанные: личные — из счетчика UnreadCounter, общие — уведомления роли новее курсора.
+    Unread: personal ones from the UnreadCounter, shared ones are role notifications past the cursor.
+    """
+    personal = UnreadCounter.objects.personal_unread(user.pk)
+    return personal + role_inbox(user).filter(id__gt=read_cursor(user)).count()
+
+
+def adjust_unread(deltas):
+    """
+    Меняет счетчики непрочитанных {user_id: delta} и после фиксации отправляет новые значения.
+    Changes the unread counters {user_id: delta} and pushes the new values after the commit.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    UnreadCounter.objects.adjust(deltas)
+    push_unread_counts(deltas)
+
+
+def push_unread_counts(user_ids):
+    """
+    После фиксации транзакции отправляет пользователям {"type": "unread_count", "unread_count": n}.
+    After the transaction commits, sends {"type": "unread_count", "unread_count": n} to the users.
+    """
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _send_unread_counts(user_ids))
+
+
+def _send_unread_counts(user_ids):
+    from users.models import User
+    from utills.webNotifications import channel_message, group_send_many
+
+    group_messages = [
+        (f"user_{user.pk}", channel_message("unread_count", {"type": "unread_count", "unread_count": unread_count(user)}))
+        for user in User.objects.filter(pk__in=user_ids).only('id', 'role', 'date_joined')
+    ]
+    group_send_many(group_messages)
+
+
+def mark_role_read(user, up_to_id=None):
+    """
+    Сдвигает курсор общего inbox вперед (до up_to_id или до последнего уведомления роли).
+    Курсор никогда не сдвигается назад. Возвращает новое значение курсора.
+
+    Moves the shared inbox cursor forward (to up_to_id or to the latest role notification).
+    The cursor never moves back. Returns the new cursor value.
+    """
+    if up_to_id is None:
+        up_to_id = role_inbox(user).aggregate(last=Max('id'))['last'] or 0
+    cursor, created = RoleInboxCursor.objects.get_or_create(
+        user=user, role=user.role, defaults={'last_read_id': up_to_id}
+    )
+    if not created and cursor.last_read_id < up_to_id:
+        RoleInboxCursor.objects.filter(pk=cursor.pk, last_read_id__lt=up_to_id).update(last_read_id=up_to_id)
+        cursor.last_read_id = up_to_id
+    # Курсор меняется через update() — версию уведомлений пользователя увеличиваем явно
+    # The cursor changes through update(), so the user's notification version is bumped explicitly
+    invalidate(user_namespace(NOTIFICATIONS, user.pk))
+    push_unread_counts([user.pk])
+    return cursor.last_read_id
+
+
+def create_role_notifications(roles, title, body, notification_type, data=None):
+    """
+    Одна строка общего inbox на роль (bulk_create) вместо строки на каждого получателя.
+    One shared inbox row per role (bulk_create) instead of a row per recipient.
+    """
+    rows = RoleNotification.objects.bulk_create([
+        RoleNotification(role=role, title=title, body=body, notification_type=notification_type, data=data)
+        for role in dict.fromkeys(str(role) for role in roles)
+    ])
+    # bulk_create не отправляет post_save / bulk_create does not send post_save
+    invalidate(*{role_namespace(NOTIFICATIONS, row.role) for row in rows})
+    return rows
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from notifications.models import ArchivedNotification
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит прочитанные уведомления старше срока хранения в архив пакетами. '
+        'Moves read notifications older than the retention period into the archive in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Retention in days (NOTIFICATION_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per batch (NOTIFICATION_ARCHIVE_BATCH_SIZE)')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        count = ArchivedNotification.objects.archive_read(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived notifications: {count}.'))
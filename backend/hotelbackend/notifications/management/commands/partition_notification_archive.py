@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Секционирует архив уведомлений по created_at (помесячно, только PostgreSQL). '
+        'Partitions the notification archive by created_at (monthly, PostgreSQL only).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, default=None,
+                            help='First monthly partition, YYYY-MM-DD (default: the oldest archived row)')
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported():
+            raise CommandError('Partitioning of the notification archive requires PostgreSQL.')
+        if partitioning.is_partitioned():
+            self.stdout.write('The notification archive is already partitioned.')
+            return
+        created = partitioning.partition_archive_table(start=options['start'])
+        self.stdout.write(self.style.SUCCESS(f'Partitioned the notification archive: {len(created)} monthly partitions.'))
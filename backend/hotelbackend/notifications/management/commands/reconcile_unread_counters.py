@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from notifications.models import UnreadCounter
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счетчики непрочитанных уведомлений с таблицей уведомлений и исправляет расхождения. '
+        'Checks the unread notification counters against the notification table and fixes any drift.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='User id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = UnreadCounter.objects.reconcile(user_ids=options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reconciled unread counters: {count} fixed.'))
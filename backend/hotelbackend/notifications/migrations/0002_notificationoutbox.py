@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 23:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(verbose_name='Сообщение')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Данные')),
+                ('notification_type', models.CharField(blank=True, help_text="Тип WebSocket уведомления (например, 'task_started_web')", max_length=50, verbose_name='Тип уведомления')),
+                ('push_roles', models.JSONField(blank=True, default=list, help_text='Роли, всем пользователям которых отправляется push', verbose_name='Роли для push')),
+                ('web_roles', models.JSONField(blank=True, default=list, help_text='Роли, онлайн-пользователям которых отправляется WebSocket уведомление', verbose_name='Роли для WebSocket')),
+                ('dedup_key', models.CharField(blank=True, db_index=True, help_text='Неотправленные записи с одинаковым ключом схлопываются в последнюю', max_length=255, verbose_name='Ключ дедупликации')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает отправки'), ('sent', 'Отправлено'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки')),
+                ('last_error', models.CharField(blank=True, max_length=255, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Время создания')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Время отправки')),
+                ('push_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель push')),
+            ],
+            options={
+                'verbose_name': 'Исходящее уведомление',
+                'verbose_name_plural': 'Исходящие уведомления',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='notificatio_status_ea8ecc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='notificationoutbox',
+            name='push_user',
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='event_type',
+            field=models.CharField(blank=True, help_text="Тип события (например, 'task_assigned'); используется в метриках и в Notification", max_length=50, verbose_name='Тип события'),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='persist',
+            field=models.BooleanField(default=False, help_text='Сохранять Notification для каждого получателя из user_ids', verbose_name='Сохранять в БД'),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='user_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Пользователи-получатели (push и WebSocket)', verbose_name='Получатели'),
+        ),
+    ]
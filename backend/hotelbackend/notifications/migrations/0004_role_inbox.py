@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 00:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_outbox_recipients'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='persist',
+            field=models.BooleanField(default=False, help_text='Сохранять Notification для каждого получателя из user_ids и одну RoleNotification на каждую роль из web_roles', verbose_name='Сохранять в БД'),
+        ),
+        migrations.CreateModel(
+            name='RoleNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=20, verbose_name='Роль')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(verbose_name='Сообщение')),
+                ('notification_type', models.CharField(max_length=50, verbose_name='Тип уведомления')),
+                ('data', models.JSONField(blank=True, default=dict, null=True, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Время создания')),
+            ],
+            options={
+                'verbose_name': 'Уведомление роли',
+                'verbose_name_plural': 'Уведомления ролей',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['role', 'id'], name='notificatio_role_4a72ed_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoleInboxCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=20, verbose_name='Роль')),
+                ('last_read_id', models.PositiveBigIntegerField(default=0, verbose_name='Последнее прочитанное уведомление')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Время обновления')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='role_inbox_cursors', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Курсор inbox роли',
+                'verbose_name_plural': 'Курсоры inbox ролей',
+                'constraints': [models.UniqueConstraint(fields=('user', 'role'), name='unique_role_inbox_cursor')],
+            },
+        ),
+    ]
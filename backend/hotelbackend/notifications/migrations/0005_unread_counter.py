@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 00:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def initialize_unread_counters(apps, schema_editor):
+    """
+    Счетчики для существующих пользователей из фактического числа непрочитанных.
+    Counters for the existing users from the actual unread counts.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Notification = apps.get_model('notifications', 'Notification')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    counts = dict(
+        Notification.objects.filter(is_read=False).values_list('user_id').annotate(unread=Count('id')).order_by()
+    )
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, unread=counts.get(user_id, 0)) for user_id in User.objects.values_list('pk', flat=True)],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_role_inbox'),
+        ('users', '0007_pushtoken_delivery_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('unread', models.PositiveIntegerField(default=0, verbose_name='Непрочитанных')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Время обновления')),
+            ],
+            options={
+                'verbose_name': 'Счетчик непрочитанных',
+                'verbose_name_plural': 'Счетчики непрочитанных',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notification_user_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ),
+        migrations.RunPython(initialize_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 00:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_unread_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID уведомления')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(verbose_name='Сообщение')),
+                ('notification_type', models.CharField(max_length=50, verbose_name='Тип уведомления')),
+                ('data', models.JSONField(blank=True, default=dict, null=True, verbose_name='Данные')),
+                ('is_read', models.BooleanField(default=True, verbose_name='Прочитано')),
+                ('created_at', models.DateTimeField(verbose_name='Время создания')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Время архивации')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Архивное уведомление',
+                'verbose_name_plural': 'Архивные уведомления',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='archived_notif_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_notification_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='Когда обработчик взял запись в отправку (status=sending)', null=True, verbose_name='Время захвата'),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='persisted_ids',
+            field=models.JSONField(blank=True, help_text='id сохраненных Notification/RoleNotification: повторная попытка не сохраняет их снова', null=True, verbose_name='Сохраненные уведомления'),
+        ),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Ожидает отправки'), ('sending', 'Отправляется'), ('sent', 'Отправлено'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус'),
+        ),
+    ]
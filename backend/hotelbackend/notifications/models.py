@@ -1,6 +1,11 @@
+from datetime import timedelta
+
 from django.db import models
 from django.db import models
+from django.db import transaction
 from django.conf import settings 
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -48,6 +53,435 @@ class Notification(models.Model):
         ordering = ['-created_at'] 
         verbose_name = "Уведомление"
         verbose_name_plural = "Уведомления"
+        # Списки уведомлений пользователя (все и непрочитанные), новые сначала
+        # A user's notification lists (all and unread), newest first
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notification_user_unread_idx'),
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.title} ({'Read' if self.is_read else 'Unread'})"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Исходящие уведомления (transactional outbox).
+    Запись создается в той же транзакции, что и изменение данных, и отправляется
+    (WebSocket по ролям + push пользователю/ролям) только после фиксации транзакции.
+
+    Outgoing notifications (transactional outbox).
+    A row is written in the same transaction as the data change and delivered
+    (role WebSocket broadcast + push to a user/roles) only after the commit.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает отправки'
+        SENDING = 'sending', 'Отправляется'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Ошибка'
+
+    title = models.CharField(
+        max_length=255,
+        verbose_name="Заголовок"
+    )
+    body = models.TextField(
+        verbose_name="Сообщение"
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Данные"
+    )
+    event_type = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Тип события (например, 'task_assigned'); используется в метриках и в Notification",
+        verbose_name="Тип события"
+    )
+    notification_type = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Тип WebSocket уведомления (например, 'task_started_web')",
+        verbose_name="Тип уведомления"
+    )
+    user_ids = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Пользователи-получатели (push и WebSocket)",
+        verbose_name="Получатели"
+    )
+    push_roles = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Роли, всем пользователям которых отправляется push",
+        verbose_name="Роли для push"
+    )
+    web_roles = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Роли, онлайн-пользователям которых отправляется WebSocket уведомление",
+        verbose_name="Роли для WebSocket"
+    )
+    persist = models.BooleanField(
+        default=False,
+        help_text="Сохранять Notification для каждого получателя из user_ids и одну RoleNotification на каждую роль из web_roles",
+        verbose_name="Сохранять в БД"
+    )
+    dedup_key = models.CharField(
+        max_length=255,
+        blank=True,
+        db_index=True,
+        help_text="Неотправленные записи с одинаковым ключом схлопываются в последнюю",
+        verbose_name="Ключ дедупликации"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Статус"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток отправки"
+    )
+    last_error = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Последняя ошибка"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Время создания"
+    )
+    claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Когда обработчик взял запись в отправку (status=sending)",
+        verbose_name="Время захвата"
+    )
+    persisted_ids = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="id сохраненных Notification/RoleNotification: повторная попытка не сохраняет их снова",
+        verbose_name="Сохраненные уведомления"
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Время отправки"
+    )
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'id'])]
+        verbose_name = "Исходящее уведомление"
+        verbose_name_plural = "Исходящие уведомления"
+
+    def __str__(self):
+        return f"{self.title} ({self.get_status_display()})"
+
+
+class RoleNotification(models.Model):
+    """
+    Общее уведомление роли (общий inbox): одна строка на рассылку вместо строки на получателя.
+    Прочитанность определяется курсором RoleInboxCursor пользователя.
+
+    A role-wide notification (shared inbox): one row per broadcast instead of one per recipient.
+    Read state comes from the user's RoleInboxCursor.
+    """
+    role = models.CharField(
+        max_length=20,
+        verbose_name="Роль"
+    )
+    title = models.CharField(
+        max_length=255,
+        verbose_name="Заголовок"
+    )
+    body = models.TextField(
+        verbose_name="Сообщение"
+    )
+    notification_type = models.CharField(
+        max_length=50,
+        verbose_name="Тип уведомления"
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        null=True,
+        verbose_name="Данные"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Время создания"
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['role', 'id'])]
+        verbose_name = "Уведомление роли"
+        verbose_name_plural = "Уведомления ролей"
+
+    def __str__(self):
+        return f"{self.role}: {self.title}"
+
+
+class RoleInboxCursor(models.Model):
+    """
+    Курсор прочтения общего inbox роли: все уведомления роли с id <= last_read_id прочитаны.
+    Read cursor of a role's shared inbox: every role notification with id <= last_read_id is read.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='role_inbox_cursors',
+        verbose_name="Пользователь"
+    )
+    role = models.CharField(
+        max_length=20,
+        verbose_name="Роль"
+    )
+    last_read_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Последнее прочитанное уведомление"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Время обновления"
+    )
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user', 'role'], name='unique_role_inbox_cursor')]
+        verbose_name = "Курсор inbox роли"
+        verbose_name_plural = "Курсоры inbox ролей"
+
+    def __str__(self):
+        return f"{self.user_id}/{self.role}: {self.last_read_id}"
+
+
+class UnreadCounterManager(models.Manager):
+    def _initialize(self, user_ids):
+        """
+        Создает недостающие счетчики по фактическому числу непрочитанных (один COUNT на пакет).
+        Creates the missing counters from the actual unread count (one COUNT per batch).
+        """
+        counts = dict(
+            Notification.objects.filter(user_id__in=user_ids, is_read=False)
+            .values_list('user_id').annotate(unread=Count('id'))
+        )
+        self.bulk_create(
+            [self.model(user_id=user_id, unread=counts.get(user_id, 0)) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        return counts
+
+    def adjust(self, deltas):
+        """
+        Атомарно меняет счетчики {user_id: delta} через UPDATE ... SET unread = unread + delta.
+        Отсутствующий счетчик создается по COUNT, который уже учитывает изменение.
+
+        Atomically changes the counters {user_id: delta} with UPDATE ... SET unread = unread + delta.
+        A missing counter is created from a COUNT that already includes the change.
+        """
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        by_delta = {}
+        for user_id, delta in deltas.items():
+            by_delta.setdefault(delta, []).append(user_id)
+        updated = 0
+        for delta, user_ids in by_delta.items():
+            updated += self.filter(user_id__in=user_ids).update(
+                unread=Greatest(F('unread') + delta, 0), updated_at=timezone.now()
+            )
+        if updated == len(deltas):
+            return
+        # Обычно счетчик создается вместе с пользователем; здесь — страховка от его отсутствия.
+        # Для уменьшения счетчик не создается: его пользователь может удаляться каскадом.
+        # A counter is normally created with its user; this is a safety net for a missing one.
+        # No counter is created for a decrement: its user may be in a cascade deletion.
+        existing = set(self.filter(user_id__in=deltas).values_list('user_id', flat=True))
+        missing = [user_id for user_id, delta in deltas.items() if user_id not in existing and delta > 0]
+        if missing:
+            self._initialize(missing)
+
+    def personal_unread(self, user_id):
+        """
+        Число непрочитанных личных уведомлений без COUNT по таблице уведомлений.
+        The number of unread personal notifications without a COUNT over the notification table.
+        """
+        unread = self.filter(user_id=user_id).values_list('unread', flat=True).first()
+        if unread is None:
+            unread = self._initialize([user_id]).get(user_id, 0)
+        return unread
+
+    def reconcile(self, user_ids=None, batch_size=1000):
+        """
+        Сверяет счетчики с фактическим числом непрочитанных и исправляет расхождения.
+        Возвращает число исправленных и созданных счетчиков.
+
+        Checks the counters against the actual unread counts and fixes any drift.
+        Returns the number of fixed and created counters.
+        """
+        notifications = Notification.objects.filter(is_read=False)
+        counters = self.all()
+        if user_ids is not None:
+            notifications = notifications.filter(user_id__in=user_ids)
+            counters = counters.filter(user_id__in=user_ids)
+        actual = dict(notifications.values_list('user_id').annotate(unread=Count('id')).order_by())
+        stale = []
+        for counter in counters.only('user_id', 'unread'):
+            expected = actual.pop(counter.user_id, 0)
+            if counter.unread != expected:
+                counter.unread = expected
+                stale.append(counter)
+        self.bulk_update(stale, ['unread'], batch_size=batch_size)
+        self.bulk_create(
+            [self.model(user_id=user_id, unread=unread) for user_id, unread in actual.items()],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        return len(stale) + len(actual)
+
+
+class UnreadCounter(models.Model):
+    """
+    Поддерживаемый счетчик непрочитанных личных уведомлений пользователя: обновляется
+    при вставке и отметке прочтения, сверяется командой reconcile_unread_counters.
+
+    A maintained per-user counter of unread personal notifications: updated on insert and
+    on mark-as-read, checked by the reconcile_unread_counters command.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_counter',
+        verbose_name="Пользователь"
+    )
+    unread = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Непрочитанных"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Время обновления"
+    )
+
+    objects = UnreadCounterManager()
+
+    class Meta:
+        verbose_name = "Счетчик непрочитанных"
+        verbose_name_plural = "Счетчики непрочитанных"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread}"
+
+
+class NotificationArchiveManager(models.Manager):
+    def archive_read(self, days=None, batch_size=None, max_batches=None):
+        """
+        Переносит прочитанные уведомления старше days дней в архив пакетами по batch_size
+        (каждый пакет — отдельная транзакция). Возвращает число перенесенных уведомлений.
+
+        Moves read notifications older than days into the archive in batches of batch_size
+        (one transaction per batch). Returns the number of archived notifications.
+        """
+        from .partitioning import prepare_archive
+
+        days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+        batch_size = batch_size or settings.NOTIFICATION_ARCHIVE_BATCH_SIZE
+        expired = Notification.objects.filter(is_read=True, created_at__lt=timezone.now() - timedelta(days=days))
+        # Секционированный архив (PostgreSQL): сначала создаем недостающие помесячные секции
+        # Partitioned archive (PostgreSQL): create the missing monthly partitions first
+        prepare_archive(expired)
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with transaction.atomic():
+                batch = list(expired.order_by('created_at', 'id')[:batch_size])
+                if not batch:
+                    break
+                self.bulk_create(
+                    [
+                        self.model(
+                            id=notification.id,
+                            user_id=notification.user_id,
+                            title=notification.title,
+                            body=notification.body,
+                            notification_type=notification.notification_type,
+                            data=notification.data,
+                            is_read=notification.is_read,
+                            created_at=notification.created_at,
+                        )
+                        for notification in batch
+                    ],
+                    ignore_conflicts=True,
+                )
+                Notification.objects.filter(pk__in=[notification.pk for notification in batch]).delete()
+            archived += len(batch)
+            batches += 1
+            if len(batch) < batch_size:
+                break
+        return archived
+
+
+class ArchivedNotification(models.Model):
+    """
+    Архив прочитанных уведомлений: основная таблица остается небольшой, история доступна
+    через ?archived=true. id совпадает с id исходного уведомления. На PostgreSQL таблицу
+    можно секционировать по created_at (manage.py partition_notification_archive).
+
+    Archive of read notifications: the hot table stays small and the history is reachable
+    through ?archived=true. id equals the original notification's id. On PostgreSQL the table
+    can be partitioned by created_at (manage.py partition_notification_archive).
+    """
+    id = models.BigIntegerField(
+        primary_key=True,
+        verbose_name="ID уведомления"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notifications',
+        verbose_name="Получатель"
+    )
+    title = models.CharField(
+        max_length=255,
+        verbose_name="Заголовок"
+    )
+    body = models.TextField(
+        verbose_name="Сообщение"
+    )
+    notification_type = models.CharField(
+        max_length=50,
+        verbose_name="Тип уведомления"
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        null=True,
+        verbose_name="Данные"
+    )
+    is_read = models.BooleanField(
+        default=True,
+        verbose_name="Прочитано"
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Время создания"
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Время архивации"
+    )
+
+    objects = NotificationArchiveManager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'], name='archived_notif_user_idx')]
+        verbose_name = "Архивное уведомление"
+        verbose_name_plural = "Архивные уведомления"
+
+    def __str__(self):
+        return f"Archived notification for {self.user_id}: {self.title}"
@@ -0,0 +1,147 @@
+"""
+Секционирование архива уведомлений по времени (только PostgreSQL).
+
+Таблица ArchivedNotification становится PARTITION BY RANGE (created_at) с помесячными секциями
+и секцией DEFAULT. Запросы ?archived=true с сортировкой по created_at читают только нужные
+секции, а старую историю можно удалить DROP TABLE секции вместо DELETE.
+
+Time partitioning of the notification archive (PostgreSQL only).
+
+The ArchivedNotification table becomes PARTITION BY RANGE (created_at) with monthly partitions
+and a DEFAULT partition. ?archived=true queries ordered by created_at only read the partitions
+they need, and old history can be removed with DROP TABLE on a partition instead of DELETE.
+"""
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Min
+
+from .models import ArchivedNotification
+
+
+def _table():
+    return ArchivedNotification._meta.db_table
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value):
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def is_supported():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned():
+    """
+    True, если таблица архива уже секционирована (всегда False вне PostgreSQL).
+    True if the archive table is already partitioned (always False outside PostgreSQL).
+    """
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [_table()],
+        )
+        return cursor.fetchone() is not None
+
+
+def ensure_partitions(start, end):
+    """
+    Создает недостающие помесячные секции для [start, end). Месяц, строки которого уже лежат
+    в секции DEFAULT, пропускается (PostgreSQL не позволит создать для него секцию).
+    Возвращает имена созданных секций.
+
+    Creates the missing monthly partitions for [start, end). A month whose rows already sit in
+    the DEFAULT partition is skipped (PostgreSQL would refuse to create a partition for it).
+    Returns the names of the created partitions.
+    """
+    table = _table()
+    quote = connection.ops.quote_name
+    created = []
+    month = _month_start(start)
+    with connection.cursor() as cursor:
+        while month < end:
+            following = _next_month(month)
+            name = f"{table}_p{month:%Y%m}"
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is None:
+                cursor.execute(
+                    f"SELECT 1 FROM {quote(table + '_default')} WHERE created_at >= %s AND created_at < %s LIMIT 1",
+                    [month, following],
+                )
+                if cursor.fetchone() is None:
+                    cursor.execute(
+                        f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} "
+                        f"FOR VALUES FROM (%s) TO (%s)",
+                        [month, following],
+                    )
+                    created.append(name)
+            month = following
+    return created
+
+
+def partition_archive_table(start=None):
+    """
+    Преобразует таблицу архива в секционированную: новая таблица PARTITION BY RANGE (created_at),
+    первичный ключ (id, created_at), секции DEFAULT и помесячные от start (или от самой старой
+    записи) до следующего месяца, затем перенос строк и удаление старой таблицы — одной транзакцией.
+
+    Converts the archive table into a partitioned one: a new PARTITION BY RANGE (created_at) table,
+    primary key (id, created_at), a DEFAULT partition and monthly ones from start (or from the oldest
+    row) through next month, then the rows are copied and the old table dropped — in one transaction.
+    """
+    if not is_supported():
+        raise NotImplementedError("Partitioning of the notification archive requires PostgreSQL.")
+    if is_partitioned():
+        return []
+
+    table = _table()
+    old = f"{table}_old"
+    quote = connection.ops.quote_name
+    user_table = ArchivedNotification._meta.get_field('user').related_model._meta.db_table
+    today = date.today()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(created_at) FROM {quote(table)}")
+        oldest = cursor.fetchone()[0]
+        start = start or (oldest.date() if oldest else today)
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING STORAGE) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"ALTER TABLE {quote(table)} ADD PRIMARY KEY (id, created_at)")
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_user_id_fk')} "
+            f"FOREIGN KEY (user_id) REFERENCES {quote(user_table)} (id) ON DELETE CASCADE"
+        )
+        cursor.execute(f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT")
+        created = ensure_partitions(start, _next_month(_next_month(today)))
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        cursor.execute(f"DROP TABLE {quote(old)}")
+        # Имя индекса из миграции освобождается вместе со старой таблицей
+        # The migration's index name is released together with the old table
+        cursor.execute(
+            f"CREATE INDEX {quote('archived_notif_user_idx')} ON {quote(table)} (user_id, created_at DESC)"
+        )
+    return created
+
+
+def prepare_archive(queryset):
+    """
+    Перед переносом в архив: секции от месяца самой старой записи queryset до следующего месяца.
+    Before archiving: partitions from the month of the oldest row in queryset through next month.
+    """
+    if not is_partitioned():
+        return []
+    oldest = queryset.aggregate(oldest=Min('created_at'))['oldest']
+    if oldest is None:
+        return []
+    return ensure_partitions(oldest.date(), _next_month(_next_month(date.today())))
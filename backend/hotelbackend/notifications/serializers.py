@@ -1,8 +1,37 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import ArchivedNotification, Notification
 
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__' 
-        read_only_fields = ('id', 'user', 'created_at') 
\ No newline at end of file
+        read_only_fields = ('id', 'user', 'created_at')
+
+
+class ArchivedNotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedNotification
+        fields = '__all__'
+
+
+class InboxEntrySerializer(serializers.Serializer):
+    """
+    Запись объединенного inbox: личное уведомление (scope="personal") или общее уведомление
+    роли (scope="role"). id уникален в пределах scope.
+
+    An entry of the merged inbox: a personal notification (scope="personal") or a shared role
+    notification (scope="role"). id is unique within its scope.
+    """
+    id = serializers.IntegerField()
+    scope = serializers.CharField()
+    user = serializers.SerializerMethodField()
+    title = serializers.CharField()
+    body = serializers.CharField()
+    notification_type = serializers.CharField()
+    data = serializers.JSONField()
+    is_read = serializers.BooleanField(source='read')
+    created_at = serializers.DateTimeField()
+
+    def get_user(self, entry):
+        return self.context['request'].user.pk
+
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.conf import settings
+from django.dispatch import receiver
+
+from utills.responseCache import NOTIFICATIONS, invalidate, role_namespace, user_namespace
+
+from . import inbox
+from .models import Notification, RoleNotification, UnreadCounter
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def invalidate_notification_responses(sender, instance, **kwargs):
+    """
+    Изменение уведомления меняет ETag счетчика непрочитанных его получателя.
+    A notification change changes the unread-count ETag of its recipient.
+    """
+    invalidate(user_namespace(NOTIFICATIONS, instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=RoleNotification)
+def invalidate_role_notification_responses(sender, instance, **kwargs):
+    invalidate(role_namespace(NOTIFICATIONS, instance.role))
+
+
+@receiver(post_init, sender=Notification)
+def remember_unread_state(sender, instance, **kwargs):
+    """
+    Запоминает, учтено ли уведомление в счетчике непрочитанных (отложенное поле не читается).
+    Remembers whether the notification is counted as unread (a deferred field is not read).
+    """
+    if 'is_read' in instance.__dict__:
+        instance._counted_unread = not instance.is_read
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_counter(sender, instance, created, **kwargs):
+    unread = not instance.is_read
+    if created:
+        delta = 1 if unread else 0
+    else:
+        counted = getattr(instance, '_counted_unread', unread)
+        delta = int(unread) - int(counted)
+    instance._counted_unread = unread
+    inbox.adjust_unread({instance.user_id: delta})
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_counter_on_delete(sender, instance, **kwargs):
+    if getattr(instance, '_counted_unread', False):
+        inbox.adjust_unread({instance.user_id: -1})
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_unread_counter(sender, instance, created, **kwargs):
+    """
+    Счетчик создается вместе с пользователем — вставка уведомления обходится одним UPDATE.
+    The counter is created with the user, so inserting a notification costs a single UPDATE.
+    """
+    if created:
+        UnreadCounter.objects.bulk_create([UnreadCounter(user=instance)], ignore_conflicts=True)
@@ -0,0 +1,27 @@
+from celery import shared_task
+
+from notifications.models import ArchivedNotification
+from utills.notificationOutbox import drain_outbox, purge_outbox
+
+
+@shared_task
+def drain_notification_outbox():
+    """
+    Отправка уведомлений из outbox (после фиксации транзакции и периодически).
+    Delivers outbox notifications (after commit and periodically).
+    """
+    return drain_outbox()
+
+
+@shared_task
+def purge_notification_outbox(days=7):
+    return purge_outbox(days=days)
+
+
+@shared_task
+def archive_notifications(days=None):
+    """
+    Перенос прочитанных уведомлений старше NOTIFICATION_RETENTION_DAYS в архив.
+    Moves read notifications older than NOTIFICATION_RETENTION_DAYS into the archive.
+    """
+    return ArchivedNotification.objects.archive_read(days=days)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import ArchivedNotification, Notification, UnreadCounter
+from users.models import User
+
+
+@pytest.fixture
+def housekeeper():
+    return User.objects.create_user(username="archive_hk", password="password", role=User.Role.HOUSEKEEPER)
+
+
+def _notify(user, title, days_ago, is_read=True):
+    notification = Notification.objects.create(
+        user=user, title=title, body="", notification_type="info", is_read=is_read
+    )
+    Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+    return notification
+
+
+@pytest.mark.django_db
+def test_only_old_read_notifications_are_archived_in_batches(housekeeper, settings):
+    settings.NOTIFICATION_RETENTION_DAYS = 30
+    old = [_notify(housekeeper, f"Старое {index}", 40 + index) for index in range(5)]
+    _notify(housekeeper, "Старое непрочитанное", 60, is_read=False)
+    _notify(housekeeper, "Свежее", 5)
+
+    # max_batches ограничивает один запуск / max_batches bounds a single run
+    assert ArchivedNotification.objects.archive_read(batch_size=2, max_batches=1) == 2
+    assert ArchivedNotification.objects.archive_read(batch_size=2) == 3
+
+    archived = ArchivedNotification.objects.order_by('created_at')
+    # Сначала самые старые; id сохраняется / Oldest first; the id is kept
+    assert [entry.id for entry in archived] == [notification.id for notification in reversed(old)]
+    assert set(Notification.objects.values_list('title', flat=True)) == {"Старое непрочитанное", "Свежее"}
+    assert UnreadCounter.objects.personal_unread(housekeeper.pk) == 1
+
+
+@pytest.mark.django_db
+def test_archived_notifications_are_listed_only_on_request(housekeeper):
+    _notify(housekeeper, "Архивное", 120)
+    _notify(housekeeper, "Текущее", 1)
+    call_command('archive_notifications', '--days', '90')
+
+    client = APIClient()
+    client.force_authenticate(housekeeper)
+    current = client.get(reverse('notification-list'), {"all": "true"}).data
+    assert [entry["title"] for entry in current] == ["Текущее"]
+
+    response = client.get(reverse('notification-list'), {"archived": "true"})
+    assert response.data["count"] == 1
+    assert [entry["title"] for entry in response.data["results"]] == ["Архивное"]
+
+    other = User.objects.create_user(username="archive_other", password="password", role=User.Role.HOUSEKEEPER)
+    client.force_authenticate(other)
+    assert client.get(reverse('notification-list'), {"archived": "true"}).data["count"] == 0
+
+
+@pytest.mark.django_db
+def test_partition_command_requires_postgresql():
+    with pytest.raises(CommandError):
+        call_command('partition_notification_archive')
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import channel_layers
+from channels.testing import WebsocketCommunicator
+
+from notifications.consumers import NotificationConsumer
+from users.models import User
+from utills.webNotifications import channel_message
+
+
+@pytest.fixture
+def in_memory_layer(settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    channel_layers.backends.clear()
+    yield
+    channel_layers.backends.clear()
+
+
+@pytest.fixture
+def housekeeper():
+    return User.objects.create_user(username="consumer_hk", password="password", role=User.Role.HOUSEKEEPER)
+
+
+def _socket(user, query=''):
+    communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), f"/ws/notifications/{query}")
+    communicator.scope["user"] = user
+    return communicator
+
+
+@pytest.mark.django_db
+def test_pre_encoded_frames_are_sent_as_is(in_memory_layer, housekeeper):
+    async def scenario():
+        socket = _socket(housekeeper)
+        assert (await socket.connect())[0]
+        layer = channel_layers['default']
+
+        pre_encoded = channel_message("send_notification", {"id": "1", "title": "Задача"})
+        await layer.group_send(f"user_{housekeeper.id}", pre_encoded)
+        assert await socket.receive_from() == pre_encoded["text"]
+
+        # Сообщения в прежнем формате по-прежнему доставляются / Messages in the old format are still delivered
+        await layer.group_send(f"user_{housekeeper.id}", {"type": "send_notification", "message": {"id": "2"}})
+        assert json.loads(await socket.receive_from()) == {"id": "2"}
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_coalescing_window_batches_events_into_one_array_frame(in_memory_layer, housekeeper):
+    async def scenario():
+        socket = _socket(housekeeper, "?coalesce=50")
+        assert (await socket.connect())[0]
+        layer = channel_layers['default']
+
+        for index in range(3):
+            await layer.group_send(f"user_{housekeeper.id}", channel_message("send_notification", {"id": str(index)}))
+        assert json.loads(await socket.receive_from(timeout=2)) == [{"id": "0"}, {"id": "1"}, {"id": "2"}]
+
+        await layer.group_send(f"user_{housekeeper.id}", channel_message("send_notification", {"id": "3"}))
+        assert json.loads(await socket.receive_from(timeout=2)) == {"id": "3"}
+        assert await socket.receive_nothing(timeout=0.1)
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_coalescing_flushes_a_full_batch_at_once(in_memory_layer, housekeeper, settings):
+    settings.WEBSOCKET_COALESCE_MAX_EVENTS = 2
+
+    async def scenario():
+        socket = _socket(housekeeper, "?coalesce=1000")
+        assert (await socket.connect())[0]
+        layer = channel_layers['default']
+
+        for index in range(2):
+            await layer.group_send(f"user_{housekeeper.id}", channel_message("send_notification", {"id": str(index)}))
+        assert json.loads(await socket.receive_from(timeout=0.5)) == [{"id": "0"}, {"id": "1"}]
+        await socket.disconnect()
+
+    async_to_sync(scenario)()
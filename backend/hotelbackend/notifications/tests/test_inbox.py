@@ -0,0 +1,118 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from notifications import inbox
+from notifications.models import Notification, RoleNotification
+from users.models import User
+from utills import notificationService
+from utills.notificationService import NotificationEvent
+from utills.tests.fakeChannels import recording_channels
+
+
+@pytest.fixture
+def front_desk():
+    return [
+        User.objects.create_user(username=f"inbox_fd_{index}", password="password", role=User.Role.FRONT_DESK)
+        for index in range(3)
+    ]
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+def test_role_broadcast_is_one_row_seen_by_offline_users(monkeypatch, front_desk):
+    web = recording_channels(monkeypatch)["web"]
+    notificationService.notification_service.deliver([
+        NotificationEvent(
+            event_type="cleaning_completed",
+            title="Уборка завершена",
+            body="Номер 101",
+            web_roles=(User.Role.FRONT_DESK, User.Role.MANAGER),
+            persist=True,
+        ),
+    ])
+
+    assert RoleNotification.objects.count() == 2
+    assert not Notification.objects.exists()
+    assert sorted(group for group, _ in web) == ["online_front-desk", "online_manager"]
+
+    response = _client(front_desk[2]).get(reverse('notification-list'), {"all": "true"})
+    assert [(entry["scope"], entry["title"], entry["is_read"]) for entry in response.data] == [
+        (inbox.ROLE, "Уборка завершена", False),
+    ]
+
+
+@pytest.mark.django_db
+def test_merged_list_and_unread_count_follow_the_cursor(front_desk, django_assert_max_num_queries):
+    user = front_desk[0]
+    Notification.objects.create(user=user, title="Личное", body="", notification_type="info")
+    first, second = (
+        RoleNotification.objects.create(role=User.Role.FRONT_DESK, title=title, body="", notification_type="info")
+        for title in ("Первое", "Второе")
+    )
+    RoleNotification.objects.create(role=User.Role.MANAGER, title="Менеджерам", body="", notification_type="info")
+    client = _client(user)
+
+    with django_assert_max_num_queries(3):
+        assert client.get(reverse('notification-unread-count')).data == {"unread_count": 3}
+
+    response = client.post(reverse('notification-mark-as-read'), {"role_notification_ids": [first.id]}, format='json')
+    assert response.data["role_read_cursor"] == first.id
+    assert client.get(reverse('notification-unread-count')).data == {"unread_count": 2}
+    # Курсор не сдвигается назад / The cursor never moves back
+    client.post(reverse('notification-mark-as-read'), {"role_notification_ids": [second.id]}, format='json')
+    client.post(reverse('notification-mark-as-read'), {"role_notification_ids": [first.id]}, format='json')
+    assert inbox.read_cursor(user) == second.id
+
+    entries = client.get(reverse('notification-list'), {"all": "true"}).data
+    assert {(entry["scope"], entry["title"], entry["is_read"]) for entry in entries} == {
+        (inbox.PERSONAL, "Личное", False),
+        (inbox.ROLE, "Первое", True),
+        (inbox.ROLE, "Второе", True),
+    }
+    assert [entry["title"] for entry in client.get(reverse('notification-unread')).data] == ["Личное"]
+
+    # Курсор у каждого пользователя свой / Every user has their own cursor
+    assert _client(front_desk[1]).get(reverse('notification-unread-count')).data == {"unread_count": 2}
+
+
+@pytest.mark.django_db
+def test_mark_all_reads_personal_and_role_inbox(front_desk):
+    user = front_desk[0]
+    Notification.objects.create(user=user, title="Личное", body="", notification_type="info")
+    RoleNotification.objects.create(role=User.Role.FRONT_DESK, title="Общее", body="", notification_type="info")
+    client = _client(user)
+
+    client.post(reverse('notification-mark-as-read'), {"mark_all": True}, format='json')
+    assert client.get(reverse('notification-unread-count')).data == {"unread_count": 0}
+
+
+@pytest.mark.django_db
+def test_unread_count_etag_changes_on_role_broadcast(front_desk):
+    client = _client(front_desk[0])
+    url = reverse('notification-unread-count')
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    inbox.create_role_notifications([User.Role.FRONT_DESK], "Общее", "", "info")
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data == {"unread_count": 1}
+
+
+@pytest.mark.django_db
+def test_paginated_merged_list(front_desk):
+    user = front_desk[0]
+    for index in range(6):
+        Notification.objects.create(user=user, title=f"Личное {index}", body="", notification_type="info")
+        RoleNotification.objects.create(role=User.Role.FRONT_DESK, title=f"Общее {index}", body="", notification_type="info")
+
+    response = _client(user).get(reverse('notification-list'))
+    assert response.data["count"] == 12
+    assert len(response.data["results"]) == 10
+    assert response.data["results"][0]["title"] == "Общее 5"
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from notifications.models import Notification, UnreadCounter
+from users.models import User
+from utills import webNotifications
+from utills.notificationService import NotificationEvent, notification_service
+from utills.tests.fakeChannels import recording_channels
+
+
+class UnreadCountLayer:
+    """
+    Заменитель channel layer: запоминает (группа, число непрочитанных).
+    Stand-in for the channel layer: records (group, unread count).
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        if message["type"] == "unread_count":
+            self.sent.append((group, json.loads(message["text"])["unread_count"]))
+
+
+@pytest.fixture
+def unread_layer(monkeypatch):
+    layer = UnreadCountLayer()
+    monkeypatch.setattr(webNotifications, 'get_channel_layer', lambda: layer)
+    return layer
+
+
+@pytest.fixture
+def housekeepers():
+    return [
+        User.objects.create_user(username=f"unread_hk_{index}", password="password", role=User.Role.HOUSEKEEPER)
+        for index in range(2)
+    ]
+
+
+def _counter(user):
+    return UnreadCounter.objects.filter(user=user).values_list('unread', flat=True).first()
+
+
+def _notify(user, title="Уведомление"):
+    return Notification.objects.create(user=user, title=title, body="", notification_type="info")
+
+
+@pytest.mark.django_db
+def test_counter_follows_inserts_reads_and_deletes(housekeepers):
+    user = housekeepers[0]
+    first = _notify(user)
+    second = _notify(user)
+    assert _counter(user) == 2
+
+    first.is_read = True
+    first.save()
+    first.save()
+    assert _counter(user) == 1
+
+    second.delete()
+    first.delete()
+    assert _counter(user) == 0
+
+
+@pytest.mark.django_db
+def test_bulk_delivery_and_mark_read_update_the_counter(monkeypatch, housekeepers, django_assert_max_num_queries):
+    recording_channels(monkeypatch)
+    notification_service.deliver([
+        NotificationEvent(
+            event_type="task_assigned",
+            title="Новая задача",
+            body="",
+            user_ids=tuple(user.id for user in housekeepers),
+            persist=True,
+        )
+        for _ in range(3)
+    ])
+    assert [_counter(user) for user in housekeepers] == [3, 3]
+
+    client = APIClient()
+    client.force_authenticate(housekeepers[0])
+    ids = list(Notification.objects.filter(user=housekeepers[0]).values_list('id', flat=True)[:2])
+    client.post(reverse('notification-mark-as-read'), {"notification_ids": ids}, format='json')
+    # Повторная отметка не уменьшает счетчик / Marking again does not decrease the counter
+    client.post(reverse('notification-mark-as-read'), {"notification_ids": ids}, format='json')
+    assert _counter(housekeepers[0]) == 1
+
+    # Без COUNT по таблице уведомлений: счетчик, курсор роли, уведомления роли
+    # No COUNT over the notification table: the counter, the role cursor, the role notifications
+    with django_assert_max_num_queries(3):
+        assert client.get(reverse('notification-unread-count')).data == {"unread_count": 1}
+
+    client.post(reverse('notification-mark-as-read'), {"mark_all": True}, format='json')
+    assert [_counter(user) for user in housekeepers] == [0, 3]
+
+
+@pytest.mark.django_db
+def test_counter_changes_are_pushed_after_commit(unread_layer, housekeepers, django_capture_on_commit_callbacks):
+    user = housekeepers[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        _notify(user)
+        _notify(user)
+    assert unread_layer.sent[-1] == (f"user_{user.id}", 2)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.objects.filter(user=user).first().delete()
+    assert unread_layer.sent[-1] == (f"user_{user.id}", 1)
+
+
+@pytest.mark.django_db
+def test_missing_counter_is_initialized_from_the_table(housekeepers):
+    user = housekeepers[0]
+    _notify(user)
+    _notify(user)
+    UnreadCounter.objects.all().delete()
+
+    _notify(user)
+    assert _counter(user) == 3
+
+
+@pytest.mark.django_db
+def test_reconcile_command_fixes_drift(housekeepers):
+    _notify(housekeepers[0])
+    _notify(housekeepers[1])
+    UnreadCounter.objects.filter(user=housekeepers[0]).update(unread=7)
+    UnreadCounter.objects.filter(user=housekeepers[1]).delete()
+    Notification.objects.filter(user=housekeepers[1]).update(is_read=False)
+
+    call_command('reconcile_unread_counters')
+    assert [_counter(user) for user in housekeepers] == [1, 1]
+
+    UnreadCounter.objects.filter(user=housekeepers[1]).update(unread=5)
+    call_command('reconcile_unread_counters', '--user', str(housekeepers[0].id))
+    assert [_counter(user) for user in housekeepers] == [1, 5]
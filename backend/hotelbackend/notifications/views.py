@@ -6,15 +6,25 @@ from django.shortcuts import get_object_or_404
 import logging
 
 from utills.mixins import AllowAllPaginationMixin
+from utills.notificationService import notification_service
+from utills.permissions import IsManager
+from utills.pushTokenCache import push_token_cache
+from utills.responseCache import NOTIFICATIONS, conditional_response, for_role, for_user, invalidate, user_namespace
 
-from .models import Notification
-from .serializers import NotificationSerializer
+from . import inbox
+from .models import ArchivedNotification, Notification
+from .serializers import ArchivedNotificationSerializer, InboxEntrySerializer, NotificationSerializer
 
 logger = logging.getLogger(__name__)
 
 class NotificationViewSet(AllowAllPaginationMixin,viewsets.ReadOnlyModelViewSet):
     """
     ViewSet для просмотра уведомлений пользователя и отметки их как прочитанных.
+    Список и непрочитанные объединяют личные уведомления и общий inbox роли (поле scope).
+    ?archived=true — архивные уведомления пользователя (см. ArchivedNotification).
+
+    Lists and unread merge personal notifications with the role's shared inbox (the scope field).
+    ?archived=true lists the user's archived notifications (see ArchivedNotification).
     """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
@@ -23,30 +33,67 @@ class NotificationViewSet(AllowAllPaginationMixin,viewsets.ReadOnlyModelViewSet)
         
         return Notification.objects.filter(user=self.request.user)
 
+    def _inbox_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        context = self.get_serializer_context()
+        if page is not None:
+            return self.get_paginated_response(InboxEntrySerializer(page, many=True, context=context).data)
+        return Response(InboxEntrySerializer(queryset, many=True, context=context).data)
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('archived', '').lower() == 'true':
+            return self._archive_response(request.user)
+        return self._inbox_response(inbox.merged_inbox(request.user))
+
+    def _archive_response(self, user):
+        queryset = ArchivedNotification.objects.filter(user=user).order_by('-created_at', '-id')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(ArchivedNotificationSerializer(page, many=True).data)
+        return Response(ArchivedNotificationSerializer(queryset, many=True).data)
+
     
     @action(detail=False, methods=['post'], url_path='mark-read')
     def mark_as_read(self, request):
         notification_ids = request.data.get('notification_ids', [])
         mark_all = request.data.get('mark_all', False)
         single_notification_id = request.data.get('single_notification_id')
+        # Общий inbox роли: курсор сдвигается до наибольшего из указанных id
+        # Role shared inbox: the cursor moves up to the largest of the given ids
+        role_notification_ids = request.data.get('role_notification_ids', [])
         logger.debug(f' single_notification_id {single_notification_id}')
 
+        if role_notification_ids or mark_all:
+            try:
+                up_to_id = max(int(value) for value in role_notification_ids) if role_notification_ids else None
+            except (TypeError, ValueError):
+                return Response({"detail": "role_notification_ids must be a list of integers."}, status=status.HTTP_400_BAD_REQUEST)
+            cursor = inbox.mark_role_read(request.user, up_to_id)
+            if not (mark_all or notification_ids or single_notification_id):
+                return Response({"detail": "Role notifications marked as read.", "role_read_cursor": cursor}, status=status.HTTP_200_OK)
+
         queryset = self.get_queryset() 
+        # update() не отправляет post_save — версию уведомлений пользователя увеличиваем явно
+        # update() does not send post_save, so the user's notification version is bumped explicitly
+        invalidate(user_namespace(NOTIFICATIONS, request.user.pk))
 
         if mark_all:
             
             updated_count = queryset.filter(is_read=False).update(is_read=True)
+            inbox.adjust_unread({request.user.pk: -updated_count})
             logger.info(f"User {request.user.username} marked all {updated_count} notifications as read.")
             return Response({"detail": f"All {updated_count} notifications marked as read."}, status=status.HTTP_200_OK)
         
         elif notification_ids:
             
             updated_count = queryset.filter(id__in=notification_ids, is_read=False).update(is_read=True)
+            inbox.adjust_unread({request.user.pk: -updated_count})
             logger.info(f"User {request.user.username} marked {updated_count} specific notifications as read.")
             return Response({"detail": f"{updated_count} notifications marked as read."}, status=status.HTTP_200_OK)
         elif single_notification_id:
             try:
-                self.get_queryset().filter(id=single_notification_id).update(is_read=True)
+                updated_count = self.get_queryset().filter(id=single_notification_id, is_read=False).update(is_read=True)
+                inbox.adjust_unread({request.user.pk: -updated_count})
                 return Response({'status': 'Notification marked as read'})
             except Exception as e:
                 return Response({'error': str(e)}, status=400)
@@ -55,15 +102,23 @@ class NotificationViewSet(AllowAllPaginationMixin,viewsets.ReadOnlyModelViewSet)
 
     
     @action(detail=False, methods=['get'], url_path='unread-count')
+    @conditional_response(for_user(NOTIFICATIONS), for_role(NOTIFICATIONS), per_user=True)
     def unread_count(self, request):
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({"unread_count": count}, status=status.HTTP_200_OK)
+        return Response({"unread_count": inbox.unread_count(request.user)}, status=status.HTTP_200_OK)
     
 
     @action(detail=False, methods=['get'],url_path='unread')
     def unread(self, request):
-       
-        queryset = self.get_queryset().filter(is_read=False)
-      
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = inbox.merged_inbox(request.user, unread_only=True)
+        return Response(InboxEntrySerializer(queryset, many=True, context=self.get_serializer_context()).data)
+
+    @action(detail=False, methods=['get'], url_path='metrics', permission_classes=[IsAuthenticated, IsManager])
+    def metrics(self, request):
+        """
+        Счетчики доставки по типу события и статистика кэша push-токенов (только для менеджеров).
+        Per-event delivery counters and push-token cache stats (managers only).
+        """
+        return Response({
+            "events": notification_service.metrics.snapshot(),
+            "push_token_cache": push_token_cache.stats(),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import SyncTombstone
+
+@admin.register(SyncTombstone)
+class SyncTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model_label', 'object_id', 'deleted_at')
+    list_filter = ('model_label',)
+    readonly_fields = ('deleted_at',)
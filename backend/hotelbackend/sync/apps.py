@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+
+    def ready(self):
+        # Подключаем запись «надгробий» удаленных строк / Connect tombstones for deleted rows
+        from . import signals  # noqa: F401
@@ -0,0 +1,163 @@
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from booking.models import Booking
+from booking.serializers import BookingSerializer
+from cleaning.models import CleaningTask
+from cleaning.serializers import CleaningTaskSerializer
+from hotel.models import Room
+from hotel.serializers import RoomSerializer, RoomStatusSerializer
+from users.models import User
+
+from .models import SyncTombstone
+
+# Активные статусы задач, которые синхронизируются горничной
+# Active task statuses synced to a housekeeper
+HOUSEKEEPER_TASK_STATUSES = (
+    CleaningTask.Status.ASSIGNED,
+    CleaningTask.Status.IN_PROGRESS,
+    CleaningTask.Status.WAITING_CHECK,
+)
+
+
+class SyncResource(NamedTuple):
+    name: str
+    model: type
+    queryset: object
+    serializer_class: type
+    # Строки, которые клиент мог держать: измененные и ставшие невидимыми отдаются как удаленные
+    # Rows the client could have held: changed ones that are no longer visible are sent as deleted
+    held: object = None
+    # (дата курсора) -> строки, вышедшие из окна дат без изменения updated_at
+    # (cursor date) -> rows that left the date window without an updated_at change
+    expired: object = None
+
+
+def _start_of(day):
+    return timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()))
+
+
+def resources_for(user):
+    """
+    Синхронизируемые наборы данных пользователя: задачи с сегодняшнего дня (горничная — только свои
+    активные), номера, текущие и будущие бронирования (только менеджер и ресепшн).
+
+    The user's synced data sets: tasks from today on (a housekeeper gets only their own active ones),
+    rooms, and current and upcoming bookings (managers and front desk only).
+    """
+    today = timezone.localdate()
+    tasks = CleaningTask.objects.all()
+    if user.role == User.Role.HOUSEKEEPER:
+        tasks = tasks.filter(assigned_to=user)
+    visible_tasks = tasks.with_related().filter(scheduled_date__gte=today)
+
+    def task_resource(queryset, serializer_class):
+        return SyncResource(
+            'tasks', CleaningTask, queryset, serializer_class,
+            held=lambda since_date: tasks.filter(scheduled_date__gte=since_date),
+            expired=lambda since_date: tasks.filter(scheduled_date__gte=since_date, scheduled_date__lt=today),
+        )
+
+    if user.role in (User.Role.MANAGER, User.Role.FRONT_DESK):
+        start_of_today = _start_of(today)
+        return [
+            task_resource(visible_tasks, CleaningTaskSerializer),
+            SyncResource('rooms', Room, Room.objects.select_related('room_type'), RoomSerializer),
+            SyncResource(
+                'bookings',
+                Booking,
+                Booking.objects.select_related('room__room_type', 'created_by').filter(
+                    Q(check_out__isnull=True) | Q(check_out__gte=start_of_today)
+                ),
+                BookingSerializer,
+                held=lambda since_date: Booking.objects.filter(
+                    Q(check_out__isnull=True) | Q(check_out__gte=_start_of(since_date))
+                ),
+                expired=lambda since_date: Booking.objects.filter(
+                    check_out__gte=_start_of(since_date), check_out__lt=start_of_today
+                ),
+            ),
+        ]
+    if user.role == User.Role.HOUSEKEEPER:
+        return [
+            task_resource(visible_tasks.filter(status__in=HOUSEKEEPER_TASK_STATUSES), CleaningTaskSerializer),
+            SyncResource('rooms', Room, Room.objects.all(), RoomStatusSerializer),
+        ]
+    return []
+
+
+def _overlap():
+    return timedelta(seconds=settings.SYNC_CURSOR_OVERLAP_SECONDS)
+
+
+def needs_full_sync(since):
+    """
+    Полная выгрузка нужна без курсора и если курсор старше хранения «надгробий».
+    A full download is needed without a cursor or when the cursor is older than tombstone retention.
+    """
+    return since is None or since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def collect_changes(user, since, context=None):
+    """
+    Изменения для пользователя с момента since (None — полная выгрузка).
+    Для каждого набора: измененные видимые строки и id удаленных или вышедших из видимости строк.
+    Следующий курсор — время начала выборки; строки последних SYNC_CURSOR_OVERLAP_SECONDS секунд
+    отдаются повторно, чтобы не потерять транзакции, зафиксированные позже своего updated_at.
+
+    Changes for the user since `since` (None means a full download).
+    For every data set: the changed visible rows and the ids of rows deleted or no longer visible.
+    The next cursor is the time the read started; rows of the last SYNC_CURSOR_OVERLAP_SECONDS seconds
+    are sent again so that transactions committed after their updated_at are not lost.
+    """
+    cursor = timezone.now()
+    full = needs_full_sync(since)
+    # Курсор в UTC с суффиксом Z — без "+", который нужно экранировать в URL
+    # The cursor is UTC with a Z suffix — no "+" that would need escaping in a URL
+    changes = {"cursor": cursor.isoformat().replace('+00:00', 'Z'), "full": full, "deleted": {}}
+
+    for resource in resources_for(user):
+        if full:
+            rows = resource.queryset
+            deleted_ids = []
+        else:
+            changed_after = since - _overlap()
+            since_date = timezone.localdate(changed_after)
+            rows = list(resource.queryset.filter(updated_at__gt=changed_after))
+            visible_ids = {row.pk for row in rows}
+            deleted_ids = set(
+                SyncTombstone.objects.filter(
+                    Q(user__isnull=True) | Q(user=user),
+                    model_label=resource.model._meta.label_lower,
+                    deleted_at__gt=changed_after,
+                ).values_list('object_id', flat=True)
+            )
+            if resource.held is not None:
+                # Только строки, которые клиент мог держать (свои задачи горничной), — не весь отель
+                # Only rows the client could have held (a housekeeper's own tasks) — not the whole hotel
+                deleted_ids.update(
+                    resource.held(since_date).filter(updated_at__gt=changed_after)
+                    .exclude(pk__in=visible_ids).values_list('pk', flat=True)
+                )
+            if resource.expired is not None:
+                # Вышли из окна дат (вчера и раньше) без изменения updated_at
+                # Left the date window (yesterday and earlier) without an updated_at change
+                deleted_ids.update(resource.expired(since_date).values_list('pk', flat=True))
+            deleted_ids = sorted(deleted_ids)
+
+        changes[resource.name] = resource.serializer_class(rows, many=True, context=context or {}).data
+        changes["deleted"][resource.name] = deleted_ids
+    return changes
+
+
+def purge_tombstones(days=None):
+    """
+    Удаляет «надгробия» старше срока хранения; более старые курсоры получают полную выгрузку.
+    Deletes tombstones older than the retention period; older cursors get a full download.
+    """
+    days = settings.SYNC_TOMBSTONE_RETENTION_DAYS if days is None else days
+    return SyncTombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()[0]
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import models
+
+
+class ChangeTrackedModel(models.Model):
+    """
+    Абстрактная модель с отметкой изменения для дельта-синхронизации.
+    updated_at обновляется при каждом save(), в том числе с update_fields
+    (Django обновляет auto_now-поля только если они перечислены в update_fields).
+
+    Abstract model with a change timestamp for delta sync.
+    updated_at is bumped on every save(), including saves with update_fields
+    (Django only bumps auto_now fields when they are listed in update_fields).
+    """
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Дата и время обновления"
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
+
+
+class SyncTombstone(models.Model):
+    """
+    Запись об удаленной строке синхронизируемой модели: клиенты узнают об удалениях
+    через /sync. Запись с user — строка пропала только у этого пользователя (задачу
+    переназначили). Хранится SYNC_TOMBSTONE_RETENTION_DAYS дней (sync.tasks.purge_sync_tombstones).
+
+    Record of a deleted row of a synced model, so clients learn about deletions
+    through /sync. A record with a user means the row only left that user's data set
+    (the task was reassigned). Kept for SYNC_TOMBSTONE_RETENTION_DAYS days (sync.tasks.purge_sync_tombstones).
+    """
+    class Meta:
+        verbose_name = "Удаленная запись"
+        verbose_name_plural = "Удаленные записи"
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at']),
+        ]
+
+    model_label = models.CharField(max_length=100, verbose_name="Модель")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID объекта")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True, # Удаление для всех / A deletion for everyone
+        blank=True,
+        related_name='+',
+        verbose_name="Пользователь"
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Дата удаления")
+
+    def __str__(self):
+        return f"{self.model_label}#{self.object_id} ({self.deleted_at})"
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from booking.models import Booking
+from cleaning.models import CleaningTask
+from hotel.models import Room
+
+from .models import SyncTombstone
+
+
+@receiver(post_delete, sender=CleaningTask)
+@receiver(post_delete, sender=Room)
+@receiver(post_delete, sender=Booking)
+def record_tombstone(sender, instance, **kwargs):
+    """
+    Удаления синхронизируемых моделей отдаются клиентам через /sync.
+    Deletions of synced models are delivered to clients through /sync.
+    """
+    SyncTombstone.objects.create(model_label=sender._meta.label_lower, object_id=instance.pk)
+
+
+@receiver(post_init, sender=CleaningTask)
+def remember_sync_assignee(sender, instance, **kwargs):
+    if 'assigned_to_id' in instance.__dict__:
+        instance._sync_assigned_to_id = instance.assigned_to_id
+
+
+@receiver(post_save, sender=CleaningTask)
+def record_reassignment_tombstone(sender, instance, created, **kwargs):
+    """
+    Переназначенная задача пропадает у прежней горничной — «надгробие» только для нее.
+    A reassigned task leaves the previous housekeeper's data set — a tombstone for them only.
+    """
+    previous = getattr(instance, '_sync_assigned_to_id', None)
+    instance._sync_assigned_to_id = instance.assigned_to_id
+    if not created and previous and previous != instance.assigned_to_id:
+        SyncTombstone.objects.create(model_label=sender._meta.label_lower, object_id=instance.pk, user_id=previous)
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .changes import purge_tombstones
+
+
+@shared_task
+def purge_sync_tombstones(days=None):
+    return purge_tombstones(days=days)
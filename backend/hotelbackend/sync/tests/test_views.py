@@ -0,0 +1,179 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import Booking
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask
+from hotel.models import Room, RoomType
+from sync.changes import purge_tombstones
+from sync.models import SyncTombstone
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def no_overlap(settings):
+    settings.SYNC_CURSOR_OVERLAP_SECONDS = 0
+
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(username="manager_sync", password="password", role=User.Role.MANAGER)
+
+
+@pytest.fixture
+def housekeeper():
+    return User.objects.create_user(username="hk_sync", password="password", role=User.Role.HOUSEKEEPER)
+
+
+@pytest.fixture
+def hotel(housekeeper):
+    room_type = RoomType.objects.create(name="Double", capacity=2)
+    rooms = [Room.objects.create(number=number, floor=1, room_type=room_type) for number in (101, 102)]
+    now = timezone.now()
+    booking = Booking.objects.create(room=rooms[0], check_in=now - timedelta(days=1), check_out=now + timedelta(days=1))
+    tasks = [
+        CleaningTask.objects.create(
+            room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=timezone.localdate(), assigned_to=housekeeper,
+        )
+        for room in rooms
+    ]
+    # Все строки изменены «давно» — до курсора / All rows were changed "long ago" — before the cursor
+    an_hour_ago = now - timedelta(hours=1)
+    for model in (Room, Booking, CleaningTask):
+        model.objects.update(updated_at=an_hour_ago)
+    return {"rooms": rooms, "booking": booking, "tasks": tasks}
+
+
+def sync(user, since=None):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.get(reverse('sync'), {"since": since} if since else {})
+    assert response.status_code == 200, response.data
+    return response.data
+
+
+def ids(rows):
+    return {row["id"] for row in rows}
+
+
+@pytest.mark.django_db
+def test_full_sync_without_cursor(manager, hotel):
+    data = sync(manager)
+
+    assert data["full"] is True
+    assert ids(data["tasks"]) == {task.id for task in hotel["tasks"]}
+    assert ids(data["rooms"]) == {room.id for room in hotel["rooms"]}
+    assert ids(data["bookings"]) == {hotel["booking"].id}
+    assert data["cursor"].endswith("Z")
+
+
+@pytest.mark.django_db
+def test_delta_returns_only_changed_and_deleted_rows(manager, hotel):
+    cursor = sync(manager)["cursor"]
+    assert sync(manager, cursor)["tasks"] == []
+
+    task = hotel["tasks"][0]
+    task.notes = "Extra towels"
+    task.save(update_fields=['notes'])
+    room = hotel["rooms"][1]
+    room.status = Room.Status.DIRTY
+    room.save(update_fields=['status'])
+    booking_id = hotel["booking"].id
+    hotel["booking"].delete()
+
+    data = sync(manager, cursor)
+
+    assert data["full"] is False
+    assert ids(data["tasks"]) == {task.id}
+    assert data["tasks"][0]["notes"] == "Extra towels"
+    assert ids(data["rooms"]) == {room.id}
+    assert data["bookings"] == []
+    assert data["deleted"] == {"tasks": [], "rooms": [], "bookings": [booking_id]}
+
+
+@pytest.mark.django_db
+def test_housekeeper_sees_own_tasks_and_loses_reassigned_ones(manager, housekeeper, hotel):
+    data = sync(housekeeper)
+    assert ids(data["tasks"]) == {task.id for task in hotel["tasks"]}
+    assert "bookings" not in data
+    assert set(data["rooms"][0]) == {"id", "number", "status"}
+
+    reassigned, deleted = hotel["tasks"]
+    reassigned.assigned_to = manager
+    reassigned.save()
+    deleted_id = deleted.id
+    deleted.delete()
+
+    delta = sync(housekeeper, data["cursor"])
+    assert delta["tasks"] == []
+    assert delta["deleted"]["tasks"] == sorted([reassigned.id, deleted_id])
+
+
+@pytest.mark.django_db
+def test_checklist_change_marks_task_changed(manager, hotel):
+    from cleaning.models import ChecklistTemplate
+
+    cursor = sync(manager)["cursor"]
+    template = ChecklistTemplate.objects.create(name="Minibar", cleaning_type=CleaningTypeChoices.STAYOVER)
+    hotel["tasks"][1].associated_checklists.set([template])
+
+    assert ids(sync(manager, cursor)["tasks"]) == {hotel["tasks"][1].id}
+
+
+@pytest.mark.django_db
+def test_invalid_and_expired_cursors(manager, hotel, settings):
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    assert client.get(reverse('sync'), {"since": "yesterday"}).status_code == 400
+
+    expired = (timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)).isoformat()
+    assert sync(manager, expired)["full"] is True
+
+
+@pytest.mark.django_db
+def test_purge_tombstones(hotel):
+    booking_id = hotel["booking"].id
+    hotel["booking"].delete()
+    SyncTombstone.objects.create(model_label="booking.booking", object_id=999)
+    SyncTombstone.objects.filter(object_id=999).update(deleted_at=timezone.now() - timedelta(days=40))
+
+    assert purge_tombstones(days=30) == 1
+    assert list(SyncTombstone.objects.values_list('object_id', flat=True)) == [booking_id]
+
+
+@pytest.mark.django_db
+def test_housekeeper_delta_ignores_other_housekeepers_tasks(manager, housekeeper, hotel):
+    other = User.objects.create_user(username="hk_sync_other", password="password", role=User.Role.HOUSEKEEPER)
+    others_task = CleaningTask.objects.create(
+        room=hotel["rooms"][0], cleaning_type=CleaningTypeChoices.STAYOVER,
+        scheduled_date=timezone.localdate(), assigned_to=other,
+    )
+    cursor = sync(housekeeper)["cursor"]
+
+    others_task.notes = "Not yours"
+    others_task.save()
+    others_task.assigned_to = manager
+    others_task.save()
+
+    delta = sync(housekeeper, cursor)
+    assert delta["tasks"] == []
+    assert delta["deleted"]["tasks"] == []
+
+
+@pytest.mark.django_db
+def test_tasks_and_bookings_past_the_date_window_are_deleted(manager, hotel):
+    yesterday = timezone.localdate() - timedelta(days=1)
+    cursor = (timezone.now() - timedelta(days=2)).isoformat()
+    task = hotel["tasks"][0]
+    booking = hotel["booking"]
+    # Дата прошла без изменения updated_at / The date passed without an updated_at change
+    CleaningTask.objects.filter(pk=task.pk).update(scheduled_date=yesterday)
+    Booking.objects.filter(pk=booking.pk).update(check_out=timezone.now() - timedelta(days=1))
+
+    delta = sync(manager, cursor)
+    assert delta["deleted"]["tasks"] == [task.id]
+    assert delta["deleted"]["bookings"] == [booking.id]
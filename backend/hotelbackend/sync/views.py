@@ -0,0 +1,33 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .changes import collect_changes
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_changes(request):
+    """
+    Дельта-синхронизация для мобильных клиентов: GET /api/sync/?since=<cursor>.
+    Возвращает строки задач, номеров и бронирований, измененные после курсора, id удаленных
+    (или ставших невидимыми) строк в "deleted" и новый "cursor" для следующего запроса.
+    Без since или с устаревшим курсором — полная выгрузка ("full": true).
+
+    Delta sync for mobile clients: GET /api/sync/?since=<cursor>.
+    Returns task, room and booking rows changed after the cursor, the ids of deleted
+    (or no longer visible) rows in "deleted" and a new "cursor" for the next request.
+    Without since or with an expired cursor it is a full download ("full": true).
+    """
+    since_str = request.query_params.get('since')
+    since = None
+    if since_str:
+        since = parse_datetime(since_str)
+        if since is None or since.tzinfo is None:
+            return Response(
+                {"detail": "Параметр 'since' должен быть курсором из предыдущего ответа /sync."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    return Response(collect_changes(request.user, since, context={'request': request}), status=status.HTTP_200_OK)
@@ -7,6 +7,7 @@ from .models import User, PushToken #
 class PushTokenInline(admin.TabularInline):
     model = PushToken
     extra = 0 
+    readonly_fields = ('failure_count', 'last_error', 'last_failure_at')
 
 
 class UserAdmin(BaseUserAdmin):
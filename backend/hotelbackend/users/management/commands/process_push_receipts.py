@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from utills.pushReceipts import process_push_receipts
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает квитанции Expo и отключает нерабочие push-токены. '
+        'Fetches Expo push receipts and disables dead push tokens.'
+    )
+
+    def handle(self, *args, **options):
+        summary = process_push_receipts()
+        self.stdout.write(self.style.SUCCESS(f'Processed push receipts: {summary}'))
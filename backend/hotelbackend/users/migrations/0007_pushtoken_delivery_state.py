@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-17 23:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_alter_pushtoken_options_pushtoken_last_registered_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pushtoken',
+            name='failure_count',
+            field=models.PositiveIntegerField(default=0, help_text='Число ошибок доставки подряд', verbose_name='Ошибок доставки'),
+        ),
+        migrations.AddField(
+            model_name='pushtoken',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='False, если Expo вернул DeviceNotRegistered (приложение удалено)', verbose_name='Активен'),
+        ),
+        migrations.AddField(
+            model_name='pushtoken',
+            name='last_error',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Последняя ошибка'),
+        ),
+        migrations.AddField(
+            model_name='pushtoken',
+            name='last_failure_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время последней ошибки'),
+        ),
+        migrations.CreateModel(
+            name='PushTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.CharField(max_length=64, unique=True, verbose_name='ID тикета')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+                ('push_token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='users.pushtoken', verbose_name='Push-токен')),
+            ],
+            options={
+                'verbose_name': 'Push-тикет',
+                'verbose_name_plural': 'Push-тикеты',
+            },
+        ),
+    ]
@@ -54,6 +54,15 @@ class User(AbstractUser):
 # Model for storing push tokens associated with users
 # Модель для хранения push-токенов, связанных с пользователями
 
+class PushTokenQuerySet(models.QuerySet):
+    def active(self):
+        """
+        Только рабочие токены (не отключенные по квитанциям Expo).
+        Working tokens only (not disabled by Expo receipts).
+        """
+        return self.filter(is_active=True)
+
+
 class PushToken(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -88,9 +97,68 @@ class PushToken(models.Model):
         verbose_name="Платформа"
     )
 
+    # Состояние доставки по квитанциям Expo / Delivery state from Expo receipts
+    is_active = models.BooleanField(
+        default=True,
+        help_text="False, если Expo вернул DeviceNotRegistered (приложение удалено)",
+        verbose_name="Активен"
+    )
+
+    failure_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Число ошибок доставки подряд",
+        verbose_name="Ошибок доставки"
+    )
+
+    last_error = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Последняя ошибка"
+    )
+
+    last_failure_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Время последней ошибки"
+    )
+
+    objects = PushTokenQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Push-токен"
         verbose_name_plural = "Push-токены"
     
     def __str__(self):
-        return f"{self.user.username} - {self.token[:10]}... ({self.platform or 'N/A'})"
\ No newline at end of file
+        return f"{self.user.username} - {self.token[:10]}... ({self.platform or 'N/A'})"
+
+
+class PushTicket(models.Model):
+    """
+    Тикет Expo, выданный при отправке; по нему позже запрашивается квитанция доставки.
+    Expo ticket issued on send; the delivery receipt is fetched for it later.
+    """
+    ticket_id = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name="ID тикета"
+    )
+
+    push_token = models.ForeignKey(
+        PushToken,
+        on_delete=models.CASCADE,
+        related_name='tickets',
+        verbose_name="Push-токен"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name="Дата создания"
+    )
+
+    class Meta:
+        verbose_name = "Push-тикет"
+        verbose_name_plural = "Push-тикеты"
+
+    def __str__(self):
+        return f"{self.ticket_id} ({self.push_token_id})"
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utills.pushTokenCache import push_token_cache
+from utills.responseCache import USERS, invalidate, user_namespace
+
+from .models import PushToken, User
+
+
+@receiver([post_save, post_delete], sender=PushToken)
+def invalidate_push_token_cache_for_token(sender, instance, **kwargs):
+    """
+    Изменение токена сбрасывает кэш его пользователя и ролей.
+    A token change drops the cache entries of its user and of the roles.
+    """
+    push_token_cache.invalidate_users([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_push_token_cache_for_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Смена роли или активности пользователя меняет состав токенов ролей.
+    A change of the user's role or activity changes the role token sets.
+    """
+    if update_fields is not None and not {'role', 'is_active'} & set(update_fields):
+        return
+    push_token_cache.invalidate_users([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_responses(sender, update_fields=None, **kwargs):
+    """
+    Имена пользователей входят в ответы задач (assigned_to_name и др.); вход в систему
+    (обновление только last_login) ответы не меняет.
+    User names are part of the task responses (assigned_to_name etc.); a login
+    (updating last_login only) does not change them.
+    """
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate(USERS)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_socket_identity(sender, instance, update_fields=None, **kwargs):
+    """
+    Кэш WebSocket-аутентификации (utills.socketAuth) хранит имя, роль и активность пользователя.
+    The WebSocket authentication cache (utills.socketAuth) holds the user's name, role and activity.
+    """
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate(user_namespace(USERS, instance.pk))
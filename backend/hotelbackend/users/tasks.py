@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from utills.pushReceipts import process_push_receipts
+
+
+@shared_task
+def process_push_receipts_task():
+    """
+    Периодическая проверка квитанций Expo (CELERY_BEAT_SCHEDULE).
+    Periodic Expo receipt check (CELERY_BEAT_SCHEDULE).
+    """
+    return process_push_receipts()
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import RegisterPushTokenView, SendPushNotificationView 
+from .views import RegisterPushTokenView, SendPushNotificationView, SocketTicketView
 urlpatterns = [
     path('register-token/', RegisterPushTokenView.as_view(), name='register-push-token'),
     path('send-notification/', SendPushNotificationView.as_view(), name='send-push-notification'),
+    path('socket-ticket/', SocketTicketView.as_view(), name='socket-ticket'),
     
 ]
\ No newline at end of file
@@ -7,41 +7,22 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
 from rest_framework import status
 from .models import PushToken
+from utills.mobileNotifications import send_notifications_in_thread
+from utills.pushTokenCache import push_token_cache
+from utills.socketAuth import issue_ticket
 from firebase_admin import messaging
-import httpx
 from django.db import transaction
 
 from users.models import User
 from users.serializers import UserSerializer, PushTokenSerializer
 from rest_framework.decorators import action, api_view
 from django.utils import timezone
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
 # --- User ViewSet ---
 
-
-
-def send_expo_push_message(token: str, title: str, body: str, data: dict = None):
-    if not token.startswith('ExponentPushToken'):
-        print(f"Invalid Expo token: {token}")
-        return
-
-    message = {
-        'to': token,
-        'title': title,
-        'body': body,
-        'data': data or {},
-        'sound': 'default',
-    }
-
-    try:
-        response = httpx.post('https://exp.host/--/api/v2/push/send', json=message)
-        response.raise_for_status()
-        print(f"Expo push sent: {response.json()}")
-    except Exception as e:
-        print(f"Error sending push: {e}")
-
 class UserViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing User objects.
@@ -160,6 +141,9 @@ class RegisterPushTokenView(APIView):
                             f"Push token {token} previously registered for user {push_token_obj.user.username} "
                             f"is now being registered for {request.user.username}. Reassigning."
                         )
+                        # Сигнал post_save знает только нового владельца — сбрасываем кэш прежнего
+                        # post_save only knows the new owner — drop the previous owner's cache entry
+                        push_token_cache.invalidate_users([push_token_obj.user_id])
                         push_token_obj.user = request.user
                     
                    
@@ -168,9 +152,14 @@ class RegisterPushTokenView(APIView):
                         
                    
                     push_token_obj.last_registered_at = timezone.now()
-                    
-                    
-                    push_token_obj.save(update_fields=['user', 'platform', 'last_registered_at'])
+
+                    # Повторная регистрация — приложение снова установлено, токен рабочий
+                    # Re-registration means the app is installed again and the token works
+                    push_token_obj.is_active = True
+                    push_token_obj.failure_count = 0
+                    push_token_obj.last_error = ''
+
+                    push_token_obj.save(update_fields=['user', 'platform', 'last_registered_at', 'is_active', 'failure_count', 'last_error'])
                     logger.info(f"Push token {token} updated for user {request.user.username}.")
                 else:
                     logger.info(f"New push token {token} registered for user {request.user.username}.")
@@ -186,6 +175,23 @@ class RegisterPushTokenView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class SocketTicketView(APIView):
+    """
+    Одноразовый короткоживущий билет для подключения WebSocket: ws/notifications/?ticket=...
+    Подключение по билету не декодирует JWT и не обращается к базе.
+
+    A single-use short-lived ticket to open the WebSocket: ws/notifications/?ticket=...
+    Connecting with a ticket neither decodes a JWT nor queries the database.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        return Response(
+            {"ticket": issue_ticket(request.user), "expires_in": settings.SOCKET_TICKET_TIMEOUT},
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class SendPushNotificationView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -194,12 +200,11 @@ class SendPushNotificationView(APIView):
         body = request.data.get('body')
         data = request.data.get('data', {})
 
-        tokens = PushToken.objects.values_list('token', flat=True)
+        tokens = list(PushToken.objects.active().values_list('token', flat=True))
 
         if not tokens:
             return Response({'detail': 'No tokens found'}, status=404)
 
-        for token in tokens:
-            send_expo_push_message(token, title, body, data)
+        send_notifications_in_thread(tokens, title, body, data)
 
         return Response({'detail': f'Sent to {len(tokens)} tokens'})
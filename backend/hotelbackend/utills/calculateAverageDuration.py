@@ -1,75 +1,22 @@
 import logging
+
+from .durationStats import duration_stats
+
 logger = logging.getLogger(__name__)
-from django.db.models.functions import Extract
-from django.db.models import  ExpressionWrapper, Avg
-from django.db import models
+
 
 def calculate_average_duration(queryset, task_type):
     """
-    Универсальная функция для расчета средней продолжительности задач
+    Средняя продолжительность задач в минутах (0, если задач нет).
+    Считается в БД на любом бэкенде — см. utills.durationStats.
+
+    Average task duration in minutes (0 when there are no tasks).
+    Computed in the database on every backend — see utills.durationStats.
     """
-    if not queryset.exists():
+    stats = duration_stats(queryset)
+    if not stats.count:
         logger.info(f"No completed {task_type} tasks found")
         return 0
-    
-    try:
-        # Метод 1: Пробуем с Extract (для PostgreSQL/MySQL)
-        from django.db import connection
-        db_vendor = connection.vendor
-        logger.info(f"Database vendor: {db_vendor}")
-        
-        if db_vendor == 'postgresql':
-            average_result = queryset.annotate(
-                duration_seconds=ExpressionWrapper(
-                    Extract('completed_at', 'epoch') - Extract('started_at', 'epoch'),
-                    output_field=models.FloatField()
-                )
-            ).aggregate(avg_duration=Avg('duration_seconds'))
-            
-            if average_result['avg_duration'] is not None:
-                avg_minutes = average_result['avg_duration'] / 60.0
-                logger.info(f"Average {task_type} cleaning time (PostgreSQL): {avg_minutes:.2f} minutes")
-                return round(avg_minutes, 2)
-                
-        elif db_vendor == 'sqlite':
-           
-            raise Exception("Using Python method for SQLite")
-            
-        elif db_vendor == 'mysql':
-    
-            average_result = queryset.extra(
-                select={'duration_seconds': 'UNIX_TIMESTAMP(completed_at) - UNIX_TIMESTAMP(started_at)'}
-            ).aggregate(avg_duration=Avg('duration_seconds'))
-            
-            if average_result['avg_duration'] is not None:
-                avg_minutes = average_result['avg_duration'] / 60.0
-                logger.info(f"Average {task_type} cleaning time (MySQL): {avg_minutes:.2f} minutes")
-                return round(avg_minutes, 2)
-        
-    except Exception as e:
-        logger.warning(f"SQL method failed for {task_type}: {e}. Using Python calculation.")
-    
-
-    try:
-        total_seconds = 0
-        count = 0
-        
-        for task in queryset:
-            if task.started_at and task.completed_at:
-                duration = (task.completed_at - task.started_at).total_seconds()
-                if duration > 0:
-                    total_seconds += duration
-                    count += 1
-                    logger.debug(f"{task_type} task duration: {duration:.2f} seconds")
-        
-        if count > 0:
-            avg_minutes = total_seconds / count / 60.0
-            logger.info(f"Average {task_type} cleaning time (Python): {avg_minutes:.2f} minutes")
-            return round(avg_minutes, 2)
-        else:
-            logger.info(f"No valid durations found for {task_type} tasks")
-            return 0
-            
-    except Exception as e:
-        logger.error(f"Python calculation failed for {task_type}: {e}")
-        return 0
\ No newline at end of file
+    avg_minutes = stats.as_minutes()["mean"]
+    logger.info(f"Average {task_type} cleaning time: {avg_minutes:.2f} minutes")
+    return avg_minutes
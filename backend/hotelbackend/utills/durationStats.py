@@ -0,0 +1,141 @@
+import math
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from django.db import connections
+from django.db.models import Aggregate, Avg, Count, DurationField, F, Func
+
+
+class Duration(Func):
+    """
+    Продолжительность end - start как DurationField.
+    На SQLite Django вычитает даты через Python-функцию для каждой строки, поэтому там
+    используется встроенная julianday (точность — миллисекунды).
+
+    Duration end - start as a DurationField.
+    On SQLite Django subtracts datetimes through a per-row Python function, so the built-in
+    julianday is used there instead (millisecond precision).
+    """
+    output_field = DurationField()
+
+    def __init__(self, end='completed_at', start='started_at'):
+        super().__init__(F(end), F(start))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        end, start = self.get_source_expressions()
+        return compiler.compile((end - start).resolve_expression(compiler.query))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # DurationField в SQLite хранится в микросекундах / SQLite stores DurationField as microseconds
+        return super().as_sql(
+            compiler,
+            connection,
+            template='CAST(ROUND((julianday(%(expressions)s)) * 86400000) AS INTEGER) * 1000',
+            arg_joiner=') - julianday(',
+            **extra_context,
+        )
+
+
+# Продолжительность выполнения задачи (completed_at - started_at) как выражение БД
+# Task execution time (completed_at - started_at) as a database expression
+DURATION = Duration()
+
+
+class PercentileCont(Aggregate):
+    """
+    percentile_cont(fraction) WITHIN GROUP (ORDER BY expr) — только PostgreSQL.
+    percentile_cont(fraction) WITHIN GROUP (ORDER BY expr) — PostgreSQL only.
+    """
+    function = 'percentile_cont'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction, **extra):
+        if not 0 <= fraction <= 1:
+            raise ValueError("fraction must be between 0 and 1.")
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+class DurationStats(NamedTuple):
+    count: int
+    mean: Optional[timedelta]
+    median: Optional[timedelta]
+    p90: Optional[timedelta]
+
+    def as_minutes(self):
+        """
+        Словарь с минутами (округление до 0.01), пустая выборка — нули.
+        A dict in minutes (rounded to 0.01), an empty sample gives zeros.
+        """
+        def minutes(value):
+            return round(value.total_seconds() / 60.0, 2) if value is not None else 0
+
+        return {
+            "count": self.count,
+            "mean": minutes(self.mean),
+            "median": minutes(self.median),
+            "p90": minutes(self.p90),
+        }
+
+
+def timed_tasks(queryset):
+    """
+    Только задачи с корректным интервалом: оба времени заданы и completed_at > started_at.
+    Only tasks with a valid interval: both timestamps set and completed_at > started_at.
+    """
+    return queryset.filter(
+        started_at__isnull=False,
+        completed_at__isnull=False,
+        completed_at__gt=F('started_at'),
+    )
+
+
+def _percentile_by_offset(queryset, count, fraction):
+    """
+    Перцентиль с линейной интерполяцией (как percentile_cont) через ORDER BY ... LIMIT/OFFSET:
+    из БД читаются не более двух значений, модели не создаются.
+
+    Percentile with linear interpolation (like percentile_cont) via ORDER BY ... LIMIT/OFFSET:
+    at most two values are read from the database and no model instances are built.
+    """
+    position = fraction * (count - 1)
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    values = list(
+        queryset.annotate(duration=DURATION).order_by('duration').values_list('duration', flat=True)[lower:upper + 1]
+    )
+    if len(values) == 1:
+        return values[0]
+    return values[0] + (values[1] - values[0]) * (position - lower)
+
+
+def duration_stats(queryset):
+    """
+    Количество, среднее, медиана и p90 продолжительности задач, посчитанные в БД.
+    PostgreSQL: один запрос с percentile_cont; SQLite/MySQL: агрегат и по запросу
+    LIMIT/OFFSET на каждый перцентиль. Экземпляры моделей не создаются.
+
+    Count, mean, median and p90 of task durations computed in the database.
+    PostgreSQL: one query with percentile_cont; SQLite/MySQL: an aggregate plus one
+    LIMIT/OFFSET query per percentile. No model instances are built.
+    """
+    queryset = timed_tasks(queryset).order_by()
+
+    if connections[queryset.db].vendor == 'postgresql':
+        result = queryset.aggregate(
+            count=Count('pk'),
+            mean=Avg(DURATION),
+            median=PercentileCont(DURATION, 0.5, output_field=DurationField()),
+            p90=PercentileCont(DURATION, 0.9, output_field=DurationField()),
+        )
+        return DurationStats(**result)
+
+    result = queryset.aggregate(count=Count('pk'), mean=Avg(DURATION))
+    if not result['count']:
+        return DurationStats(0, None, None, None)
+    return DurationStats(
+        count=result['count'],
+        mean=result['mean'],
+        median=_percentile_by_offset(queryset, result['count'], 0.5),
+        p90=_percentile_by_offset(queryset, result['count'], 0.9),
+    )
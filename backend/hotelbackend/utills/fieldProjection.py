@@ -0,0 +1,117 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+
+# Параметры запроса проекции / Projection query parameters
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+COMPACT_PARAM = 'compact'
+
+
+def parse_field_list(value):
+    """
+    "a, b,,c" -> ["a", "b", "c"]; пустое значение — пустой список.
+    "a, b,,c" -> ["a", "b", "c"]; an empty value gives an empty list.
+    """
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class ProjectableSerializerMixin:
+    """
+    Сериализатор с проекцией полей: fields= оставляет только указанные поля, omit= убирает поля.
+    projection_sources — пути ORM, которые читают поля-методы; по ним представление
+    сокращает SQL (only()/select_related). Поле-метод без записи отключает сокращение SQL.
+
+    Serializer with field projection: fields= keeps only the listed fields, omit= drops fields.
+    projection_sources maps method fields to the ORM paths they read, so the view can
+    shrink the SQL (only()/select_related). A method field without an entry disables SQL shrinking.
+    """
+    projection_sources = {}
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    def projection_paths(self):
+        return serializer_paths(self)
+
+
+def serializer_paths(serializer, prefix=''):
+    """
+    Пути ORM, которые читают выводимые поля сериализатора (вложенные — рекурсивно).
+    None — если путь какого-то поля неизвестен (source='*' без projection_sources).
+
+    ORM paths read by the serializer's output fields (nested serializers recursively).
+    None if the path of some field is unknown (source='*' without projection_sources).
+    """
+    sources = getattr(serializer, 'projection_sources', {})
+    paths = set()
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in sources:
+            paths.update(prefix + path for path in sources[name])
+            continue
+        if field.source == '*':
+            return None
+        path = prefix + LOOKUP_SEP.join(field.source_attrs)
+        paths.add(path)
+        if isinstance(field, serializers.Serializer):
+            nested = serializer_paths(field, path + LOOKUP_SEP)
+            if nested is None:
+                return None
+            paths |= nested
+    return paths
+
+
+def project_queryset(queryset, paths):
+    """
+    Сокращает SQL до путей paths: only() по колонкам, select_related только нужных связей,
+    из prefetch_related остаются только нужные связи «многие». Если путь не является
+    полем модели (метод, свойство, обратная связь), queryset возвращается без изменений.
+
+    Shrinks the SQL to paths: only() over the columns, select_related of the needed relations
+    only, and only the needed to-many lookups stay prefetched. If a path is not a model field
+    (a method, a property, a reverse relation), the queryset is returned unchanged.
+    """
+    if paths is None:
+        return queryset
+
+    columns = {queryset.model._meta.pk.name}
+    relations = set()
+    prefetches = set()
+    for path in paths:
+        parts = path.split(LOOKUP_SEP)
+        model = queryset.model
+        for index, part in enumerate(parts):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return queryset
+            if field.many_to_many or field.one_to_many:
+                if index:
+                    return queryset
+                prefetches.add(part)
+                break
+            if not field.concrete:
+                return queryset
+            if not field.is_relation or index == len(parts) - 1:
+                columns.add(path)
+                break
+            relations.add(LOOKUP_SEP.join(parts[:index + 1]))
+            model = field.related_model
+
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, 'prefetch_to', lookup).split(LOOKUP_SEP)[0] in prefetches
+    ]
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups)
+    return queryset.only(*columns)
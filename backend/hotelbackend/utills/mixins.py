@@ -1,6 +1,88 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .fieldProjection import (
+    COMPACT_PARAM,
+    FIELDS_PARAM,
+    OMIT_PARAM,
+    ProjectableSerializerMixin,
+    parse_field_list,
+    project_queryset,
+)
+
 
 class AllowAllPaginationMixin:
     def paginate_queryset(self, queryset):
         if self.request.query_params.get('all') == 'true':
             return None
-        return super().paginate_queryset(queryset)
\ No newline at end of file
+        return super().paginate_queryset(queryset)
+
+
+class FieldProjectionMixin:
+    """
+    Проекция ответа для GET-запросов:
+    - ?fields=a,b — только указанные поля, ?omit=c — все, кроме указанных;
+    - ?compact=true — компактный сериализатор списка (compact_serializer_class).
+    SQL сокращается вместе с ответом (only()/select_related) в filter_queryset;
+    неизвестные поля — ошибка 400.
+
+    Response projection for GET requests:
+    - ?fields=a,b — only the listed fields, ?omit=c — everything except the listed ones;
+    - ?compact=true — the compact list serializer (compact_serializer_class).
+    The SQL shrinks together with the response (only()/select_related) in filter_queryset;
+    unknown fields are a 400 error.
+    """
+    compact_serializer_class = None
+
+    def _projection_requested(self):
+        return self.request is not None and self.request.method in SAFE_METHODS
+
+    def is_compact(self):
+        return (
+            self.compact_serializer_class is not None
+            and not self.detail
+            and self._projection_requested()
+            and self.request.query_params.get(COMPACT_PARAM) == 'true'
+        )
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_projection(self):
+        """
+        (fields, omit) из запроса; (None, None), если проекция не запрошена.
+        (fields, omit) from the request; (None, None) when no projection was requested.
+        """
+        if not hasattr(self, '_projection'):
+            self._projection = (None, None)
+            serializer_class = self.get_serializer_class()
+            if self._projection_requested() and issubclass(serializer_class, ProjectableSerializerMixin):
+                fields = parse_field_list(self.request.query_params.get(FIELDS_PARAM))
+                omit = parse_field_list(self.request.query_params.get(OMIT_PARAM))
+                unknown = set(fields + omit) - set(serializer_class().fields)
+                if unknown:
+                    raise ValidationError({FIELDS_PARAM: f"Неизвестные поля: {', '.join(sorted(unknown))}."})
+                self._projection = (fields or None, omit or None)
+        return self._projection
+
+    def get_serializer(self, *args, **kwargs):
+        fields, omit = self.get_projection()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if omit is not None:
+            kwargs.setdefault('omit', omit)
+        return super().get_serializer(*args, **kwargs)
+
+    def project_queryset(self, queryset):
+        """
+        Сокращает SQL до полей проекции; без проекции queryset не меняется.
+        Shrinks the SQL to the projected fields; without a projection the queryset is unchanged.
+        """
+        if self.get_projection() == (None, None) and not self.is_compact():
+            return queryset
+        return project_queryset(queryset, self.get_serializer().projection_paths())
+
+    def filter_queryset(self, queryset):
+        return self.project_queryset(super().filter_queryset(queryset))
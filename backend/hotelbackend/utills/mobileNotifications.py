@@ -1,64 +1,215 @@
-import httpx
-import asyncio
-import threading
+import atexit
 import logging
+import queue
+import threading
 
-from asgiref.sync import sync_to_async 
+import httpx
+from django.conf import settings
+from django.db import close_old_connections
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+
+# Expo принимает не более 100 сообщений в одном запросе
+# Expo accepts at most 100 messages per request
+EXPO_MAX_MESSAGES_PER_REQUEST = 100
+
+_STOP = object()
+
+
+def is_expo_token(token) -> bool:
+    return bool(token) and token.startswith("ExponentPushToken")
+
 
-async def send_expo_push_notification(token: str, title: str, body: str, data: dict = None):
+class ExpoPushDispatcher:
     """
-    Sends a notification via Expo Push Service using httpx.
-    This method is async.
+    Долгоживущий диспетчер push-уведомлений Expo.
+    Вызывающий код кладет сообщения в ограниченную очередь и не блокируется;
+    фиксированный пул потоков забирает их, объединяет в пакеты до 100 сообщений
+    и отправляет через один общий HTTP/2 клиент с пулом соединений.
+
+    Long-lived Expo push dispatcher.
+    Callers put messages on a bounded queue without blocking; a fixed pool of
+    worker threads takes them, merges them into chunks of up to 100 messages
+    and sends them through one shared HTTP/2 client with a connection pool.
     """
-    if not token.startswith("ExponentPushToken"):
-        logger.warning(f"Attempted to send notification to non-Expo token: {token[:20]}...")
-        return
-
-    payload = {
-        "to": token,
-        "title": title,
-        "body": body,
-        "data": data or {},
-        "sound": "default", # Or specify a custom sound
-    }
-
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post("https://exp.host/--/api/v2/push/send", json=payload)
-            response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-            result = response.json()
-            logger.info(f"Expo push sent successfully to {token[:20]}...: {result}")
-
-            if result.get('data') and result['data'].get('status') == 'error':
-                logger.error(f"Error sending Expo push to {token[:20]}...: {result['data'].get('message')}")
-            return result
-    except httpx.TimeoutException:
-        logger.error(f"Expo push timeout for token {token[:20]}...")
-    except httpx.HTTPStatusError as e:
-        logger.error(f"Expo push HTTP error {e.response.status_code} for token {token[:20]}...: {e.response.text}", exc_info=True)
-    except Exception as e:
-        logger.error(f"Expo push failed for token {token[:20]}...: {e}", exc_info=True)
 
+    def __init__(self, push_url=None, workers=None, queue_size=None, chunk_size=EXPO_MAX_MESSAGES_PER_REQUEST, timeout=10.0, on_tickets=None):
+        self.push_url = push_url or getattr(settings, 'EXPO_PUSH_URL', DEFAULT_EXPO_PUSH_URL)
+        self.workers = workers or getattr(settings, 'EXPO_PUSH_WORKERS', 4)
+        self.chunk_size = min(chunk_size, EXPO_MAX_MESSAGES_PER_REQUEST)
+        self.timeout = timeout
+        # on_tickets(messages, tickets) вызывается в рабочем потоке после каждого запроса
+        # on_tickets(messages, tickets) is called in the worker thread after every request
+        self.on_tickets = on_tickets
+        # Элемент очереди — пакет сообщений одного вызова (не более chunk_size)
+        # A queue item is a chunk of messages from one call (at most chunk_size)
+        self._queue = queue.Queue(maxsize=queue_size or getattr(settings, 'EXPO_PUSH_QUEUE_SIZE', 1000))
+        self._client = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self.dropped = 0
 
-def send_notifications_in_thread(tokens_to_send: list, title: str, body: str, data: dict = None):
+    # --- Жизненный цикл / Lifecycle ---
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._client = httpx.Client(
+                http2=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers),
+            )
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"expo-push-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def flush(self):
+        """
+        Ждет отправки всех поставленных в очередь сообщений.
+        Waits until every queued message has been sent.
+        """
+        self._queue.join()
+
+    def close(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+            for _ in threads:
+                self._queue.put(_STOP)
+            for thread in threads:
+                thread.join()
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    # --- Постановка в очередь / Enqueueing ---
+
+    def enqueue(self, tokens, title: str, body: str, data: dict = None) -> int:
+        """
+        Ставит уведомление для списка токенов в очередь без блокировки.
+        Возвращает число принятых сообщений; при переполнении очереди сообщения отбрасываются.
+
+        Queues a notification for the tokens without blocking.
+        Returns the number of accepted messages; messages are dropped when the queue is full.
+        """
+        messages = []
+        for token in tokens:
+            if not is_expo_token(token):
+                logger.warning(f"Attempted to send notification to non-Expo token: {str(token)[:20]}...")
+                continue
+            messages.append({
+                "to": token,
+                "title": title,
+                "body": body,
+                "data": data or {},
+                "sound": "default",
+            })
+        if not messages:
+            return 0
+
+        self.start()
+        accepted = 0
+        for start in range(0, len(messages), self.chunk_size):
+            chunk = messages[start:start + self.chunk_size]
+            try:
+                self._queue.put_nowait(chunk)
+                accepted += len(chunk)
+            except queue.Full:
+                self.dropped += len(chunk)
+                logger.error(f"Expo push queue is full, dropped {len(chunk)} messages.")
+        return accepted
+
+    # --- Рабочие потоки / Workers ---
+
+    def _run(self):
+        carry = None
+        while True:
+            item = carry if carry is not None else self._queue.get()
+            carry = None
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            # Объединяем мелкие пакеты из очереди в один запрос до chunk_size сообщений
+            # Merge small queued chunks into one request of up to chunk_size messages
+            batch = list(item)
+            taken = 1
+            while len(batch) < self.chunk_size:
+                try:
+                    next_item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_item is _STOP or len(batch) + len(next_item) > self.chunk_size:
+                    carry = next_item
+                    break
+                batch.extend(next_item)
+                taken += 1
+
+            try:
+                self._send(batch)
+            except Exception as e:
+                logger.error(f"Expo push failed for {len(batch)} messages: {e}", exc_info=True)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _send(self, messages):
+        try:
+            response = self._client.post(self.push_url, json=messages)
+            response.raise_for_status()
+        except httpx.TimeoutException:
+            logger.error(f"Expo push timeout for {len(messages)} messages.")
+            return None
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Expo push HTTP error {e.response.status_code}: {e.response.text}")
+            return None
+
+        tickets = response.json().get('data') or []
+        for message, ticket in zip(messages, tickets):
+            if ticket.get('status') == 'error':
+                logger.error(f"Error sending Expo push to {message['to'][:20]}...: {ticket.get('message')}")
+        logger.info(f"Expo push sent: {len(messages)} messages.")
+
+        if self.on_tickets is not None:
+            try:
+                self.on_tickets(messages, tickets)
+            except Exception as e:
+                logger.error(f"Failed to handle Expo push tickets: {e}", exc_info=True)
+            finally:
+                # Рабочий поток живет долго — не держим устаревшее соединение с БД
+                # The worker thread is long-lived — do not hold on to a stale DB connection
+                close_old_connections()
+        return tickets
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_push_dispatcher() -> ExpoPushDispatcher:
     """
-    Sends notifications to multiple tokens concurrently using asyncio.gather
-    and runs it in a separate thread to avoid blocking the main request.
+    Общий для процесса диспетчер (создается при первом обращении).
+    Process-wide dispatcher (created on first use).
     """
-    async def _send_all_expo_pushes():
-        tasks = [
-            send_expo_push_notification( 
-                token=token,
-                title=title, 
-                body=body,    
-                data=data     #
-            )
-            for token in tokens_to_send
-        ]
-        await asyncio.gather(*tasks)
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                from .pushReceipts import record_push_tickets
+                _dispatcher = ExpoPushDispatcher(on_tickets=record_push_tickets)
+                atexit.register(_dispatcher.close)
+    return _dispatcher
+
 
-    thread = threading.Thread(target=lambda: asyncio.run(_send_all_expo_pushes()))
-    thread.start()
+def send_notifications_in_thread(tokens_to_send: list, title: str, body: str, data: dict = None):
+    """
+    Ставит уведомления в очередь общего диспетчера и сразу возвращает управление.
+    Имя сохранено для совместимости с существующими вызовами.
+
+    Queues notifications on the shared dispatcher and returns immediately.
+    The name is kept for compatibility with existing callers.
+    """
+    return get_push_dispatcher().enqueue(tokens_to_send, title, body, data)
@@ -0,0 +1,251 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notifications.models import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+# После стольких неудачных попыток запись помечается как failed
+# An entry is marked failed after this many unsuccessful attempts
+OUTBOX_MAX_ATTEMPTS = 5
+
+# Запись в статусе sending дольше этого срока (обработчик упал) снова берется в отправку
+# An entry in sending for longer than this (the drainer died) is claimed again
+OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def enqueue_notification(
+    title: str,
+    body: str,
+    data: dict = None,
+    *,
+    event_type: str = '',
+    notification_type: str = '',
+    users=(),
+    push_roles=(),
+    web_roles=(),
+    persist: bool = False,
+    dedup_key: str = '',
+):
+    """
+    Записывает уведомление в outbox в текущей транзакции; отправка — после фиксации.
+    Неотправленная запись с тем же dedup_key заменяется новой (схлопывание дубликатов).
+    Обычно вызывается через NotificationService.notify().
+
+    Writes a notification to the outbox in the current transaction; delivery happens after commit.
+    A pending entry with the same dedup_key is replaced by the new one (duplicate collapsing).
+    Usually called through NotificationService.notify().
+    """
+    fields = {
+        "title": title,
+        "body": body,
+        "data": data or {},
+        "event_type": event_type,
+        "notification_type": notification_type,
+        "user_ids": [getattr(user, 'pk', user) for user in users],
+        "push_roles": [str(role) for role in push_roles],
+        "web_roles": [str(role) for role in web_roles],
+        "persist": persist,
+    }
+
+    entry = None
+    if dedup_key:
+        entry = NotificationOutbox.objects.filter(
+            status=NotificationOutbox.Status.PENDING, dedup_key=dedup_key
+        ).order_by('-id').first()
+    if entry:
+        for name, value in fields.items():
+            setattr(entry, name, value)
+        entry.save(update_fields=list(fields))
+    else:
+        entry = NotificationOutbox.objects.create(dedup_key=dedup_key, **fields)
+
+    # Откат транзакции отменяет и запись, и отправку
+    # A rollback discards both the entry and the dispatch
+    transaction.on_commit(_schedule_drain)
+    return entry
+
+
+def _schedule_drain():
+    from notifications.tasks import drain_notification_outbox
+
+    try:
+        drain_notification_outbox.delay()
+    except Exception as e:
+        # Запись останется в outbox и будет отправлена периодической задачей
+        # The entry stays in the outbox and is picked up by the periodic task
+        logger.error(f"Failed to schedule notification outbox drain: {e}", exc_info=True)
+
+
+def _persist_once(entries, events):
+    """
+    Сохраняет уведомления записей ровно один раз: сохранение и id строк в outbox фиксируются
+    одной транзакцией. Повторная попытка берет ранее сохраненные строки по persisted_ids.
+    Возвращает (personal, roles) для NotificationService.deliver(persisted=...).
+
+    Persists the entries' notifications exactly once: the rows and their ids on the outbox
+    entries are committed in one transaction. A retry loads the rows saved earlier by persisted_ids.
+    Returns (personal, roles) for NotificationService.deliver(persisted=...).
+    """
+    from notifications.models import Notification, RoleNotification
+
+    from .notificationService import notification_service
+
+    personal, roles = {}, {}
+    retried = [index for index, entry in enumerate(entries) if entry.persisted_ids is not None]
+    fresh = [index for index, entry in enumerate(entries) if entry.persist and entry.persisted_ids is None]
+
+    if fresh:
+        with transaction.atomic():
+            saved_personal, saved_roles = notification_service.persist([events[index] for index in fresh])
+            for position, index in enumerate(fresh):
+                entries[index].persisted_ids = {
+                    "users": {str(user_id): row.id for (at, user_id), row in saved_personal.items() if at == position},
+                    "roles": {role: row.id for (at, role), row in saved_roles.items() if at == position},
+                }
+            NotificationOutbox.objects.bulk_update([entries[index] for index in fresh], ['persisted_ids'])
+        personal.update({(fresh[position], user_id): row for (position, user_id), row in saved_personal.items()})
+        roles.update({(fresh[position], role): row for (position, role), row in saved_roles.items()})
+
+    if retried:
+        notifications = Notification.objects.in_bulk([
+            row_id for index in retried for row_id in entries[index].persisted_ids["users"].values()
+        ])
+        role_notifications = RoleNotification.objects.in_bulk([
+            row_id for index in retried for row_id in entries[index].persisted_ids["roles"].values()
+        ])
+        for index in retried:
+            for user_id, row_id in entries[index].persisted_ids["users"].items():
+                if row_id in notifications:
+                    personal[(index, int(user_id))] = notifications[row_id]
+            for role, row_id in entries[index].persisted_ids["roles"].items():
+                if row_id in role_notifications:
+                    roles[(index, role)] = role_notifications[row_id]
+    return personal, roles
+
+
+def _deliver(entries):
+    """
+    Передает пакет записей в NotificationService и проставляет статусы.
+    Вызывается вне транзакции захвата: сетевые отправки не держат блокировки строк outbox.
+
+    Hands a batch of entries to NotificationService and sets their statuses.
+    Runs outside the claiming transaction: network sends do not hold outbox row locks.
+    """
+    from .notificationService import NotificationEvent, notification_service
+
+    events = [
+        NotificationEvent(
+            event_type=entry.event_type or entry.notification_type,
+            title=entry.title,
+            body=entry.body,
+            data=entry.data,
+            user_ids=tuple(entry.user_ids),
+            push_roles=tuple(entry.push_roles),
+            web_roles=tuple(entry.web_roles),
+            persist=entry.persist,
+            web_type=entry.notification_type,
+        )
+        for entry in entries
+    ]
+    try:
+        persisted = _persist_once(entries, events)
+        results = notification_service.deliver(events, persisted=persisted)
+    except Exception as e:
+        logger.error(f"Failed to deliver {len(entries)} outbox notifications: {e}", exc_info=True)
+        results = [e] * len(entries)
+
+    now = timezone.now()
+    for entry, result in zip(entries, results):
+        if result is True:
+            entry.status = NotificationOutbox.Status.SENT
+            entry.sent_at = now
+            continue
+        entry.attempts += 1
+        entry.last_error = str(result)[:255] if isinstance(result, Exception) else 'delivery failed'
+        entry.status = (
+            NotificationOutbox.Status.FAILED if entry.attempts >= OUTBOX_MAX_ATTEMPTS
+            else NotificationOutbox.Status.PENDING
+        )
+        entry.claimed_at = None
+
+
+def _claim(last_id, batch_size):
+    """
+    Короткая транзакция: блокирует ожидающие записи (и зависшие в sending дольше OUTBOX_CLAIM_TIMEOUT),
+    схлопывает дубликаты и помечает остальные как sending. Возвращает (пакет, записи к отправке).
+
+    A short transaction: locks pending entries (and ones stuck in sending longer than OUTBOX_CLAIM_TIMEOUT),
+    collapses duplicates and marks the rest as sending. Returns (batch, entries to send).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # skip_locked: параллельные обработчики не берут одни и те же записи (PostgreSQL)
+        # skip_locked: concurrent drainers do not pick the same rows (PostgreSQL)
+        batch = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True).filter(
+                Q(status=NotificationOutbox.Status.PENDING)
+                | Q(status=NotificationOutbox.Status.SENDING, claimed_at__lt=now - OUTBOX_CLAIM_TIMEOUT),
+                id__gt=last_id,
+            ).order_by('id')[:batch_size]
+        )
+        if not batch:
+            return [], []
+
+        latest = {}
+        for entry in batch:
+            latest[entry.dedup_key or f"id:{entry.id}"] = entry
+        to_send = list(latest.values())
+        for entry in batch:
+            if latest[entry.dedup_key or f"id:{entry.id}"] is entry:
+                entry.status = NotificationOutbox.Status.SENDING
+                entry.claimed_at = now
+            else:
+                entry.status = NotificationOutbox.Status.SENT
+                entry.sent_at = now
+                entry.last_error = 'collapsed'
+        NotificationOutbox.objects.bulk_update(batch, ['status', 'sent_at', 'last_error', 'claimed_at'])
+    return batch, to_send
+
+
+def drain_outbox(batch_size=100):
+    """
+    Отправляет ожидающие записи пакетами. Записи с одинаковым dedup_key внутри пакета
+    схлопываются в последнюю. Возвращает число обработанных записей.
+
+    Delivers pending entries in batches. Entries sharing a dedup_key within a batch
+    collapse into the latest one. Returns the number of processed entries.
+    """
+    processed = 0
+    last_id = 0
+    while True:
+        batch, to_send = _claim(last_id, batch_size)
+        if not batch:
+            break
+
+        _deliver(to_send)
+        NotificationOutbox.objects.bulk_update(to_send, ['status', 'sent_at', 'attempts', 'last_error', 'claimed_at'])
+
+        processed += len(batch)
+        last_id = batch[-1].id
+        if len(batch) < batch_size:
+            break
+
+    if processed:
+        logger.info(f"Notification outbox drained: {processed} entries.")
+    return processed
+
+
+def purge_outbox(days=7):
+    """
+    Удаляет отправленные записи старше указанного числа дней.
+    Deletes sent entries older than the given number of days.
+    """
+    return NotificationOutbox.objects.filter(
+        status=NotificationOutbox.Status.SENT,
+        created_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()[0]
@@ -0,0 +1,275 @@
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+from notifications.inbox import PERSONAL, ROLE, adjust_unread
+from notifications.models import Notification, RoleNotification
+
+from .mobileNotifications import get_push_dispatcher
+from .pushTokenCache import push_token_cache
+from .responseCache import NOTIFICATIONS, invalidate, role_namespace, user_namespace
+from .webNotifications import channel_message, group_send_many
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationEvent(NamedTuple):
+    """
+    Одно событие для доставки: получатели, текст и данные.
+    A single event to deliver: recipients, text and payload.
+    """
+    event_type: str
+    title: str
+    body: str
+    data: dict = None
+    user_ids: tuple = ()
+    push_roles: tuple = ()
+    web_roles: tuple = ()
+    persist: bool = False
+    # Тип для WebSocket-клиента; по умолчанию совпадает с event_type
+    # Type for the WebSocket client; defaults to event_type
+    web_type: str = ''
+
+
+class NotificationMetrics:
+    """
+    Счетчики доставки по типу события (в пределах процесса).
+    Per-event-type delivery counters (process-wide).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(Counter)
+
+    def record(self, event_type, **counts):
+        with self._lock:
+            self._counters[event_type].update(counts)
+
+    def snapshot(self):
+        with self._lock:
+            return {event_type: dict(counter) for event_type, counter in self._counters.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class NotificationService:
+    """
+    Единая точка отправки уведомлений.
+    notify() записывает событие в outbox (в текущей транзакции);
+    deliver() за один проход разрешает получателей, сохраняет Notification через bulk_create
+    и рассылает WebSocket и push сообщения.
+
+    Single entry point for notifications.
+    notify() writes the event to the outbox (in the current transaction);
+    deliver() resolves recipients, saves Notification rows with bulk_create
+    and fans out WebSocket and push messages in one pass.
+    """
+
+    def __init__(self, dispatcher=None, channel_layer=None):
+        self._dispatcher = dispatcher
+        self._channel_layer = channel_layer
+        self.metrics = NotificationMetrics()
+
+    @property
+    def dispatcher(self):
+        return self._dispatcher or get_push_dispatcher()
+
+    @property
+    def channel_layer(self):
+        return self._channel_layer or get_channel_layer()
+
+    # --- Постановка в очередь / Enqueueing ---
+
+    def notify(self, event_type, title, body, data=None, *, users=(), roles=(), web_roles=(), persist=False, web_type='', dedup_key=''):
+        """
+        Записывает событие в outbox; доставка произойдет после фиксации транзакции.
+        users — пользователи или их id; roles — роли для push; web_roles — роли для WebSocket.
+
+        Writes the event to the outbox; delivery happens after the transaction commits.
+        users are users or their ids; roles get push; web_roles get a WebSocket broadcast.
+        """
+        from .notificationOutbox import enqueue_notification
+
+        return enqueue_notification(
+            title,
+            body,
+            data,
+            event_type=event_type,
+            notification_type=web_type,
+            users=users,
+            push_roles=roles,
+            web_roles=web_roles,
+            persist=persist,
+            dedup_key=dedup_key,
+        )
+
+    # --- Доставка / Delivery ---
+
+    def _resolve_tokens(self, events):
+        """
+        Токены пользователей и ролей берутся из push_token_cache;
+        промахи загружаются одним запросом на пользователей и одним на роли.
+        User and role tokens come from push_token_cache;
+        misses are loaded with one query for users and one for roles.
+        """
+        user_ids = {user_id for event in events for user_id in event.user_ids}
+        roles = {role for event in events for role in event.push_roles}
+        tokens_by_user = push_token_cache.tokens_for_users(user_ids) if user_ids else {}
+        tokens_by_role = push_token_cache.tokens_for_roles(roles) if roles else {}
+        return tokens_by_user, tokens_by_role
+
+    def _persist(self, events):
+        """
+        Сохраняет Notification для получателей событий с persist=True одним bulk_create.
+        Возвращает {(индекс события, user_id): Notification}.
+
+        Saves Notification rows for recipients of persist=True events with one bulk_create.
+        Returns {(event index, user_id): Notification}.
+        """
+        rows = {
+            (index, user_id): Notification(
+                user_id=user_id,
+                title=event.title,
+                body=event.body,
+                notification_type=event.event_type,
+                data=event.data,
+            )
+            for index, event in enumerate(events) if event.persist
+            for user_id in event.user_ids
+        }
+        if rows:
+            Notification.objects.bulk_create(list(rows.values()))
+            # bulk_create не отправляет post_save — версии уведомлений получателей увеличиваем явно
+            # bulk_create does not send post_save, so the recipients' notification versions are bumped explicitly
+            invalidate(*{user_namespace(NOTIFICATIONS, user_id) for _, user_id in rows})
+            adjust_unread(Counter(user_id for _, user_id in rows))
+        return rows
+
+    def _persist_roles(self, events):
+        """
+        Рассылка роли с persist=True — одна строка общего inbox на роль, а не на получателя.
+        Возвращает {(индекс события, роль): RoleNotification}.
+
+        A persist=True role broadcast is one shared inbox row per role, not per recipient.
+        Returns {(event index, role): RoleNotification}.
+        """
+        rows = {
+            (index, str(role)): RoleNotification(
+                role=str(role),
+                title=event.title,
+                body=event.body,
+                notification_type=event.event_type,
+                data=event.data,
+            )
+            for index, event in enumerate(events) if event.persist
+            for role in event.web_roles
+        }
+        if rows:
+            RoleNotification.objects.bulk_create(list(rows.values()))
+            invalidate(*{role_namespace(NOTIFICATIONS, role) for _, role in rows})
+        return rows
+
+    def persist(self, events):
+        """
+        Сохраняет Notification и RoleNotification событий с persist=True.
+        Возвращает (personal, roles) в формате _persist/_persist_roles — для deliver(persisted=...).
+
+        Saves the Notification and RoleNotification rows of persist=True events.
+        Returns (personal, roles) as built by _persist/_persist_roles — for deliver(persisted=...).
+        """
+        return self._persist(events), self._persist_roles(events)
+
+    @staticmethod
+    def _web_message(event, message_id, created_at, save_to_db, scope=PERSONAL):
+        return channel_message("send_notification", {
+            "id": message_id,
+            "scope": scope,
+            "title": event.title,
+            "body": event.body,
+            "notification_type": event.web_type or event.event_type,
+            "data": event.data,
+            "is_read": False,
+            "created_at": created_at.isoformat(),
+            "save_to_db": save_to_db,
+        })
+
+    def _send_web(self, group_messages):
+        # Все группы пакета отправляются одновременно / Every group of the batch is sent concurrently
+        return group_send_many(group_messages, self.channel_layer)
+
+    def deliver(self, events, persisted=None):
+        """
+        Доставляет пакет событий. Возвращает список флагов успешной доставки (по событию).
+        persisted — результат persist(), уже сохраненный вызывающим: строки не создаются повторно.
+
+        Delivers a batch of events. Returns a list of per-event success flags.
+        persisted is a persist() result the caller has already saved: rows are not created again.
+        """
+        events = list(events)
+        if not events:
+            return []
+
+        started = time.monotonic()
+        tokens_by_user, tokens_by_role = self._resolve_tokens(events)
+        persisted, persisted_roles = self.persist(events) if persisted is None else persisted
+        now = timezone.now()
+
+        # WebSocket: все сообщения пакета отправляются за один проход
+        # WebSocket: every message of the batch is sent in a single pass
+        group_messages = []
+        web_counts = Counter()
+        for index, event in enumerate(events):
+            for user_id in event.user_ids:
+                notification = persisted.get((index, user_id))
+                if notification is not None:
+                    message = self._web_message(event, str(notification.id), notification.created_at, True)
+                else:
+                    message = self._web_message(event, f"temp_{uuid.uuid4()}", now, False)
+                group_messages.append((f"user_{user_id}", message))
+            for role in event.web_roles:
+                role_notification = persisted_roles.get((index, str(role)))
+                if role_notification is not None:
+                    message = self._web_message(event, str(role_notification.id), role_notification.created_at, True, ROLE)
+                else:
+                    message = self._web_message(event, f"broadcast_{uuid.uuid4()}", now, False, ROLE)
+                group_messages.append((f"online_{str(role).lower()}", message))
+            web_counts[index] = len(event.user_ids) + len(event.web_roles)
+        self._send_web(group_messages)
+
+        results = []
+        dispatcher = self.dispatcher
+        for index, event in enumerate(events):
+            tokens = set()
+            for user_id in event.user_ids:
+                tokens |= tokens_by_user.get(user_id, set())
+            for role in event.push_roles:
+                tokens |= tokens_by_role.get(role, set())
+            try:
+                pushed = dispatcher.enqueue(sorted(tokens), event.title, event.body, event.data) if tokens else 0
+            except Exception as e:
+                logger.error(f"Error sending push for event {event.event_type}: {e}", exc_info=True)
+                self.metrics.record(event.event_type, errors=1)
+                results.append(False)
+                continue
+            self.metrics.record(
+                event.event_type,
+                events=1,
+                push_messages=pushed,
+                web_messages=web_counts[index],
+                persisted=sum(1 for user_id in event.user_ids if (index, user_id) in persisted),
+            )
+            results.append(True)
+
+        logger.info(f"Delivered {sum(results)}/{len(events)} notification events in {(time.monotonic() - started) * 1000:.1f} ms.")
+        return results
+
+
+notification_service = NotificationService()
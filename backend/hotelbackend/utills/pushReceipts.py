@@ -0,0 +1,183 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+import httpx
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from users.models import PushTicket, PushToken
+
+from .pushTokenCache import push_token_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
+
+# Expo принимает не более 1000 id тикетов в одном запросе квитанций
+# Expo accepts at most 1000 ticket ids per receipts request
+EXPO_MAX_RECEIPT_IDS_PER_REQUEST = 1000
+
+DEVICE_NOT_REGISTERED = 'DeviceNotRegistered'
+
+
+def _ticket_error(ticket_or_receipt) -> str:
+    details = ticket_or_receipt.get('details') or {}
+    return details.get('error') or ticket_or_receipt.get('message') or 'UnknownError'
+
+
+def apply_delivery_results(ok_token_ids=(), failed_tokens=None):
+    """
+    Обновляет состояние токенов по результатам доставки:
+    - успешная доставка сбрасывает счетчик ошибок;
+    - DeviceNotRegistered отключает (или удаляет) токен;
+    - прочие ошибки увеличивают счетчик, после PUSH_TOKEN_MAX_FAILURES токен отключается.
+
+    Updates token state from delivery results:
+    - a successful delivery resets the failure counter;
+    - DeviceNotRegistered disables (or deletes) the token;
+    - other errors bump the counter, the token is disabled after PUSH_TOKEN_MAX_FAILURES.
+
+    failed_tokens: {push_token_id: error}
+    Возвращает число отключенных токенов / Returns the number of disabled tokens.
+    """
+    failed_tokens = failed_tokens or {}
+    now = timezone.now()
+
+    ok_token_ids = set(ok_token_ids) - set(failed_tokens)
+    if ok_token_ids:
+        PushToken.objects.filter(id__in=ok_token_ids, failure_count__gt=0).update(failure_count=0, last_error='')
+
+    by_error = defaultdict(set)
+    for token_id, error in failed_tokens.items():
+        by_error[error].add(token_id)
+
+    for error, token_ids in by_error.items():
+        PushToken.objects.filter(id__in=token_ids).update(
+            failure_count=F('failure_count') + 1,
+            last_error=error[:255],
+            last_failure_at=now,
+        )
+
+    disabled = 0
+    not_registered = by_error.get(DEVICE_NOT_REGISTERED, set())
+    failed_ids = set(failed_tokens) - not_registered
+    max_failures = getattr(settings, 'PUSH_TOKEN_MAX_FAILURES', 10)
+    to_disable = PushToken.objects.filter(
+        Q(id__in=not_registered) | Q(id__in=failed_ids, failure_count__gte=max_failures),
+        is_active=True,
+    )
+    # QuerySet.update/delete не отправляют сигналы — кэш токенов сбрасываем явно
+    # QuerySet.update/delete send no signals — the token cache is invalidated explicitly
+    affected_users = set(to_disable.values_list('user_id', flat=True))
+
+    if not_registered:
+        if getattr(settings, 'PUSH_TOKEN_DELETE_UNREGISTERED', False):
+            disabled += PushToken.objects.filter(id__in=not_registered).delete()[0]
+        else:
+            disabled += PushToken.objects.filter(id__in=not_registered, is_active=True).update(is_active=False)
+
+    if failed_ids:
+        disabled += PushToken.objects.filter(
+            id__in=failed_ids,
+            is_active=True,
+            failure_count__gte=max_failures,
+        ).update(is_active=False)
+
+    if affected_users:
+        push_token_cache.invalidate_users(affected_users)
+    if disabled:
+        logger.info(f"Disabled {disabled} push tokens after delivery errors.")
+    return disabled
+
+
+def record_push_tickets(messages, tickets):
+    """
+    Сохраняет тикеты Expo для последующей проверки квитанций.
+    Ошибки уже на этапе тикета (например, DeviceNotRegistered) применяются сразу.
+
+    Stores Expo tickets so their receipts can be checked later.
+    Errors reported on the ticket itself (e.g. DeviceNotRegistered) are applied right away.
+    """
+    token_ids = dict(
+        PushToken.objects.filter(token__in={message['to'] for message in messages}).values_list('token', 'id')
+    )
+
+    new_tickets = []
+    failed_tokens = {}
+    for message, ticket in zip(messages, tickets):
+        token_id = token_ids.get(message['to'])
+        if token_id is None:
+            continue
+        if ticket.get('status') == 'ok' and ticket.get('id'):
+            new_tickets.append(PushTicket(ticket_id=ticket['id'], push_token_id=token_id))
+        elif ticket.get('status') == 'error':
+            failed_tokens[token_id] = _ticket_error(ticket)
+
+    if new_tickets:
+        PushTicket.objects.bulk_create(new_tickets, ignore_conflicts=True)
+    if failed_tokens:
+        apply_delivery_results(failed_tokens=failed_tokens)
+
+
+def process_push_receipts(client=None, receipts_url=None, min_age=timedelta(minutes=15), max_age=timedelta(hours=24)):
+    """
+    Запрашивает квитанции Expo пакетами по 1000 тикетов и обновляет состояние токенов.
+    Тикеты с полученной квитанцией удаляются; тикеты старше max_age удаляются без проверки
+    (Expo хранит квитанции около суток).
+
+    Fetches Expo receipts in batches of 1000 tickets and updates the token state.
+    Tickets with a receipt are deleted; tickets older than max_age are dropped unchecked
+    (Expo keeps receipts for about a day).
+    """
+    receipts_url = receipts_url or getattr(settings, 'EXPO_PUSH_RECEIPTS_URL', DEFAULT_EXPO_RECEIPTS_URL)
+    now = timezone.now()
+    summary = {"checked": 0, "ok": 0, "errors": 0, "disabled": 0, "expired": 0}
+
+    summary["expired"] = PushTicket.objects.filter(created_at__lt=now - max_age).delete()[0]
+
+    tickets = list(
+        PushTicket.objects.filter(created_at__lte=now - min_age).order_by('id').values_list('ticket_id', 'push_token_id')
+    )
+    if not tickets:
+        return summary
+
+    own_client = client is None
+    if own_client:
+        client = httpx.Client(http2=True, timeout=10.0)
+    try:
+        for start in range(0, len(tickets), EXPO_MAX_RECEIPT_IDS_PER_REQUEST):
+            batch = dict(tickets[start:start + EXPO_MAX_RECEIPT_IDS_PER_REQUEST])
+            try:
+                response = client.post(receipts_url, json={"ids": list(batch)})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.error(f"Expo receipts request failed for {len(batch)} tickets: {e}")
+                continue
+
+            receipts = response.json().get('data') or {}
+            ok_token_ids = set()
+            failed_tokens = {}
+            for ticket_id, receipt in receipts.items():
+                token_id = batch.get(ticket_id)
+                if token_id is None:
+                    continue
+                if receipt.get('status') == 'error':
+                    failed_tokens[token_id] = _ticket_error(receipt)
+                else:
+                    ok_token_ids.add(token_id)
+
+            summary["checked"] += len(receipts)
+            summary["ok"] += len(ok_token_ids)
+            summary["errors"] += len(failed_tokens)
+            summary["disabled"] += apply_delivery_results(ok_token_ids, failed_tokens)
+            # Квитанции, которые еще не готовы, остаются до следующего прогона
+            # Receipts that are not ready yet stay until the next run
+            PushTicket.objects.filter(ticket_id__in=list(receipts)).delete()
+    finally:
+        if own_client:
+            client.close()
+
+    logger.info(f"Processed Expo push receipts: {summary}")
+    return summary
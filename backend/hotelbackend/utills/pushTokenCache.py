@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import defaultdict
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import caches
+
+from users.models import PushToken, User
+
+logger = logging.getLogger(__name__)
+
+
+class PushTokenCache:
+    """
+    Кэш соответствий роль → токены и пользователь → токены (только активные токены).
+    По умолчанию — LRU в памяти процесса со сроком жизни timeout (сигналы инвалидации видит
+    только сохранивший процесс); если задан alias, используется общий Django cache
+    (например, Redis), чтобы инвалидация была видна всем процессам.
+    Инвалидируется сигналами PushToken/User и явными вызовами (регистрация токена,
+    отключение токенов по квитанциям).
+
+    Cache of role → tokens and user → tokens (active tokens only).
+    By default an in-process LRU whose entries expire after timeout (invalidation signals only
+    reach the saving process); when an alias is given, a shared Django cache
+    (e.g. Redis) is used so invalidation is visible to every process.
+    Invalidated by PushToken/User signals and explicit calls (token registration,
+    tokens disabled by receipts).
+    """
+
+    KEY_PREFIX = 'push_tokens'
+
+    def __init__(self, maxsize=1024, alias=None, timeout=300):
+        self._lock = threading.Lock()
+        self._local = TTLCache(maxsize=maxsize, ttl=timeout)
+        self._alias = alias
+        self._timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    # --- Хранилище / Storage ---
+
+    @property
+    def _shared(self):
+        return caches[self._alias] if self._alias else None
+
+    def _key(self, kind, value):
+        return f"{self.KEY_PREFIX}:{kind}:{value}"
+
+    def _get_many(self, keys):
+        if self._shared is not None:
+            return {key: set(value) for key, value in self._shared.get_many(keys).items()}
+        with self._lock:
+            return {key: self._local[key] for key in keys if key in self._local}
+
+    def _set_many(self, values):
+        if self._shared is not None:
+            self._shared.set_many({key: sorted(value) for key, value in values.items()}, self._timeout)
+            return
+        with self._lock:
+            for key, value in values.items():
+                self._local[key] = value
+
+    def _delete_many(self, keys):
+        if self._shared is not None:
+            self._shared.delete_many(keys)
+            return
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def _count(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    # --- Чтение / Reading ---
+
+    def tokens_for_users(self, user_ids):
+        """
+        {user_id: set(токенов)}; промахи загружаются одним запросом.
+        {user_id: set(tokens)}; misses are loaded with one query.
+        """
+        keys = {self._key('user', user_id): user_id for user_id in set(user_ids)}
+        cached = self._get_many(list(keys))
+        result = {keys[key]: tokens for key, tokens in cached.items()}
+        missing = [user_id for key, user_id in keys.items() if key not in cached]
+        self._count(len(cached), len(missing))
+
+        if missing:
+            loaded = {user_id: set() for user_id in missing}
+            for user_id, token in PushToken.objects.active().filter(user_id__in=missing).values_list('user_id', 'token'):
+                loaded[user_id].add(token)
+            self._set_many({self._key('user', user_id): tokens for user_id, tokens in loaded.items()})
+            result.update(loaded)
+        return result
+
+    def tokens_for_roles(self, roles):
+        """
+        {роль: set(токенов)}; промахи по всем ролям загружаются одним запросом.
+        {role: set(tokens)}; misses for every role are loaded with one query.
+        """
+        keys = {self._key('role', role): str(role) for role in set(roles)}
+        cached = self._get_many(list(keys))
+        result = {keys[key]: tokens for key, tokens in cached.items()}
+        missing = [role for key, role in keys.items() if key not in cached]
+        self._count(len(cached), len(missing))
+
+        if missing:
+            loaded = defaultdict(set, {role: set() for role in missing})
+            for role, token in PushToken.objects.active().filter(user__role__in=missing).values_list('user__role', 'token'):
+                loaded[role].add(token)
+            self._set_many({self._key('role', role): tokens for role, tokens in loaded.items()})
+            result.update(loaded)
+        return result
+
+    # --- Инвалидация / Invalidation ---
+
+    def invalidate_users(self, user_ids, roles=None):
+        """
+        Сбрасывает записи пользователей и их ролей (все роли, если роли неизвестны).
+        Drops the entries of the users and their roles (every role when roles are unknown).
+        """
+        if roles is None:
+            roles = User.Role.values
+        self._delete_many(
+            [self._key('user', user_id) for user_id in user_ids] + [self._key('role', role) for role in roles]
+        )
+
+    def clear(self):
+        if self._shared is not None:
+            # В общем кэше ключи пользователей неизвестны — сбрасываем роли, пользователи истекут по timeout
+            # User keys are unknown in the shared cache — drop roles, users expire by timeout
+            self._delete_many([self._key('role', role) for role in User.Role.values])
+        else:
+            with self._lock:
+                self._local.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "size": None if self._shared is not None else len(self._local),
+            }
+
+
+push_token_cache = PushTokenCache(
+    maxsize=getattr(settings, 'PUSH_TOKEN_CACHE_SIZE', 1024),
+    alias=getattr(settings, 'PUSH_TOKEN_CACHE_ALIAS', None),
+    timeout=getattr(settings, 'PUSH_TOKEN_CACHE_TIMEOUT', 300),
+)
@@ -0,0 +1,238 @@
+import functools
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'response_cache'
+
+# Пространства имен инвалидации: ответ зависит от набора пространств,
+# сохранение модели увеличивает версию своего пространства.
+# Invalidation namespaces: a response depends on a set of namespaces,
+# saving a model bumps the version of its namespace.
+ROOMS = 'rooms'
+BOOKINGS = 'bookings'
+CLEANING_TASKS = 'cleaning_tasks'
+CHECKLISTS = 'checklists'
+USERS = 'users'
+# Уведомления версионируются по пользователю и по роли (общий inbox):
+# user_namespace(NOTIFICATIONS, user_id), role_namespace(NOTIFICATIONS, role)
+# Notifications are versioned per user and per role (shared inbox):
+# user_namespace(NOTIFICATIONS, user_id), role_namespace(NOTIFICATIONS, role)
+NOTIFICATIONS = 'notifications'
+
+
+def user_namespace(namespace, user_id):
+    """
+    Пространство имен данных одного пользователя (например, его уведомлений).
+    Namespace of a single user's data (e.g. their notifications).
+    """
+    return f"{namespace}:{user_id}"
+
+
+def role_namespace(namespace, role):
+    """
+    Пространство имен общих данных роли (например, общего inbox роли).
+    Namespace of a role's shared data (e.g. the role's shared inbox).
+    """
+    return f"{namespace}:role:{role}"
+
+
+def for_role(namespace):
+    """
+    Пространство имен роли пользователя текущего запроса — для аргументов декораторов.
+    The namespace of the current request user's role — for decorator arguments.
+    """
+    return lambda request: role_namespace(namespace, getattr(request.user, 'role', None))
+
+
+def for_user(namespace):
+    """
+    Пространство имен пользователя текущего запроса — для аргументов декораторов.
+    The namespace of the current request's user — for decorator arguments.
+    """
+    return lambda request: user_namespace(namespace, request.user.pk)
+
+
+def _resolve(namespaces, request):
+    return [namespace(request) if callable(namespace) else namespace for namespace in namespaces]
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _version_key(namespace):
+    return f"{KEY_PREFIX}:version:{namespace}"
+
+
+def _initial_version():
+    # Версия от времени: после вытеснения ключа версии старые ответы не совпадут с новой
+    # Time-based version: once a version key is evicted, old responses never match the new one
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    cache = _cache()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in versions}
+    for key, version in missing.items():
+        cache.add(key, version, None)
+    if missing:
+        versions.update(cache.get_many(list(missing)))
+    return [versions.get(key, 0) for key in keys]
+
+
+def _bump(namespaces):
+    cache = _cache()
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def invalidate(*namespaces):
+    """
+    Делает недействительными закэшированные ответы пространств имен.
+    Версия увеличивается сразу и еще раз после фиксации транзакции, чтобы ответ,
+    прочитанный до фиксации, не остался в кэше под новой версией.
+
+    Invalidates the cached responses of the namespaces.
+    The version is bumped right away and again after the transaction commits, so a response
+    read before the commit does not stay cached under the new version.
+    """
+    _bump(namespaces)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(namespaces))
+
+
+def _find_request(args):
+    for arg in args:
+        if isinstance(arg, (Request, HttpRequest)):
+            return arg
+    raise TypeError("cache_response expects a view that receives the request.")
+
+
+def _query_digest(request):
+    query = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    return hashlib.md5(repr(query).encode()).hexdigest()
+
+
+def _versions(request, namespaces):
+    return '.'.join(str(version) for version in get_versions(_resolve(namespaces, request)))
+
+
+def _role(request):
+    user = request.user
+    return getattr(user, 'role', None) if user.is_authenticated else 'anonymous'
+
+
+def _response_key(request, namespaces):
+    versions = _versions(request, namespaces)
+    # Дата входит в ключ: эндпоинты без параметра даты отдают данные за «сегодня»
+    # The date is part of the key: endpoints without a date parameter return "today"
+    return f"{KEY_PREFIX}:{request.path}:{_role(request)}:{timezone.localdate().isoformat()}:{versions}:{_query_digest(request)}"
+
+
+def cache_response(*namespaces, timeout=None):
+    """
+    Кэширует успешные GET-ответы представления DRF.
+    Ключ: путь, параметры запроса, роль пользователя и версии пространств имен.
+    Разрешения проверяются DRF до вызова обработчика, поэтому кэш их не обходит.
+
+    Caches successful GET responses of a DRF view.
+    Key: path, query parameters, user role and namespace versions.
+    Permissions are checked by DRF before the handler runs, so the cache never bypasses them.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args)
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            cache = _cache()
+            key = _response_key(request, namespaces)
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60))
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _etag(request, namespaces, per_user):
+    scope = f"user:{request.user.pk}" if per_user else _role(request)
+    raw = ':'.join((
+        request.path,
+        scope,
+        timezone.localdate().isoformat(),
+        _versions(request, namespaces),
+        _query_digest(request),
+        getattr(request, 'accepted_media_type', '') or '',
+    ))
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def _matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # Слабое сравнение (RFC 9110, 13.1.2) / Weak comparison (RFC 9110, 13.1.2)
+    candidates = {tag.removeprefix('W/') for tag in parse_etags(header)}
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+
+def conditional_response(*namespaces, per_user=False):
+    """
+    Условные GET-ответы: ETag строится из версий пространств имен (без запроса к БД),
+    при совпадении If-None-Match возвращается 304 без вызова обработчика и сериализации.
+    per_user=True — ответ зависит от пользователя (его задачи, его уведомления), а не только от роли.
+    Пространство имен может быть функцией от запроса (for_user(NOTIFICATIONS)).
+
+    Conditional GET responses: the ETag is built from namespace versions (no DB query),
+    and a matching If-None-Match returns 304 without running the handler or serializing anything.
+    per_user=True — the response depends on the user (their tasks, their notifications), not just the role.
+    A namespace may be a function of the request (for_user(NOTIFICATIONS)).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args)
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            etag = _etag(request, namespaces, per_user)
+            if _matches(request, etag):
+                response = Response(status=304)
+            else:
+                response = view(*args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            # Ответ зависит от пользователя — разделяемые кэши не должны отдавать его другим
+            # The response depends on the user — shared caches must not serve it to others
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,179 @@
+import functools
+import logging
+import secrets
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings as simple_jwt_settings
+
+from users.models import User
+
+from .responseCache import USERS, get_versions, user_namespace
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'socket_auth'
+TOKEN_PARAM = 'token'
+TICKET_PARAM = 'ticket'
+
+# Поля пользователя, которых достаточно WebSocket-консьюмерам
+# User fields that are enough for the WebSocket consumers
+IDENTITY_FIELDS = ('id', 'username', 'first_name', 'last_name', 'role', 'is_active')
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_backend():
+    """
+    Один TokenBackend на процесс вместо нового на каждое подключение.
+    One TokenBackend per process instead of a new one per connection.
+    """
+    return TokenBackend(
+        algorithm=simple_jwt_settings.ALGORITHM,
+        signing_key=simple_jwt_settings.SIGNING_KEY,
+        verifying_key=simple_jwt_settings.VERIFYING_KEY,
+        audience=simple_jwt_settings.AUDIENCE,
+        issuer=simple_jwt_settings.ISSUER,
+        leeway=simple_jwt_settings.LEEWAY,
+    )
+
+
+@receiver(setting_changed)
+def _reset_token_backend(setting, **kwargs):
+    if setting == 'SIMPLE_JWT':
+        get_token_backend.cache_clear()
+
+
+def _cache():
+    return caches[getattr(settings, 'SOCKET_AUTH_CACHE_ALIAS', 'default')]
+
+
+def _identity(user):
+    return {field: getattr(user, field) for field in IDENTITY_FIELDS}
+
+
+def _user_from_identity(identity):
+    """
+    Пользователь из закэшированных полей, без запроса к базе.
+    A user built from the cached fields, without a database query.
+    """
+    user = User(**identity)
+    user._state.adding = False
+    user._state.db = 'default'
+    return user
+
+
+def _identity_key(payload):
+    user_id = payload[simple_jwt_settings.USER_ID_CLAIM]
+    # Версия пользователя меняется при смене роли/активности — старые записи перестают совпадать
+    # The user's version changes with the role/activity, so stale entries stop matching
+    [version] = get_versions([user_namespace(USERS, user_id)])
+    return f"{KEY_PREFIX}:jti:{payload.get(simple_jwt_settings.JTI_CLAIM)}:{version}"
+
+
+def _identity_timeout(payload):
+    timeout = getattr(settings, 'SOCKET_AUTH_CACHE_TIMEOUT', 300)
+    expires_at = payload.get('exp')
+    if expires_at is not None:
+        timeout = min(timeout, int(expires_at - time.time()))
+    return timeout
+
+
+def decode_token(token):
+    """
+    Проверяет подпись и срок действия JWT; TokenBackendError для недействительного токена.
+    Verifies the JWT signature and expiry; TokenBackendError for an invalid token.
+    """
+    return get_token_backend().decode(token)
+
+
+def cached_user(payload):
+    """
+    Пользователь токена из кэша по jti или None при промахе (и для токенов без jti).
+    The token's user from the cache by jti, or None on a miss (and for tokens without a jti).
+    """
+    if not payload.get(simple_jwt_settings.JTI_CLAIM):
+        return None
+    identity = _cache().get(_identity_key(payload))
+    return _user_from_identity(identity) if identity else None
+
+
+def load_user(payload):
+    """
+    Загружает активного пользователя токена и кэширует его поля до истечения токена.
+    Loads the token's active user and caches its fields until the token expires.
+    """
+    user = (
+        User.objects.filter(pk=payload[simple_jwt_settings.USER_ID_CLAIM], is_active=True)
+        .only(*IDENTITY_FIELDS)
+        .first()
+    )
+    timeout = _identity_timeout(payload)
+    if user is not None and payload.get(simple_jwt_settings.JTI_CLAIM) and timeout > 0:
+        _cache().set(_identity_key(payload), _identity(user), timeout)
+    return user
+
+
+def issue_ticket(user):
+    """
+    Одноразовый билет для подключения WebSocket без JWT в адресе.
+    A single-use ticket to open a WebSocket without a JWT in the URL.
+    """
+    ticket = secrets.token_urlsafe(32)
+    _cache().set(f"{KEY_PREFIX}:ticket:{ticket}", _identity(user), getattr(settings, 'SOCKET_TICKET_TIMEOUT', 30))
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """
+    Погашает билет: из двух одновременных попыток успешна только удалившая ключ.
+    Redeems a ticket: of two concurrent attempts only the one that deleted the key succeeds.
+    """
+    cache = _cache()
+    key = f"{KEY_PREFIX}:ticket:{ticket}"
+    identity = cache.get(key)
+    if not identity or not cache.delete(key):
+        return None
+    return _user_from_identity(identity)
+
+
+def _authenticate_cached(query):
+    ticket = query.get(TICKET_PARAM, [None])[0]
+    if ticket:
+        return None, redeem_ticket(ticket)
+    token = query.get(TOKEN_PARAM, [None])[0]
+    if not token:
+        logger.debug("No token or ticket found in the WebSocket query string.")
+        return None, None
+    try:
+        payload = decode_token(token)
+    except TokenBackendError as e:
+        logger.info(f"WebSocket JWT token is invalid or expired: {e}")
+        return None, None
+    return payload, cached_user(payload)
+
+
+async def authenticate_scope(scope):
+    """
+    Пользователь WebSocket-подключения по ?ticket= или ?token=. Декодирование и кэш не
+    занимают поток базы данных; запрос к базе — только при промахе кэша по jti.
+
+    The user of a WebSocket connection from ?ticket= or ?token=. Decoding and the cache
+    do not occupy the database thread; the database is queried only on a jti cache miss.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode())
+    payload, user = await sync_to_async(_authenticate_cached, thread_sensitive=False)(query)
+    if user is None and payload is not None:
+        try:
+            user = await database_sync_to_async(load_user)(payload)
+        except Exception as e:
+            logger.error(f"WebSocket token authentication failed: {e}", exc_info=True)
+    return user or AnonymousUser()
@@ -0,0 +1,42 @@
+import json
+
+from utills import notificationService
+
+
+class RecordingDispatcher:
+    """
+    Заменитель ExpoPushDispatcher: запоминает (токены, заголовок).
+    Stand-in for ExpoPushDispatcher: records (tokens, title).
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def enqueue(self, tokens, title, body, data=None):
+        self.sent.append((list(tokens), title))
+        return len(tokens)
+
+
+class RecordingChannelLayer:
+    """
+    Заменитель channel layer: запоминает (группа, заголовок).
+    Stand-in for the channel layer: records (group, title).
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, json.loads(message["text"])["title"]))
+
+
+def recording_channels(monkeypatch):
+    """
+    Подменяет каналы доставки общего NotificationService и возвращает записанное.
+    Replaces the delivery channels of the shared NotificationService and returns the records.
+    """
+    dispatcher = RecordingDispatcher()
+    channel_layer = RecordingChannelLayer()
+    monkeypatch.setattr(notificationService, 'get_push_dispatcher', lambda: dispatcher)
+    monkeypatch.setattr(notificationService, 'get_channel_layer', lambda: channel_layer)
+    return {"push": dispatcher.sent, "web": channel_layer.sent}
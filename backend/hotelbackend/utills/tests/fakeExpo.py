@@ -0,0 +1,54 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeExpoServer:
+    """
+    Локальная заглушка Expo Push API для тестов: запоминает тела запросов.
+    tickets — ответы отправки по токену, receipts — квитанции по id тикета.
+    Local stand-in for the Expo Push API in tests: records request bodies.
+    tickets holds send results per token, receipts holds receipts per ticket id.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.receipt_requests = []
+        self.tickets = {}
+        self.receipts = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if self.path.endswith('/getReceipts'):
+                    server.receipt_requests.append(body["ids"])
+                    data = {ticket_id: server.receipts[ticket_id] for ticket_id in body["ids"] if ticket_id in server.receipts}
+                else:
+                    server.requests.append((self.path, body))
+                    data = [
+                        server.tickets.get(message["to"], {"status": "ok", "id": f"ticket-{message['to']}"})
+                        for message in body
+                    ]
+                payload = json.dumps({"data": data}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def messages(self):
+        return [message for _, batch in self.requests for message in batch]
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask
+from hotel.models import Room
+from utills.calculateAverageDuration import calculate_average_duration
+from utills.durationStats import DurationStats, duration_stats
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(number=950, floor=9)
+
+
+def _task(room, minutes):
+    now = timezone.now()
+    return CleaningTask.objects.create(
+        room=room,
+        cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING,
+        started_at=now - timedelta(minutes=minutes) if minutes is not None else None,
+        completed_at=now if minutes is not None else None,
+    )
+
+
+@pytest.mark.django_db
+def test_duration_stats_in_sql(room, django_assert_max_num_queries):
+    for minutes in (10, 20, 30, 40, 100, None, 0):
+        _task(room, minutes)
+
+    with django_assert_max_num_queries(3):
+        stats = duration_stats(CleaningTask.objects.all())
+
+    # Без времени и с нулевой длительностью задачи не учитываются
+    # Tasks without timestamps or with zero duration are excluded
+    assert stats.count == 5
+    assert stats.mean == timedelta(minutes=40)
+    assert stats.median == timedelta(minutes=30)
+    # percentile_cont: 40 + (100 - 40) * 0.6
+    assert stats.p90 == timedelta(minutes=76)
+    assert stats.as_minutes() == {"count": 5, "mean": 40.0, "median": 30.0, "p90": 76.0}
+
+
+@pytest.mark.django_db
+def test_duration_stats_never_builds_instances(room, monkeypatch):
+    _task(room, 15)
+    monkeypatch.setattr(CleaningTask, 'from_db', classmethod(lambda *args: pytest.fail("instance built")))
+
+    assert duration_stats(CleaningTask.objects.all()).count == 1
+
+
+@pytest.mark.django_db
+def test_empty_sample(room):
+    _task(room, None)
+
+    assert duration_stats(CleaningTask.objects.all()) == DurationStats(0, None, None, None)
+    assert calculate_average_duration(CleaningTask.objects.all(), "checkout") == 0
+
+
+@pytest.mark.django_db
+def test_benchmark_command_rolls_back(capsys):
+    call_command('benchmark_duration_stats', tasks=200, batch_size=50, repeat=1)
+
+    assert "Speedup" in capsys.readouterr().out
+    assert not CleaningTask.objects.exists()
+    assert not Room.objects.exists()
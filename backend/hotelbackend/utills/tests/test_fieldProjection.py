@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import Booking
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistItemTemplate, ChecklistTemplate, CleaningTask
+from hotel.models import Room, RoomType
+from users.models import User
+from utills.fieldProjection import parse_field_list
+
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(username="mgr_fp", password="password", role=User.Role.MANAGER, first_name="Anna")
+
+
+@pytest.fixture
+def client(manager):
+    client = APIClient()
+    client.force_authenticate(user=manager)
+    return client
+
+
+@pytest.fixture
+def tasks(manager):
+    template = ChecklistTemplate.objects.create(name="Stayover", cleaning_type=CleaningTypeChoices.STAYOVER)
+    ChecklistItemTemplate.objects.create(checklist_template=template, text="Beds", order=0)
+    created = []
+    for number in (101, 102):
+        task = CleaningTask.objects.create(
+            room=Room.objects.create(number=number, floor=1),
+            cleaning_type=CleaningTypeChoices.STAYOVER,
+            scheduled_date=timezone.localdate(),
+            assigned_to=manager,
+        )
+        task.associated_checklists.set([template])
+        created.append(task)
+    return created
+
+
+def _rows(response):
+    return response.data["results"] if "results" in response.data else response.data
+
+
+def _get(client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200, response.data
+    task_queries = [query["sql"] for query in context.captured_queries if 'FROM "cleaning_cleaningtask"' in query["sql"]]
+    return response, task_queries
+
+
+def test_parse_field_list():
+    assert parse_field_list(" id, status,,room_number ") == ["id", "status", "room_number"]
+    assert parse_field_list(None) == []
+
+
+@pytest.mark.django_db
+def test_task_fields_projection_shrinks_payload_and_sql(client, tasks):
+    response, queries = _get(client, reverse('cleaningtask-list'), {"all": "true", "fields": "id,status,room_number"})
+
+    assert [set(row) for row in _rows(response)] == [{"id", "status", "room_number"}] * 2
+    assert {row["room_number"] for row in _rows(response)} == {"101", "102"}
+    select = queries[-1]
+    assert '"cleaning_cleaningtask"."notes"' not in select
+    assert "cleaning_checklistsnapshot" not in select
+    assert '"hotel_room"."number"' in select
+
+
+@pytest.mark.django_db
+def test_task_method_fields_keep_their_sources(client, tasks):
+    response, _ = _get(client, reverse('cleaningtask-list'), {"all": "true", "fields": "id,assigned_to_name,checklist_data,associated_checklist_names"})
+
+    row = _rows(response)[0]
+    assert row["assigned_to_name"] == "Anna"
+    assert row["checklist_data"][0]["items"][0]["text"] == "Beds"
+    assert row["associated_checklist_names"] == ["Stayover"]
+
+
+@pytest.mark.django_db
+def test_task_omit_drops_fields(client, tasks):
+    response, queries = _get(client, reverse('cleaningtask-detail', args=[tasks[0].id]), {"omit": "checklist_data,notes"})
+
+    assert "checklist_data" not in response.data and "notes" not in response.data
+    assert response.data["room_number"] == "101"
+    assert all("cleaning_checklistsnapshot" not in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_compact_task_list(client, tasks):
+    response, queries = _get(client, reverse('cleaningtask-list'), {"all": "true", "compact": "true"})
+
+    row = _rows(response)[0]
+    assert "checklist_data" not in row and "assigned_to_name" not in row
+    assert row["room_number"] == "101"
+    assert all("cleaning_checklistsnapshot" not in sql for sql in queries)
+    # Чек-листы не подгружаются / Checklists are not prefetched
+    assert len(queries) == 1
+
+    detail = client.get(reverse('cleaningtask-detail', args=[tasks[0].id]), {"compact": "true"})
+    assert "checklist_data" in detail.data
+
+
+@pytest.mark.django_db
+def test_unknown_field_is_rejected(client, tasks):
+    response = client.get(reverse('cleaningtask-list'), {"fields": "id,password"})
+
+    assert response.status_code == 400
+    assert "password" in str(response.data["fields"])
+
+
+@pytest.mark.django_db
+def test_projection_does_not_apply_to_writes(client, tasks):
+    response = client.patch(
+        f"{reverse('cleaningtask-detail', args=[tasks[0].id])}?fields=id", {"notes": "Extra towels"}, format="json"
+    )
+
+    assert response.status_code == 200
+    assert response.data["notes"] == "Extra towels"
+    assert "status" in response.data
+
+
+@pytest.mark.django_db
+def test_booking_and_room_projection(client, manager):
+    room_type = RoomType.objects.create(name="Double", capacity=2)
+    room = Room.objects.create(number=301, floor=3, room_type=room_type)
+    now = timezone.now()
+    Booking.objects.create(room=room, check_in=now, check_out=now + timedelta(days=2), created_by=manager)
+
+    bookings = client.get(reverse('booking-list'), {"fields": "id,room,created_by_name,duration_days"})
+    assert bookings.status_code == 200
+    booking = _rows(bookings)[0]
+    assert set(booking) == {"id", "room", "created_by_name", "duration_days"}
+    assert booking["room"]["number"] == 301
+    assert booking["room"]["room_type"] == "Double"
+    assert booking["created_by_name"] == "Anna"
+    assert booking["duration_days"] == 2
+
+    rooms = client.get(reverse('room-list'), {"omit": "room_type,notes"})
+    assert rooms.status_code == 200
+    assert "room_type" not in _rows(rooms)[0]
+    assert _rows(rooms)[0]["room_type_name"] == "Double"
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from utills.mobileNotifications import ExpoPushDispatcher
+from utills.tests.fakeExpo import FakeExpoServer
+
+
+@pytest.fixture
+def fake_expo():
+    server = FakeExpoServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def dispatcher(fake_expo):
+    dispatcher = ExpoPushDispatcher(push_url=f"{fake_expo.url}/--/api/v2/push/send", workers=2, queue_size=10)
+    yield dispatcher
+    dispatcher.close()
+
+
+def tokens(count, prefix="ExponentPushToken"):
+    return [f"{prefix}[{index}]" for index in range(count)]
+
+
+def test_dispatcher_sends_in_chunks_of_100(dispatcher, fake_expo):
+    """
+    250 токенов уходят тремя запросами, каждый не больше 100 сообщений.
+    250 tokens go out in three requests of at most 100 messages each.
+    """
+    assert dispatcher.enqueue(tokens(250), "Title", "Body", {"task_id": 1}) == 250
+    dispatcher.flush()
+
+    assert sorted(len(batch) for _, batch in fake_expo.requests) == [50, 100, 100]
+    assert {message["to"] for message in fake_expo.messages} == set(tokens(250))
+    assert fake_expo.messages[0]["data"] == {"task_id": 1}
+    assert {path for path, _ in fake_expo.requests} == {"/--/api/v2/push/send"}
+
+
+def test_dispatcher_skips_non_expo_tokens(dispatcher, fake_expo):
+    assert dispatcher.enqueue(tokens(2) + ["fcm-token"], "Title", "Body") == 2
+    dispatcher.flush()
+
+    assert len(fake_expo.messages) == 2
+
+
+def test_dispatcher_drops_when_queue_is_full(fake_expo, monkeypatch):
+    """
+    Переполнение очереди не блокирует вызывающего — лишние сообщения отбрасываются.
+    A full queue never blocks the caller — the excess messages are dropped.
+    """
+    dispatcher = ExpoPushDispatcher(push_url=fake_expo.url, workers=1, queue_size=1)
+    release = threading.Event()
+    # Единственный рабочий поток зависает на первом пакете / The only worker hangs on the first chunk
+    monkeypatch.setattr(dispatcher, '_send', lambda batch: release.wait())
+    try:
+        accepted = dispatcher.enqueue(tokens(300), "Title", "Body")
+        assert accepted + dispatcher.dropped == 300
+        assert dispatcher.dropped >= 100
+    finally:
+        release.set()
+        dispatcher.flush()
+        dispatcher.close()
@@ -0,0 +1,138 @@
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import CleaningTask
+from hotel.models import Room
+from notifications.models import Notification, NotificationOutbox, UnreadCounter
+from users.models import PushToken, User
+from utills.notificationOutbox import drain_outbox, enqueue_notification
+from utills.notificationService import notification_service
+from utills.tests.fakeChannels import recording_channels
+
+
+@pytest.fixture
+def delivered(monkeypatch):
+    return recording_channels(monkeypatch)
+
+
+@pytest.fixture
+def users():
+    housekeeper = User.objects.create_user(username="hk_outbox", password="password", role=User.Role.HOUSEKEEPER)
+    front_desk = User.objects.create_user(username="fd_outbox", password="password", role=User.Role.FRONT_DESK)
+    PushToken.objects.create(user=housekeeper, token="ExponentPushToken[hk]")
+    PushToken.objects.create(user=front_desk, token="ExponentPushToken[fd]")
+    return {"housekeeper": housekeeper, "front_desk": front_desk}
+
+
+@pytest.mark.django_db
+def test_start_sends_web_and_push_only_after_commit(users, delivered, django_capture_on_commit_callbacks):
+    """
+    Действие start пишет запись в outbox; web и push уходят вместе после фиксации.
+    The start action writes an outbox entry; web and push go out together after commit.
+    """
+    room = Room.objects.create(number=701, floor=7)
+    task = CleaningTask.objects.create(
+        room=room, cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING, assigned_to=users["housekeeper"]
+    )
+    client = APIClient()
+    client.force_authenticate(user=users["housekeeper"])
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        response = client.patch(reverse('cleaningtask-start', args=[task.id]))
+
+    assert response.status_code == 200
+    assert NotificationOutbox.objects.filter(status=NotificationOutbox.Status.PENDING).count() == 1
+    assert delivered == {"push": [], "web": []}
+
+    for callback in callbacks:
+        callback()
+
+    assert delivered["web"] == [("online_manager", "Уборка начата"), ("online_front-desk", "Уборка начата")]
+    assert delivered["push"] == [(["ExponentPushToken[fd]"], "Уборка начата")]
+    assert NotificationOutbox.objects.get().status == NotificationOutbox.Status.SENT
+
+
+@pytest.mark.django_db
+def test_rolled_back_transaction_leaks_nothing(users, delivered, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                enqueue_notification("Title", "Body", users=[users["housekeeper"]])
+                raise RuntimeError("rollback")
+
+    assert not NotificationOutbox.objects.exists()
+    assert delivered == {"push": [], "web": []}
+
+
+@pytest.mark.django_db
+def test_duplicate_events_collapse(users, delivered):
+    """
+    Неотправленные записи с одним dedup_key схлопываются в последнюю.
+    Pending entries sharing a dedup_key collapse into the latest one.
+    """
+    enqueue_notification("Rush 1", "Body", users=[users["housekeeper"]], dedup_key="task_rush:1")
+    enqueue_notification("Rush 2", "Body", users=[users["housekeeper"]], dedup_key="task_rush:1")
+    # Гонка: дубликат создан в обход enqueue_notification / Race: a duplicate created outside enqueue_notification
+    NotificationOutbox.objects.create(title="Rush 3", body="Body", user_ids=[users["housekeeper"].id], dedup_key="task_rush:1")
+    enqueue_notification("Other", "Body", users=[users["housekeeper"]])
+
+    assert drain_outbox() == 3
+
+    assert delivered["push"] == [
+        (["ExponentPushToken[hk]"], "Rush 3"),
+        (["ExponentPushToken[hk]"], "Other"),
+    ]
+    assert not NotificationOutbox.objects.filter(status=NotificationOutbox.Status.PENDING).exists()
+
+
+@pytest.mark.django_db
+def test_drain_loads_tokens_once_per_batch(users, delivered, django_assert_num_queries):
+    for index in range(20):
+        enqueue_notification(f"Task {index}", "Body", users=[users["housekeeper"]], push_roles=[User.Role.FRONT_DESK])
+
+    # захват: savepoint + выборка записей + bulk_update + release; токены пользователей + токены роли;
+    # итоговые статусы bulk_update
+    # claim: savepoint + pending entries + bulk_update + release; user tokens + role tokens;
+    # final statuses bulk_update
+    with django_assert_num_queries(7):
+        drain_outbox(batch_size=50)
+
+    assert len(delivered["push"]) == 20
+    assert delivered["push"][0][0] == ["ExponentPushToken[fd]", "ExponentPushToken[hk]"]
+
+
+@pytest.mark.django_db
+def test_retry_after_failure_does_not_persist_twice(users, delivered, monkeypatch):
+    """
+    deliver() упал после сохранения Notification: повторная попытка не создает строки
+    и не увеличивает счетчик непрочитанных снова, а отправляет уже сохраненные id.
+
+    deliver() failed after the Notification rows were saved: the retry neither creates rows
+    nor increments the unread counter again, and sends the ids saved before.
+    """
+    housekeeper = users["housekeeper"]
+    enqueue_notification("Новая задача", "Body", users=[housekeeper], persist=True, event_type="task_assigned")
+    send_web = notification_service._send_web
+
+    def failing_send_web(group_messages):
+        raise ConnectionError("channel layer is down")
+
+    monkeypatch.setattr(notification_service, '_send_web', failing_send_web)
+    drain_outbox()
+
+    entry = NotificationOutbox.objects.get()
+    assert (entry.status, entry.attempts) == (NotificationOutbox.Status.PENDING, 1)
+    notification = Notification.objects.get(user=housekeeper)
+    assert entry.persisted_ids == {"users": {str(housekeeper.id): notification.id}, "roles": {}}
+
+    monkeypatch.setattr(notification_service, '_send_web', send_web)
+    drain_outbox()
+
+    assert NotificationOutbox.objects.get().status == NotificationOutbox.Status.SENT
+    assert Notification.objects.filter(user=housekeeper).count() == 1
+    assert UnreadCounter.objects.personal_unread(housekeeper.pk) == 1
+    assert delivered["web"] == [(f"user_{housekeeper.id}", "Новая задача")]
+    assert delivered["push"] == [(["ExponentPushToken[hk]"], "Новая задача")]
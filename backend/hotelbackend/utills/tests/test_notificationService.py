@@ -0,0 +1,67 @@
+import pytest
+
+from notifications.models import Notification
+from users.models import PushToken, User
+from utills.notificationService import NotificationEvent, NotificationService
+from utills.tests.fakeChannels import RecordingChannelLayer, RecordingDispatcher
+
+
+@pytest.fixture
+def service():
+    return NotificationService(dispatcher=RecordingDispatcher(), channel_layer=RecordingChannelLayer())
+
+
+@pytest.fixture
+def staff():
+    result = {}
+    for role, count in ((User.Role.HOUSEKEEPER, 3), (User.Role.FRONT_DESK, 2)):
+        for index in range(count):
+            user = User.objects.create_user(username=f"{role}_{index}_svc", password="password", role=role)
+            PushToken.objects.create(user=user, token=f"ExponentPushToken[{role}-{index}]")
+            result.setdefault(role, []).append(user)
+    return result
+
+
+@pytest.mark.django_db
+def test_deliver_persists_and_fans_out_in_one_pass(service, staff, django_assert_num_queries):
+    """
+    Пакет событий: токены пользователей одним запросом, токены ролей одним запросом,
+    Notification — одним bulk_create, счетчики непрочитанных — одним UPDATE;
+    WebSocket и push уходят за один проход.
+
+    A batch of events: user tokens in one query, role tokens in one query,
+    Notification rows in one bulk_create, unread counters in one UPDATE;
+    WebSocket and push go out in one pass.
+    """
+    housekeepers = staff[User.Role.HOUSEKEEPER]
+    events = [
+        NotificationEvent("task_assigned", f"Task {index}", "Body", {"task_id": index},
+                          user_ids=(housekeeper.id,), persist=True)
+        for index, housekeeper in enumerate(housekeepers)
+    ] + [
+        NotificationEvent("cleaning_completed", "Done", "Body", {}, push_roles=(User.Role.FRONT_DESK,),
+                          web_roles=(User.Role.MANAGER,), web_type="task_completed_web"),
+    ]
+
+    with django_assert_num_queries(4):
+        results = service.deliver(events)
+
+    assert results == [True] * 4
+    assert Notification.objects.filter(notification_type="task_assigned").count() == 3
+    assert service.dispatcher.sent[-1] == (["ExponentPushToken[front-desk-0]", "ExponentPushToken[front-desk-1]"], "Done")
+    assert ("online_manager", "Done") in service.channel_layer.sent
+    assert (f"user_{housekeepers[0].id}", "Task 0") in service.channel_layer.sent
+
+    metrics = service.metrics.snapshot()
+    assert metrics["task_assigned"] == {"events": 3, "push_messages": 3, "web_messages": 3, "persisted": 3}
+    assert metrics["cleaning_completed"] == {"events": 1, "push_messages": 2, "web_messages": 1, "persisted": 0}
+
+
+@pytest.mark.django_db
+def test_deliver_skips_inactive_tokens(service, staff):
+    housekeeper = staff[User.Role.HOUSEKEEPER][0]
+    PushToken.objects.filter(user=housekeeper).update(is_active=False)
+
+    service.deliver([NotificationEvent("task_rush", "Rush", "Body", {}, user_ids=(housekeeper.id,))])
+
+    assert service.dispatcher.sent == []
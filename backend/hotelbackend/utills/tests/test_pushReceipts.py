@@ -0,0 +1,111 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from users.models import PushTicket, PushToken, User
+from utills.mobileNotifications import ExpoPushDispatcher
+from utills.pushReceipts import process_push_receipts, record_push_tickets
+from utills.tests.fakeExpo import FakeExpoServer
+
+
+@pytest.fixture
+def fake_expo():
+    server = FakeExpoServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def push_tokens():
+    user = User.objects.create_user(username="push_user", password="password", role=User.Role.HOUSEKEEPER)
+    return {
+        name: PushToken.objects.create(user=user, token=f"ExponentPushToken[{name}]")
+        for name in ("alive", "uninstalled", "flaky")
+    }
+
+
+def message(token):
+    return {"to": token.token, "title": "Title", "body": "Body", "data": {}}
+
+
+@pytest.mark.django_db
+def test_record_tickets_stores_ids_and_disables_unregistered(push_tokens):
+    """
+    Успешные тикеты сохраняются, DeviceNotRegistered на этапе тикета сразу отключает токен.
+    Successful tickets are stored, DeviceNotRegistered on the ticket disables the token at once.
+    """
+    record_push_tickets(
+        [message(push_tokens["alive"]), message(push_tokens["uninstalled"])],
+        [
+            {"status": "ok", "id": "ticket-alive"},
+            {"status": "error", "message": "not registered", "details": {"error": "DeviceNotRegistered"}},
+        ],
+    )
+
+    assert list(PushTicket.objects.values_list('ticket_id', 'push_token_id')) == [("ticket-alive", push_tokens["alive"].id)]
+    push_tokens["uninstalled"].refresh_from_db()
+    assert not push_tokens["uninstalled"].is_active
+    assert push_tokens["uninstalled"].last_error == "DeviceNotRegistered"
+    assert set(PushToken.objects.active()) == {push_tokens["alive"], push_tokens["flaky"]}
+
+
+@pytest.mark.django_db
+def test_process_receipts_updates_tokens_and_keeps_pending(push_tokens, fake_expo):
+    """
+    Квитанции применяются к токенам, обработанные тикеты удаляются, неготовые остаются.
+    Receipts are applied to tokens, processed tickets are deleted, pending ones stay.
+    """
+    push_tokens["alive"].failure_count = 3
+    push_tokens["alive"].save()
+    for name in ("alive", "uninstalled", "flaky"):
+        PushTicket.objects.create(ticket_id=f"ticket-{name}", push_token=push_tokens[name])
+    PushTicket.objects.create(ticket_id="ticket-pending", push_token=push_tokens["alive"])
+    expired = PushTicket.objects.create(ticket_id="ticket-expired", push_token=push_tokens["alive"])
+    PushTicket.objects.update(created_at=timezone.now() - timedelta(minutes=30))
+    PushTicket.objects.filter(pk=expired.pk).update(created_at=timezone.now() - timedelta(days=2))
+
+    fake_expo.receipts = {
+        "ticket-alive": {"status": "ok"},
+        "ticket-uninstalled": {"status": "error", "details": {"error": "DeviceNotRegistered"}},
+        "ticket-flaky": {"status": "error", "details": {"error": "MessageRateExceeded"}},
+    }
+
+    summary = process_push_receipts(receipts_url=f"{fake_expo.url}/--/api/v2/push/getReceipts")
+
+    assert summary == {"checked": 3, "ok": 1, "errors": 2, "disabled": 1, "expired": 1}
+    assert fake_expo.receipt_requests == [["ticket-alive", "ticket-uninstalled", "ticket-flaky", "ticket-pending"]]
+    assert list(PushTicket.objects.values_list('ticket_id', flat=True)) == ["ticket-pending"]
+
+    for token in push_tokens.values():
+        token.refresh_from_db()
+    assert push_tokens["alive"].failure_count == 0
+    assert not push_tokens["uninstalled"].is_active
+    assert push_tokens["flaky"].is_active
+    assert push_tokens["flaky"].failure_count == 1
+    assert push_tokens["flaky"].last_error == "MessageRateExceeded"
+
+
+@pytest.mark.django_db
+def test_process_receipts_skips_recent_tickets(push_tokens, fake_expo):
+    PushTicket.objects.create(ticket_id="ticket-fresh", push_token=push_tokens["alive"])
+
+    process_push_receipts(receipts_url=f"{fake_expo.url}/--/api/v2/push/getReceipts")
+
+    assert fake_expo.receipt_requests == []
+    assert PushTicket.objects.filter(ticket_id="ticket-fresh").exists()
+
+
+def test_dispatcher_passes_tickets_to_handler(fake_expo):
+    handled = []
+    fake_expo.tickets = {"ExponentPushToken[b]": {"status": "error", "details": {"error": "DeviceNotRegistered"}}}
+    dispatcher = ExpoPushDispatcher(push_url=fake_expo.url, workers=1, on_tickets=lambda messages, tickets: handled.append(tickets))
+    try:
+        dispatcher.enqueue(["ExponentPushToken[a]", "ExponentPushToken[b]"], "Title", "Body")
+        dispatcher.flush()
+    finally:
+        dispatcher.close()
+
+    assert handled == [[
+        {"status": "ok", "id": "ticket-ExponentPushToken[a]"},
+        {"status": "error", "details": {"error": "DeviceNotRegistered"}},
+    ]]
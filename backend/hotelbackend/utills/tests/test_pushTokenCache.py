@@ -0,0 +1,136 @@
+import time
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import PushToken, User
+from utills.pushReceipts import apply_delivery_results
+from utills.pushTokenCache import PushTokenCache, push_token_cache
+
+
+@pytest.fixture
+def housekeeper():
+    user = User.objects.create_user(username="hk_cache", password="password", role=User.Role.HOUSEKEEPER)
+    PushToken.objects.create(user=user, token="ExponentPushToken[hk-1]")
+    return user
+
+
+@pytest.mark.django_db
+def test_second_lookup_is_served_from_cache(housekeeper, django_assert_num_queries):
+    cache = PushTokenCache()
+
+    with django_assert_num_queries(2):
+        assert cache.tokens_for_users([housekeeper.id]) == {housekeeper.id: {"ExponentPushToken[hk-1]"}}
+        assert cache.tokens_for_roles([User.Role.HOUSEKEEPER, User.Role.FRONT_DESK]) == {
+            User.Role.HOUSEKEEPER: {"ExponentPushToken[hk-1]"},
+            User.Role.FRONT_DESK: set(),
+        }
+
+    with django_assert_num_queries(0):
+        cache.tokens_for_users([housekeeper.id])
+        cache.tokens_for_roles([User.Role.HOUSEKEEPER, User.Role.FRONT_DESK])
+
+    assert cache.stats() == {"hits": 3, "misses": 3, "hit_rate": 0.5, "size": 3}
+
+
+@pytest.mark.django_db
+def test_local_entries_expire_after_timeout(housekeeper):
+    """
+    Изменения из другого процесса (здесь — update() без сигналов) видны после timeout.
+    Changes made by another process (here update() without signals) show up after the timeout.
+    """
+    cache = PushTokenCache(timeout=0.05)
+    assert cache.tokens_for_users([housekeeper.id]) == {housekeeper.id: {"ExponentPushToken[hk-1]"}}
+
+    PushToken.objects.filter(user=housekeeper).update(is_active=False)
+    assert cache.tokens_for_users([housekeeper.id]) == {housekeeper.id: {"ExponentPushToken[hk-1]"}}
+
+    time.sleep(0.1)
+    assert cache.tokens_for_users([housekeeper.id]) == {housekeeper.id: set()}
+
+
+@pytest.mark.django_db
+def test_token_changes_invalidate_cache(housekeeper):
+    assert push_token_cache.tokens_for_roles([User.Role.HOUSEKEEPER])[User.Role.HOUSEKEEPER] == {"ExponentPushToken[hk-1]"}
+
+    token = PushToken.objects.create(user=housekeeper, token="ExponentPushToken[hk-2]")
+    assert push_token_cache.tokens_for_users([housekeeper.id])[housekeeper.id] == {
+        "ExponentPushToken[hk-1]", "ExponentPushToken[hk-2]"
+    }
+
+    token.delete()
+    assert push_token_cache.tokens_for_roles([User.Role.HOUSEKEEPER])[User.Role.HOUSEKEEPER] == {"ExponentPushToken[hk-1]"}
+
+
+@pytest.mark.django_db
+def test_role_change_moves_tokens_between_roles(housekeeper):
+    push_token_cache.tokens_for_roles([User.Role.HOUSEKEEPER, User.Role.FRONT_DESK])
+
+    housekeeper.role = User.Role.FRONT_DESK
+    housekeeper.save(update_fields=['role'])
+
+    tokens = push_token_cache.tokens_for_roles([User.Role.HOUSEKEEPER, User.Role.FRONT_DESK])
+    assert tokens == {User.Role.HOUSEKEEPER: set(), User.Role.FRONT_DESK: {"ExponentPushToken[hk-1]"}}
+
+
+@pytest.mark.django_db
+def test_disabled_tokens_are_dropped_from_cache(housekeeper):
+    """
+    QuerySet.update не отправляет сигналы — apply_delivery_results сбрасывает кэш сам.
+    QuerySet.update sends no signals — apply_delivery_results invalidates the cache itself.
+    """
+    push_token_cache.tokens_for_users([housekeeper.id])
+    token = PushToken.objects.get(user=housekeeper)
+
+    apply_delivery_results(failed_tokens={token.id: "DeviceNotRegistered"})
+
+    assert push_token_cache.tokens_for_users([housekeeper.id]) == {housekeeper.id: set()}
+
+
+@pytest.mark.django_db
+def test_reassigned_token_leaves_previous_owner(housekeeper):
+    other = User.objects.create_user(username="fd_cache", password="password", role=User.Role.FRONT_DESK)
+    push_token_cache.tokens_for_users([housekeeper.id, other.id])
+
+    client = APIClient()
+    client.force_authenticate(user=other)
+    response = client.post(reverse('register-push-token'), {"token": "ExponentPushToken[hk-1]"}, format='json')
+
+    assert response.status_code in (200, 201)
+    assert push_token_cache.tokens_for_users([housekeeper.id, other.id]) == {
+        housekeeper.id: set(),
+        other.id: {"ExponentPushToken[hk-1]"},
+    }
+
+
+@pytest.mark.django_db
+@override_settings(CACHES={"push": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "push-tokens"}})
+def test_shared_backend(housekeeper, django_assert_num_queries):
+    caches["push"].clear()
+    first, second = PushTokenCache(alias="push"), PushTokenCache(alias="push")
+
+    first.tokens_for_roles([User.Role.HOUSEKEEPER])
+    with django_assert_num_queries(0):
+        assert second.tokens_for_roles([User.Role.HOUSEKEEPER]) == {User.Role.HOUSEKEEPER: {"ExponentPushToken[hk-1]"}}
+
+    # Инвалидация через один экземпляр видна другому / Invalidation through one instance is seen by the other
+    first.invalidate_users([housekeeper.id])
+    with django_assert_num_queries(1):
+        second.tokens_for_roles([User.Role.HOUSEKEEPER])
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_manager_only(housekeeper):
+    manager = User.objects.create_user(username="mgr_cache", password="password", role=User.Role.MANAGER)
+    client = APIClient()
+
+    client.force_authenticate(user=housekeeper)
+    assert client.get(reverse('notification-metrics')).status_code == 403
+
+    client.force_authenticate(user=manager)
+    response = client.get(reverse('notification-metrics'))
+    assert response.status_code == 200
+    assert set(response.data) == {"events", "push_token_cache"}
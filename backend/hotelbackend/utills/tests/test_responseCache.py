@@ -0,0 +1,197 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import Booking
+from cleaning.cleaningTypeChoices import CleaningTypeChoices
+from cleaning.models import ChecklistTemplate, CleaningTask
+from hotel.models import Room
+from notifications.models import Notification
+from users.models import User
+
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(username="mgr_rc", password="password", role=User.Role.MANAGER)
+
+
+@pytest.fixture
+def front_desk():
+    return User.objects.create_user(username="fd_rc", password="password", role=User.Role.FRONT_DESK)
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_status_summary_is_cached_until_room_changes(manager, django_assert_num_queries):
+    room = Room.objects.create(number=801, floor=8, status=Room.Status.DIRTY)
+    client = _client(manager)
+    url = reverse('room-status-summary')
+
+    first = client.get(url)
+    assert first['X-Cache'] == 'MISS'
+    assert first.data['dirty'] == 1
+
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second['X-Cache'] == 'HIT'
+    assert second.data == first.data
+
+    room.status = Room.Status.CLEAN
+    room.save(update_fields=['status'])
+
+    third = client.get(url)
+    assert third['X-Cache'] == 'MISS'
+    assert third.data['dirty'] == 0
+    assert third.data['clean'] == 1
+
+
+@pytest.mark.django_db
+def test_cache_key_varies_by_role_and_query(manager, front_desk):
+    ChecklistTemplate.objects.create(name="Stayover", cleaning_type=CleaningTypeChoices.STAYOVER)
+    url = reverse('checklisttemplate-available-checklists')
+
+    assert _client(manager).get(url, {"cleaning_type": CleaningTypeChoices.STAYOVER})['X-Cache'] == 'MISS'
+    assert _client(front_desk).get(url, {"cleaning_type": CleaningTypeChoices.STAYOVER})['X-Cache'] == 'MISS'
+    assert _client(front_desk).get(url, {"cleaning_type": CleaningTypeChoices.STAYOVER})['X-Cache'] == 'HIT'
+
+    response = _client(front_desk).get(url, {"cleaning_type": CleaningTypeChoices.DEPARTURE_CLEANING})
+    assert response['X-Cache'] == 'MISS'
+    assert response.data == []
+
+
+@pytest.mark.django_db
+def test_errors_are_not_cached(manager):
+    url = reverse('checklisttemplate-available-checklists')
+
+    assert _client(manager).get(url).status_code == 400
+    assert _client(manager).get(url)['X-Cache'] == 'MISS'
+
+
+@pytest.mark.django_db
+def test_permissions_are_checked_before_cache(manager, front_desk):
+    housekeeper = User.objects.create_user(username="hk_rc", password="password", role=User.Role.HOUSEKEEPER)
+    url = reverse('room-status-summary')
+    _client(manager).get(url)
+
+    # Как и до кэширования — только менеджер / As before caching — managers only
+    assert _client(front_desk).get(url).status_code == 403
+    assert _client(housekeeper).get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_stats_invalidated_by_tasks_and_bookings(manager):
+    room = Room.objects.create(number=802, floor=8)
+    client = _client(manager)
+    url = reverse('cleaning-stats')
+
+    assert client.get(url).data['checkoutTotal'] == 0
+    assert client.get(url)['X-Cache'] == 'HIT'
+
+    CleaningTask.objects.create(
+        room=room, cleaning_type=CleaningTypeChoices.DEPARTURE_CLEANING, scheduled_date=timezone.localdate()
+    )
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['checkoutTotal'] == 1
+
+    Booking.objects.create(room=room, check_in=timezone.now(), guest_count=1)
+    assert client.get(url)['X-Cache'] == 'MISS'
+
+
+def _conditional_get(client, url, etag, params=None):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params or {}, HTTP_IF_NONE_MATCH=etag)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_unchanged_room_status_poll_returns_304(manager):
+    room = Room.objects.create(number=803, floor=8, status=Room.Status.DIRTY)
+    client = _client(manager)
+    url = reverse('room-status-list')
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first['ETag']
+
+    second, queries = _conditional_get(client, url, etag)
+    assert second.status_code == 304
+    assert second.content == b''
+    assert second['ETag'] == etag
+    assert queries == 0
+
+    room.status = Room.Status.CLEAN
+    room.save(update_fields=['status'])
+    third, _ = _conditional_get(client, url, etag)
+    assert third.status_code == 200
+    assert third['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_task_list_etag_is_per_user_and_follows_changes(manager):
+    other_manager = User.objects.create_user(username="mgr_rc2", password="password", role=User.Role.MANAGER)
+    room = Room.objects.create(number=804, floor=8)
+    task = CleaningTask.objects.create(room=room, cleaning_type=CleaningTypeChoices.STAYOVER, scheduled_date=timezone.localdate())
+    client = _client(manager)
+    url = reverse('cleaningtask-list')
+
+    etag = client.get(url, {"all": "true"})['ETag']
+    assert _client(other_manager).get(url, {"all": "true"}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    # Другие параметры — другой ответ / Other parameters are another response
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    assert client.get(url, {"all": "true"}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    manager.first_name = "Olga"
+    manager.save()
+    etag_after_rename = client.get(url, {"all": "true"}, HTTP_IF_NONE_MATCH=etag)['ETag']
+    assert etag_after_rename != etag
+
+    template = ChecklistTemplate.objects.create(name="Minibar", cleaning_type=CleaningTypeChoices.STAYOVER)
+    task.associated_checklists.set([template])
+    assert client.get(url, {"all": "true"}, HTTP_IF_NONE_MATCH=etag_after_rename).status_code == 200
+
+
+@pytest.mark.django_db
+def test_conditional_poll_reduces_queries_and_bytes(manager):
+    for number in range(900, 930):
+        CleaningTask.objects.create(
+            room=Room.objects.create(number=number, floor=9),
+            cleaning_type=CleaningTypeChoices.STAYOVER,
+            scheduled_date=timezone.localdate(),
+        )
+    client = _client(manager)
+    url = reverse('cleaningtask-list')
+
+    full, full_queries = _conditional_get(client, url, '', {"all": "true"})
+    not_modified, conditional_queries = _conditional_get(client, url, full['ETag'], {"all": "true"})
+
+    assert not_modified.status_code == 304
+    assert conditional_queries == 0 < full_queries
+    assert len(not_modified.content) == 0 < len(full.content)
+
+
+@pytest.mark.django_db
+def test_unread_count_etag_follows_the_users_notifications(manager, front_desk):
+    client = _client(manager)
+    url = reverse('notification-unread-count')
+    etag = client.get(url)['ETag']
+
+    Notification.objects.create(user=front_desk, title="t", body="b", notification_type="x")
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    Notification.objects.create(user=manager, title="t", body="b", notification_type="x")
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data == {"unread_count": 1}
+
+    etag = response['ETag']
+    client.post(reverse('notification-mark-as-read'), {"mark_all": True}, format='json')
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).data == {"unread_count": 0}
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+from utills import socketAuth
+
+
+@pytest.fixture
+def housekeeper():
+    return User.objects.create_user(username="socket_hk", password="password", role=User.Role.HOUSEKEEPER)
+
+
+def _scope(**params):
+    query = '&'.join(f"{key}={value}" for key, value in params.items())
+    return {"type": "websocket", "query_string": query.encode()}
+
+
+def _authenticate(scope):
+    return async_to_sync(socketAuth.authenticate_scope)(scope)
+
+
+@pytest.mark.django_db
+def test_token_handshake_hits_the_database_once_per_token(housekeeper, django_assert_num_queries):
+    token = str(AccessToken.for_user(housekeeper))
+
+    with django_assert_num_queries(1):
+        user = _authenticate(_scope(token=token))
+    assert user.pk == housekeeper.pk
+
+    with django_assert_num_queries(0):
+        user = _authenticate(_scope(token=token))
+    assert user.is_authenticated
+    assert (user.pk, user.username, user.role) == (housekeeper.pk, "socket_hk", User.Role.HOUSEKEEPER)
+
+
+@pytest.mark.django_db
+def test_role_change_and_deactivation_invalidate_the_cache(housekeeper, django_assert_num_queries):
+    token = str(AccessToken.for_user(housekeeper))
+    _authenticate(_scope(token=token))
+
+    housekeeper.role = User.Role.MANAGER
+    housekeeper.save()
+    with django_assert_num_queries(1):
+        assert _authenticate(_scope(token=token)).role == User.Role.MANAGER
+
+    housekeeper.is_active = False
+    housekeeper.save()
+    assert not _authenticate(_scope(token=token)).is_authenticated
+
+
+@pytest.mark.django_db
+def test_invalid_expired_and_missing_tokens_are_anonymous(housekeeper):
+    expired = AccessToken.for_user(housekeeper)
+    expired.set_exp(lifetime=-timedelta(minutes=1))
+
+    assert not _authenticate(_scope(token="not-a-jwt")).is_authenticated
+    assert not _authenticate(_scope(token=str(expired))).is_authenticated
+    assert not _authenticate(_scope()).is_authenticated
+
+
+@pytest.mark.django_db
+def test_ticket_is_single_use_and_skips_the_database(housekeeper, django_assert_num_queries):
+    client = APIClient()
+    client.force_authenticate(housekeeper)
+    response = client.post(reverse('socket-ticket'))
+    assert response.status_code == 201
+    ticket = response.data["ticket"]
+
+    with django_assert_num_queries(0):
+        user = _authenticate(_scope(ticket=ticket))
+    assert user.pk == housekeeper.pk
+    assert not _authenticate(_scope(ticket=ticket)).is_authenticated
+
+
+@pytest.mark.django_db
+def test_ticket_endpoint_requires_authentication():
+    assert APIClient().post(reverse('socket-ticket')).status_code == 401
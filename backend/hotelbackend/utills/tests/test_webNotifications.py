@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from notifications.models import Notification, RoleNotification
+from users.models import User
+from utills import webNotifications
+
+
+class ConcurrentChannelLayer:
+    """
+    Заменитель channel layer: запоминает (группа, сообщение) и максимум одновременных отправок.
+    Stand-in for the channel layer: records (group, message) and the peak of concurrent sends.
+    """
+
+    def __init__(self, failing=()):
+        self.sent = []
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def group_send(self, group, message):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        if group in self.failing:
+            raise ConnectionError("layer unavailable")
+        self.sent.append((group, json.loads(message["text"])))
+
+
+@pytest.fixture
+def layer(monkeypatch):
+    layer = ConcurrentChannelLayer()
+    monkeypatch.setattr(webNotifications, 'get_channel_layer', lambda: layer)
+    return layer
+
+
+@pytest.fixture
+def users():
+    return [
+        User.objects.create_user(username=f"web_notify_{index}", password="password", role=User.Role.HOUSEKEEPER)
+        for index in range(5)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_notifications_use_one_insert_and_concurrent_sends(layer, users, django_assert_num_queries):
+    user_ids = [user.id for user in users]
+    # Проверка пользователей, вставка личных уведомлений, счетчики непрочитанных, вставка общего inbox ролей
+    # Checking the users, inserting personal notifications, unread counters, inserting the role shared inbox
+    with django_assert_num_queries(4):
+        sent = webNotifications.send_web_notifications(
+            "Новая задача", "Комната 101", "task_assigned", {"task_id": 1},
+            user_ids=user_ids + [user_ids[0], 999999], roles=[User.Role.MANAGER, User.Role.FRONT_DESK],
+        )
+
+    assert sent == 7
+    assert layer.peak == 7
+    assert Notification.objects.filter(user_id__in=user_ids).count() == 5
+    personal = {group: message for group, message in layer.sent if group.startswith("user_")}
+    assert set(personal) == {f"user_{user_id}" for user_id in user_ids}
+    assert all(message["save_to_db"] for message in personal.values())
+    broadcast = [message for group, message in layer.sent if group.startswith("online_")]
+    assert {(message["scope"], message["save_to_db"]) for message in broadcast} == {("role", True)}
+    assert RoleNotification.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_failed_group_does_not_stop_the_batch(layer, users):
+    layer.failing.add("online_manager")
+    sent = webNotifications.send_web_notifications(
+        "Инцидент", "Протечка", "incident", user_ids=[users[0].id], roles=[User.Role.MANAGER], save_to_db=False,
+    )
+    assert sent == 1
+    assert [group for group, _ in layer.sent] == [f"user_{users[0].id}"]
+    assert not Notification.objects.exists()
+
+
+@pytest.mark.django_db
+def test_async_variant_and_legacy_helpers(layer, users):
+    sent = async_to_sync(webNotifications.asend_web_notifications)(
+        "Смена", "Начало смены", "shift", user_ids=[users[1].id],
+    )
+    assert sent == 1
+    assert Notification.objects.filter(user=users[1]).count() == 1
+
+    webNotifications.send_personal_notification(users[2].id, "Привет", "Текст", "info")
+    webNotifications.send_broadcast_notification_to_roles("Все", "Текст", "info", roles_to_notify=[User.Role.HOUSEKEEPER])
+    assert [group for group, _ in layer.sent[1:]] == [f"user_{users[2].id}", "online_housekeeper"]
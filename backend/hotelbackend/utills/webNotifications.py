@@ -1,87 +1,201 @@
 # notifications/services.py (или notifications/utils.py)
 
+import asyncio
 import json
 import logging
-from channels.layers import get_channel_layer
+import uuid
+from collections import Counter
+
 from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
-from datetime import datetime 
-import uuid # 
 
+from notifications.inbox import PERSONAL, ROLE, adjust_unread, create_role_notifications
 from notifications.models import Notification
-from users.models import User 
+from users.models import User
 
-from django.db.models import Q 
+from .responseCache import NOTIFICATIONS, invalidate, user_namespace
 
 logger = logging.getLogger(__name__)
 
 
+def channel_message(handler_type, payload):
+    """
+    Сообщение channel layer с уже закодированным JSON: кодирование происходит один раз
+    при публикации, а не в каждом подключенном сокете группы.
+
+    A channel layer message carrying ready-to-send JSON: encoding happens once at publish
+    time instead of in every connected socket of the group.
+    """
+    return {"type": handler_type, "text": json.dumps(payload, cls=DjangoJSONEncoder)}
+
+
+def frame_text(event):
+    """
+    Текст кадра из сообщения channel layer; "message" — формат до предкодирования.
+    The frame text of a channel layer message; "message" is the format before pre-encoding.
+    """
+    if "text" in event:
+        return event["text"]
+    return json.dumps(event["message"], cls=DjangoJSONEncoder)
+
+
+def _message(message_id, title, body, notification_type, data, created_at, save_to_db, scope=PERSONAL):
+    return channel_message("send_notification", {
+        "id": message_id,
+        "scope": scope,
+        "title": title,
+        "body": body,
+        "notification_type": notification_type,
+        "data": data,
+        "is_read": False,
+        "created_at": created_at.isoformat(),
+        "save_to_db": save_to_db,
+    })
+
+
+def role_group(role):
+    return f"online_{str(role).lower()}"
+
+
+async def agroup_send_many(group_messages, channel_layer=None):
+    """
+    Отправляет все пары (группа, сообщение) одновременно в одном цикле событий.
+    Ошибка одной группы не мешает остальным. Возвращает число успешных отправок.
+
+    Sends every (group, message) pair concurrently on one event loop.
+    A failure of one group does not affect the others. Returns the number of successful sends.
+    """
+    channel_layer = channel_layer or get_channel_layer()
+    if not channel_layer or not group_messages:
+        return 0
+    results = await asyncio.gather(
+        *(channel_layer.group_send(group, message) for group, message in group_messages),
+        return_exceptions=True,
+    )
+    sent = 0
+    for (group, _), result in zip(group_messages, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error sending WebSocket notification to '{group}': {result}", exc_info=result)
+        else:
+            sent += 1
+    return sent
+
+
+def group_send_many(group_messages, channel_layer=None):
+    """
+    Синхронная обертка agroup_send_many: один переход sync→async на весь пакет.
+    Synchronous wrapper of agroup_send_many: one sync→async bridge for the whole batch.
+    """
+    if not group_messages:
+        return 0
+    return async_to_sync(agroup_send_many)(group_messages, channel_layer)
+
+
+def _persist(user_ids, title, body, notification_type, data):
+    """
+    Сохраняет уведомления существующих пользователей одним bulk_create.
+    Saves the notifications of the existing users with one bulk_create.
+    """
+    existing = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    for user_id in set(user_ids) - existing:
+        logger.error(f"User with ID {user_id} not found for personal notification creation. Notification not saved to DB.")
+    notifications = Notification.objects.bulk_create([
+        Notification(user_id=user_id, title=title, body=body, notification_type=notification_type, data=data)
+        for user_id in user_ids if user_id in existing
+    ])
+    if notifications:
+        # bulk_create не отправляет post_save — версии уведомлений получателей увеличиваем явно
+        # bulk_create does not send post_save, so the recipients' notification versions are bumped explicitly
+        invalidate(*{user_namespace(NOTIFICATIONS, notification.user_id) for notification in notifications})
+        adjust_unread(Counter(notification.user_id for notification in notifications))
+    return notifications
+
+
+def build_web_notifications(title, body, notification_type, data=None, *, user_ids=(), roles=(), save_to_db=True):
+    """
+    Готовит пакет WebSocket-сообщений пользователям и онлайн-группам ролей. save_to_db сохраняет
+    уведомления пользователей одним bulk_create и по одной строке общего inbox на роль.
+    Возвращает список (группа, сообщение).
+
+    Prepares a batch of WebSocket messages to users and to the online role groups. save_to_db
+    saves the users' notifications with one bulk_create and one shared inbox row per role.
+    Returns a list of (group, message).
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    now = timezone.now()
+    group_messages = []
+    if save_to_db:
+        for notification in _persist(user_ids, title, body, notification_type, data):
+            group_messages.append((
+                f"user_{notification.user_id}",
+                _message(str(notification.id), title, body, notification_type, data, notification.created_at, True),
+            ))
+    else:
+        for user_id in user_ids:
+            group_messages.append((
+                f"user_{user_id}",
+                _message(f"temp_{uuid.uuid4()}", title, body, notification_type, data, now, False),
+            ))
+    if roles and save_to_db:
+        # Одна строка общего inbox на роль / One shared inbox row per role
+        for role_notification in create_role_notifications(roles, title, body, notification_type, data):
+            group_messages.append((
+                role_group(role_notification.role),
+                _message(str(role_notification.id), title, body, notification_type, data, role_notification.created_at, True, ROLE),
+            ))
+    elif roles:
+        # Одно сообщение на все роли — один и тот же id у всех получателей рассылки
+        # One message for all roles, so every broadcast recipient sees the same id
+        broadcast = _message(f"broadcast_{uuid.uuid4()}", title, body, notification_type, data, now, False, ROLE)
+        group_messages.extend((role_group(role), broadcast) for role in dict.fromkeys(roles))
+    return group_messages
+
+
+def send_web_notifications(title, body, notification_type, data=None, *, user_ids=(), roles=(), save_to_db=True):
+    """
+    Массовая отправка WebSocket-уведомлений пользователям и ролям из синхронного кода.
+    Bulk WebSocket notifications to users and roles from synchronous code.
+    """
+    group_messages = build_web_notifications(
+        title, body, notification_type, data, user_ids=user_ids, roles=roles, save_to_db=save_to_db,
+    )
+    sent = group_send_many(group_messages)
+    logger.info(f"WebSocket notification '{notification_type}' sent to {sent}/{len(group_messages)} groups.")
+    return sent
+
+
+async def asend_web_notifications(title, body, notification_type, data=None, *, user_ids=(), roles=(), save_to_db=True):
+    """
+    То же, что send_web_notifications, для асинхронного кода (консьюмеры) — без моста async_to_sync.
+    Same as send_web_notifications for async code (consumers), without the async_to_sync bridge.
+    """
+    group_messages = await database_sync_to_async(build_web_notifications)(
+        title, body, notification_type, data, user_ids=user_ids, roles=roles, save_to_db=save_to_db,
+    )
+    sent = await agroup_send_many(group_messages)
+    logger.info(f"WebSocket notification '{notification_type}' sent to {sent}/{len(group_messages)} groups.")
+    return sent
+
+
 def send_personal_notification(
-    user_id, 
-    title, 
-    body, 
-    notification_type, 
-    data =None, 
-    save_to_db = True 
+    user_id,
+    title,
+    body,
+    notification_type,
+    data =None,
+    save_to_db = True
 ):
     """
     Отправляет WebSocket уведомление конкретному пользователю
     и, опционально, сохраняет уведомление в базе данных.
     """
-    notification_db_id = None
-    notification_created_at = timezone.now()
-
-    if save_to_db:
-        try:
-            user = User.objects.get(id=user_id)
-            notification_obj = Notification.objects.create(
-                user=user,
-                title=title,
-                body=body,
-                notification_type=notification_type,
-                data=data
-            )
-            notification_db_id = str(notification_obj.id) 
-            notification_created_at = notification_obj.created_at 
-            logger.info(f"In-app notification created for user {user.username} (ID: {user_id}), type: {notification_type}, DB ID: {notification_db_id}")
-        except User.DoesNotExist:
-            logger.error(f"User with ID {user_id} not found for personal notification creation. Notification not saved to DB.", exc_info=True)
-            return 
-        except Exception as e:
-            logger.error(f"Error creating in-app notification for user {user_id}: {e}", exc_info=True)
-            return 
-    else:
-        
-        notification_db_id = f"temp_{uuid.uuid4()}"
-        logger.info(f"Temporary notification ID generated for user {user_id}: {notification_db_id}. Not saving to DB.")
-
-
-    channel_layer = get_channel_layer()
-
-    if channel_layer and notification_db_id:
-        message_payload = {
-            "id": notification_db_id, 
-            "title": title,
-            "body": body,
-            "notification_type": notification_type,
-            "data": data,
-            "is_read": False, 
-            "created_at": notification_created_at.isoformat(),
-            "save_to_db": save_to_db
-        }
-        try:
-            async_to_sync(channel_layer.group_send)(
-                f'user_{user_id}',
-                {
-                    "type": "send_notification",
-                    "message": message_payload,
-                }
-            )
-            logger.info(f"WebSocket personal notification sent to user_{user_id} for type {notification_type}.")
-        except Exception as e:
-            logger.error(f"Error sending WebSocket personal notification to user_{user_id}: {e}", exc_info=True)
-    else:
-        logger.warning(f"Channel layer not configured or no notification ID for user {user_id}. Cannot send WebSocket personal notification.")
+    try:
+        send_web_notifications(title, body, notification_type, data, user_ids=[user_id], save_to_db=save_to_db)
+    except Exception as e:
+        logger.error(f"Error sending personal notification to user {user_id}: {e}", exc_info=True)
 
 
 def send_broadcast_notification_to_roles(
@@ -89,48 +203,11 @@ def send_broadcast_notification_to_roles(
     body: str,
     notification_type: str,
     data: dict = None,
-    roles_to_notify: list[User.Role] = None 
+    roles_to_notify: list[User.Role] = None
 
 ):
     """
     Отправляет WebSocket уведомление всем онлайн-пользователям с указанными ролями.
     Это уведомление не сохраняется в БД для каждого пользователя индивидуально
     """
-    if roles_to_notify is None:
-        roles_to_notify = [] 
-
-    channel_layer = get_channel_layer()
-
-    if not channel_layer:
-        logger.warning("Channel layer not configured, cannot send WebSocket broadcast notification.")
-        return
-
-    
-    message_payload = {
-        "id": f"broadcast_{uuid.uuid4()}", 
-        "title": title,
-        "body": body,
-        "notification_type": notification_type,
-        "data": data,
-        "is_read": False, 
-        "created_at": timezone.now().isoformat(),
-        "save_to_db": False
-    }
-
-    
-    try:
-        
-        for role in roles_to_notify:
-            group_name = f"online_{role.lower()}" 
-            async_to_sync(channel_layer.group_send)(
-                group_name,
-                {
-                    "type": "send_notification",
-                    "message": message_payload,
-                }
-            )
-            logger.info(f"WebSocket broadcast notification sent to group '{group_name}' for type {notification_type}.")
-        
-
-    except Exception as e:
-        logger.error(f"Error sending WebSocket broadcast notification: {e}", exc_info=True)
\ No newline at end of file
+    send_web_notifications(title, body, notification_type, data, roles=roles_to_notify or (), save_to_db=False)